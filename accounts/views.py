@@ -15,6 +15,7 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import login, logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from core.purge import request_deletion
 from .forms import RegistrationForm, LoginForm, AccountUpdateForm
 
 
@@ -34,6 +35,8 @@ def login_view(request):
               * Redirect to the home page.
         → On failure:
               * Re-render the form with field-level and general errors.
+        → Over the login rate limit:
+              * Re-render with status 429 and a Retry-After header.
 
     Notes:
     - The LoginForm handles:
@@ -69,6 +72,20 @@ def login_view(request):
             messages.success(request, f"Welcome back {user.username}!")
             return redirect("home")  # Redirect to home page after login
 
+        # Too many attempts → rejected before the password was checked
+        retry_after = getattr(request, "login_retry_after", 0)
+        if retry_after:
+            messages.error(
+                request,
+                "Too many login attempts. Please wait a few minutes "
+                "and try again."
+            )
+            response = render(
+                request, "accounts/login.html", {"form": form}, status=429
+            )
+            response["Retry-After"] = str(retry_after)
+            return response
+
         # Invalid credentials → show error message
         messages.error(request, "Invalid username or password")
 
@@ -142,8 +159,8 @@ def delete_account(request):
     """
     Delete the user account.
 
-    Deletes the user account and all associated data:
-    plants, tasks and beds.
+    The user is deactivated and logged out straight away; their plants,
+    tasks and beds are then deleted in the background (see core.purge).
     """
 
     # Prevent superusers from deleting themselves via the user-facing UI
@@ -156,8 +173,9 @@ def delete_account(request):
 
     if request.method == "POST":
         user = request.user
-        logout(request)        # end session cleanly
-        user.delete()          # cascades through all related models
+        request_deletion(user)  # deactivate now, purge in the background
+        logout(request)         # end session cleanly
+        messages.success(request, "Your account has been deleted.")
         return redirect("login")
 
     return render(request, "accounts/delete_account.html")
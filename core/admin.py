@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Plant, GardenBed, PlantTask
+from .models import (
+    CalendarFeed, PendingDeletion, Plant, GardenBed, PlantTask,
+    TaskCompletion,
+)
 
 
 @admin.register(Plant)
@@ -21,3 +24,23 @@ class PlantTaskAdmin(admin.ModelAdmin):
     list_display = ("name", "plant", "frequency", "next_due", "active")
     search_fields = ("name", "notes")
     list_filter = ("frequency", "active", "all_year")
+
+
+@admin.register(TaskCompletion)
+class TaskCompletionAdmin(admin.ModelAdmin):
+    list_display = ("task", "plant", "user", "action", "done_on", "due_on")
+    list_filter = ("action",)
+    date_hierarchy = "done_on"
+
+
+@admin.register(CalendarFeed)
+class CalendarFeedAdmin(admin.ModelAdmin):
+    list_display = ("user", "created_at")
+    search_fields = ("user__username",)
+    exclude = ("token",)
+
+
+@admin.register(PendingDeletion)
+class PendingDeletionAdmin(admin.ModelAdmin):
+    list_display = ("user", "requested_at", "attempts")
+    search_fields = ("user__username",)
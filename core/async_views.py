@@ -0,0 +1,94 @@
+"""
+Building blocks for the async views in core.views.
+
+The busiest read-only pages (dashboard, plant and bed lists, and the
+plant, bed and task detail pages) are async views. Under ASGI (a uvicorn
+worker, see the Procfile) the number of requests in flight is no longer
+capped by a WSGI server's worker threads, so slow database round trips
+overlap instead of queueing. Django's async ORM still runs each query in a
+thread (one per request), so this buys concurrency, not fewer threads:
+benchmark_asgi compares the two servers. Under WSGI Django runs the
+views to completion in the request's thread, so they still work there.
+
+Django's generic views and LoginRequiredMixin are synchronous: they
+count, fetch and check the user with blocking queries, which are not
+allowed in an async view. The mixins here do those steps with the async
+ORM instead, and leave the rest (context, templates) to the generic
+views. Templates are still rendered synchronously, in a worker thread,
+by Django's handler: a view returns a TemplateResponse with its main
+queries already run.
+
+The user is loaded with request.auser() and stored back on
+request.user, so the templates do not load it a second time.
+"""
+
+from functools import wraps
+
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.mixins import AccessMixin
+from django.shortcuts import aget_object_or_404
+
+
+def async_login_required(view):
+    """login_required for async function-based views."""
+    @login_required
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await request.auser()
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+class AsyncLoginRequiredMixin(AccessMixin):
+    """LoginRequiredMixin for async class-based views."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncListMixin:
+    """
+    An async get() for a ListView. The count and the current page's rows
+    are read with the async ORM; subclasses add their own queries in
+    aget_context_data().
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        self.object_count = await self.object_list.acount()
+        context = await self.aget_context_data()
+        return self.render_to_response(context)
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        paginator = super().get_paginator(queryset, per_page, **kwargs)
+        # Counted in get(), so paginating runs no query
+        paginator.count = self.object_count
+        return paginator
+
+    async def aget_context_data(self, **kwargs):
+        context = self.get_context_data(**kwargs)
+        rows = [obj async for obj in context["object_list"]]
+        context["object_list"] = rows
+        if context.get("page_obj") is not None:
+            context["page_obj"].object_list = rows
+        name = self.get_context_object_name(self.object_list)
+        if name:
+            context[name] = rows
+        return context
+
+
+class AsyncDetailMixin:
+    """An async get() for a DetailView, looked up by primary key."""
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await aget_object_or_404(
+            self.get_queryset(), pk=self.kwargs.get(self.pk_url_kwarg)
+        )
+        context = await self.aget_context_data(object=self.object)
+        return self.render_to_response(context)
+
+    async def aget_context_data(self, **kwargs):
+        return self.get_context_data(**kwargs)
@@ -1,20 +1,55 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
+from django.db.models import Value
+from django.db.models.functions import Lower
+
+from .ratelimit import release_login_attempt, reserve_login_attempt
 
 UserModel = get_user_model()
 
 
 class CaseInsensitiveUsernameBackend(ModelBackend):
+    """
+    Log in with any capitalisation of the username.
+
+    The lookup compares LOWER(username) so it uses the unique functional
+    index from migration core 0019 instead of scanning the user table.
+    Unknown usernames still run the password hasher once, so a failed
+    login takes the same time whether or not the user exists.
+
+    Attempts are counted per IP address and username before any lookup
+    or hashing, and those over the limits (see core.ratelimit) are
+    rejected; a correct password uncounts its attempt. The seconds to
+    wait are left on ``request.login_retry_after`` for the login view.
+    """
+
     def authenticate(self, request, username=None, password=None, **kwargs):
         if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
             return None
 
+        counters = []
+        if request is not None:
+            retry_after, counters = reserve_login_attempt(request, username)
+            if retry_after:
+                request.login_retry_after = retry_after
+                # Stops authenticate() trying any other backend
+                raise PermissionDenied
+
         try:
-            user = UserModel.objects.get(username__iexact=username)
+            user = (
+                UserModel._default_manager
+                .alias(username_lower=Lower(UserModel.USERNAME_FIELD))
+                .get(username_lower=Lower(Value(username)))
+            )
         except UserModel.DoesNotExist:
-            return None
-
-        if user.check_password(password):
-            return user
-
+            # Hash anyway to even out timing (see ModelBackend)
+            UserModel().set_password(password)
+        else:
+            if user.check_password(password):
+                release_login_attempt(counters)
+                if self.user_can_authenticate(user):
+                    return user
         return None
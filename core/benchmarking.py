@@ -0,0 +1,168 @@
+"""
+Shared helpers for the benchmark management commands.
+
+The benchmark_* commands all produce the same JSON shape so results can
+be stored per commit and compared later:
+
+    {
+        "suite": "http",
+        "metric": "p95_ms",
+        "revision": "a1b2c3d",
+        "created_at": "2026-03-01T10:00:00+00:00",
+        "environment": {"python": "3.12.8", "django": "6.0.2", ...},
+        "config": {...command options...},
+        "results": {
+            "<case name>": {"mean_ms": 1.2, "p95_ms": 2.0, ...},
+            ...
+        }
+    }
+"""
+
+import json
+import platform
+import subprocess
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import mean
+from tempfile import TemporaryDirectory
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.test.utils import (
+    setup_test_environment, teardown_test_environment
+)
+
+RESULTS_DIR = Path(settings.BASE_DIR) / "benchmarks" / "results"
+# Reference results checked into the repository
+BASELINES_DIR = Path(settings.BASE_DIR) / "benchmarks" / "baselines"
+
+
+def percentile(values, pct):
+    """
+    Return the pct-th percentile of ``values`` (nearest-rank method).
+    ``values`` does not need to be sorted. Returns 0.0 for no values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarise(durations):
+    """
+    Summarise a list of durations (in seconds) as milliseconds.
+    """
+    as_ms = [d * 1000 for d in durations]
+    return {
+        "count": len(as_ms),
+        "mean_ms": round(mean(as_ms), 3) if as_ms else 0.0,
+        "p50_ms": round(percentile(as_ms, 50), 3),
+        "p95_ms": round(percentile(as_ms, 95), 3),
+        "p99_ms": round(percentile(as_ms, 99), 3),
+        "max_ms": round(max(as_ms), 3) if as_ms else 0.0,
+    }
+
+
+def git_revision():
+    """Short hash of the current commit, or "unknown" outside git."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_payload(suite, config, results, metric):
+    """
+    Wrap benchmark results with the metadata needed to compare runs.
+    ``metric`` names the result field compare_benchmarks checks by default.
+    """
+    return {
+        "suite": suite,
+        "metric": metric,
+        "revision": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(
+            timespec="seconds"
+        ),
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "machine": platform.machine(),
+        },
+        "config": config,
+        "results": results,
+    }
+
+
+def write_payload(payload, path=None):
+    """
+    Write a payload as JSON and return the path used.
+    Defaults to benchmarks/results/<suite>-<revision>-<timestamp>.json
+    """
+    if path is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = RESULTS_DIR / (
+            f"{payload['suite']}-{payload['revision']}-{stamp}.json"
+        )
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n")
+    return path
+
+
+def load_payload(path):
+    return json.loads(Path(path).read_text())
+
+
+def compare_results(baseline, current, metric):
+    """
+    Compare ``metric`` for every case present in both result dicts.
+
+    Returns a list of (case, baseline_value, current_value, change) tuples
+    where change is the relative difference (0.25 = 25% slower). The
+    caller decides which changes count as regressions.
+    """
+    rows = []
+    for case in sorted(set(baseline) & set(current)):
+        before = baseline[case].get(metric)
+        after = current[case].get(metric)
+        if not before or after is None:
+            continue
+        rows.append((case, before, after, (after - before) / before))
+    return rows
+
+
+@contextmanager
+def benchmark_database():
+    """
+    Run the block against a throwaway database, like the test runner.
+
+    SQLite databases are created as a temporary FILE rather than the
+    usual in-memory database so that concurrent threads each get their
+    own connection with normal locking. The real database is never
+    touched.
+    """
+    setup_test_environment()
+    with TemporaryDirectory() as tmp:
+        if connection.vendor == "sqlite":
+            connection.settings_dict["TEST"]["NAME"] = str(
+                Path(tmp) / "benchmark.sqlite3"
+            )
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
@@ -0,0 +1,47 @@
+"""
+Cache backends that record hits and misses for RequestTimingMiddleware.
+
+They behave exactly like Django's own backends; the only difference is
+that every read (get, get_many) is added to the current request's
+metrics (see core.metrics). Sessions, the login rate limits and the
+workload heatmap all read through the default cache, so their lookups
+show up in the Server-Timing header and the request log without any
+code of their own.
+"""
+
+from django.core.cache.backends import locmem, memcached, redis
+
+from . import metrics
+
+_missing = object()
+
+
+class TimedCacheMixin:
+    """Records a hit or miss for every key read."""
+
+    # BaseCache.get_many() calls get() once per key, which records them
+    get_many_calls_get = False
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _missing, version=version)
+        metrics.record_cache(value is not _missing)
+        return default if value is _missing else value
+
+    def get_many(self, keys, version=None):
+        values = super().get_many(keys, version=version)
+        if not self.get_many_calls_get:
+            for key in keys:
+                metrics.record_cache(key in values)
+        return values
+
+
+class LocMemCache(TimedCacheMixin, locmem.LocMemCache):
+    get_many_calls_get = True
+
+
+class RedisCache(TimedCacheMixin, redis.RedisCache):
+    pass
+
+
+class PyMemcacheCache(TimedCacheMixin, memcached.PyMemcacheCache):
+    pass
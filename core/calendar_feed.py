@@ -0,0 +1,188 @@
+"""
+iCalendar (RFC 5545) feed of a user's task schedules.
+
+Each active task becomes all-day events:
+
+- All-year repeating tasks are one VEVENT with an RRULE, since "every N
+  days" and "every N months" map directly onto FREQ=DAILY and
+  FREQ=MONTHLY. Monthly tasks due after the 28th are the exception:
+  PlantTask.add_months clamps them to shorter months and they stay
+  there, which an RRULE cannot express.
+- Everything else, including seasonal tasks (the next date jumps to the
+  window start, not a whole interval), is expanded with
+  ScheduleProjector into one VEVENT per occurrence over FEED_MONTHS.
+- One-off tasks are a single VEVENT.
+
+Overdue tasks are shown as due today, so the feed depends on the date as
+well as the user's data; feed_etag() covers both.
+"""
+
+import hashlib
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from itertools import batched
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import PlantTask
+from .scheduling import PROJECTION_FIELDS, ScheduleProjector, add_months
+from .sharding import shard_for_user
+
+# How far ahead expanded occurrences are listed
+FEED_MONTHS = 12
+
+# Tasks fetched and projected together while streaming
+FEED_BATCH_SIZE = 500
+
+PRODUCT_ID = "-//Garden Timekeeper//Task schedule//EN"
+
+RRULE_UNITS = {"d": "DAILY", "m": "MONTHLY"}
+
+
+def escape(text):
+    """Escape a TEXT property value."""
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """
+    Fold a content line into CRLF-terminated lines of at most 75 octets,
+    without splitting a UTF-8 character.
+    """
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Back off to the start of a character
+        while cut < len(encoded) and encoded[cut] & 0xC0 == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def ical_date(day):
+    return day.strftime("%Y%m%d")
+
+
+def rrule(task, start):
+    """
+    RRULE for the task's schedule from ``start``, or None when it has to
+    be expanded.
+    """
+    if not task.repeat or not task.all_year:
+        return None
+    unit = task.frequency[-1]
+    if unit == "m" and start.day > 28:
+        return None
+    return f"FREQ={RRULE_UNITS[unit]};INTERVAL={task.frequency[:-1]}"
+
+
+def event(uid, day, task, stamp, rule=None):
+    """Lines of one all-day VEVENT."""
+    summary = task.name
+    if task.plant_name:
+        summary = f"{task.name} ({task.plant_name})"
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART;VALUE=DATE:{ical_date(day)}",
+        f"DTEND;VALUE=DATE:{ical_date(day + timedelta(days=1))}",
+        f"SUMMARY:{escape(summary)}",
+    ]
+    if rule:
+        lines.append(f"RRULE:{rule}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def feed_tasks(user_id):
+    """The user's active, scheduled tasks with just the fields needed."""
+    # Feeds are fetched without logging in, so nothing has pinned a shard
+    return (
+        PlantTask.objects.db_manager(shard_for_user(user_id))
+        .filter(
+            plant__owner_id=user_id, active=True, next_due__isnull=False
+        )
+        .annotate(plant_name=F("plant__name"))
+        .only("pk", "name", *PROJECTION_FIELDS)
+        .order_by("pk")
+    )
+
+
+def feed_lines(user_id, today, stamp, domain):
+    """
+    Generate the feed as text chunks, one per VEVENT.
+
+    Tasks are read with a server-side iterator and projected in batches,
+    so memory stays flat however many tasks the user has.
+    """
+    yield "".join(fold(line) for line in [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODUCT_ID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        "X-WR-CALNAME:Garden tasks",
+    ])
+
+    stamp = stamp.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    projector = ScheduleProjector(today, add_months(today, FEED_MONTHS))
+    tasks = feed_tasks(user_id).iterator(chunk_size=FEED_BATCH_SIZE)
+
+    for batch in batched(tasks, FEED_BATCH_SIZE):
+        expanded = []
+        for task in batch:
+            start = max(task.next_due, today)
+            rule = rrule(task, start)
+            if rule:
+                lines = event(
+                    f"task-{task.pk}@{domain}", start, task, stamp, rule
+                )
+                yield "".join(fold(line) for line in lines)
+            else:
+                expanded.append(task)
+
+        rows = [
+            tuple(getattr(task, field) for field in PROJECTION_FIELDS)
+            for task in expanded
+        ]
+        for day, index in projector.occurrences(rows):
+            task = expanded[index]
+            lines = event(
+                f"task-{task.pk}-{ical_date(day)}@{domain}", day, task,
+                stamp,
+            )
+            yield "".join(fold(line) for line in lines)
+
+    yield fold("END:VCALENDAR")
+
+
+def feed_etag(feed, version, today):
+    """
+    Strong ETag for the feed: changes with the user's data version, the
+    token and the date (overdue tasks move to today).
+    """
+    key = f"{feed.token}:{version.version}:{today.isoformat()}"
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+
+def feed_last_modified(version, today):
+    """
+    When the feed last changed: the last data change, or midnight if
+    that was before today.
+    """
+    midnight = timezone.make_aware(datetime.combine(today, time.min))
+    return max(version.updated_at, midnight)
@@ -0,0 +1,87 @@
+"""
+Daily digest emails of tasks due today and overdue.
+
+due_digests() reads every user's due tasks with one query ordered by
+owner, streamed from the database and grouped in Python, so there are no
+per-user queries however many users there are. render_digests() turns a
+chunk of digests into email parts; it only needs templates, not the
+database, so send_due_digests can run it in worker processes.
+"""
+
+from itertools import groupby
+
+from django.template.loader import render_to_string
+
+# Rows fetched per round trip while streaming due tasks
+DIGEST_QUERY_CHUNK = 2000
+
+
+def due_digests(today, using=None):
+    """
+    Yield one digest per active user with an email address and at least
+    one active task due on or before ``today``, reading the database
+    ``using`` (one shard, when sharding is on).
+
+    Each digest is a plain dict (cheap to send to a worker process)::
+
+        {"email": ..., "username": ...,
+         "overdue": [{"name", "plant", "due"}, ...], "due_today": [...]}
+    """
+    # Imported here so worker processes can import this module before
+    # django.setup() has loaded the apps
+    from .models import PlantTask
+
+    rows = (
+        PlantTask.objects.using(using)
+        .filter(
+            active=True,
+            next_due__lte=today,
+            plant__owner__is_active=True,
+        )
+        .exclude(plant__owner__email="")
+        .order_by("plant__owner_id", "next_due", "name")
+        .values_list(
+            "plant__owner_id", "plant__owner__username",
+            "plant__owner__email", "name", "plant__name", "next_due",
+        )
+        .iterator(chunk_size=DIGEST_QUERY_CHUNK)
+    )
+
+    for _, user_rows in groupby(rows, key=lambda row: row[0]):
+        digest = None
+        for _, username, email, name, plant, due in user_rows:
+            if digest is None:
+                digest = {
+                    "email": email,
+                    "username": username,
+                    "overdue": [],
+                    "due_today": [],
+                }
+            task = {"name": name, "plant": plant, "due": due}
+            digest["overdue" if due < today else "due_today"].append(task)
+        yield digest
+
+
+def digest_subject(digest):
+    count = len(digest["overdue"]) + len(digest["due_today"])
+    plural = "" if count == 1 else "s"
+    if digest["overdue"]:
+        return f"{count} garden task{plural} to catch up on"
+    return f"{count} garden task{plural} due today"
+
+
+def render_digests(digests, site_url):
+    """
+    Render a chunk of digests as (subject, body, recipient) tuples.
+    """
+    return [
+        (
+            digest_subject(digest),
+            render_to_string(
+                "core/emails/due_digest.txt",
+                {**digest, "site_url": site_url},
+            ),
+            digest["email"],
+        )
+        for digest in digests
+    ]
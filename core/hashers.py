@@ -0,0 +1,71 @@
+"""
+Password hashing on a bounded thread pool.
+
+PBKDF2 is deliberately slow (hundreds of milliseconds per hash). Run on
+the request thread, a burst of logins keeps every gunicorn worker busy
+hashing, and pages such as the dashboard queue behind them.
+BoundedPBKDF2PasswordHasher hands the work to a shared pool of at most
+PASSWORD_HASH_WORKERS threads per process. hashlib releases the GIL
+while hashing, so the pool uses real CPU in parallel, but never more
+than the cap; with gthread workers the other request threads keep
+serving pages. Login, registration and password changes all hash
+through the configured hasher, so none of the views need to change.
+
+The time a hash waits for a free pool thread is recorded as the
+"hash_queue" request timing, next to "hash" for the hashing itself, in
+the request log and Server-Timing header (see core.metrics).
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+from . import metrics
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def hash_pool():
+    """The process-wide hashing pool, created on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    thread_name_prefix="password-hash",
+                )
+    return _pool
+
+
+def run_bounded(func, *args):
+    """
+    Run ``func(*args)`` on the hashing pool and wait for the result,
+    recording queue and run time against the current request.
+    """
+    submitted = perf_counter()
+
+    def job():
+        started = perf_counter()
+        return started, func(*args), perf_counter()
+
+    started, result, finished = hash_pool().submit(job).result()
+    metrics.record_timing("hash_queue", started - submitted)
+    metrics.record_timing("hash", finished - started)
+    return result
+
+
+class BoundedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2PasswordHasher with the hashing run on the bounded pool.
+
+    Keeps the "pbkdf2_sha256" algorithm name and iteration count, so
+    existing password hashes verify without being rehashed.
+    """
+
+    def encode(self, password, salt, iterations=None):
+        return run_bounded(super().encode, password, salt, iterations)
@@ -0,0 +1,163 @@
+"""
+Task completion history and statistics.
+
+Every "mark done" and "skip" is written to the append-only TaskCompletion
+table by record_task_actions(), which also increments the monthly
+UserTaskRollup and PlantTaskRollup rows in the same transaction. The
+statistics functions only read the rollups, so their cost grows with the
+number of months shown rather than the number of events recorded.
+"""
+
+from collections import Counter, defaultdict
+from datetime import date
+
+from django.db.models import F, Sum
+
+from .models import (
+    PlantTaskRollup, TaskAction, TaskCompletion, UserTaskRollup
+)
+
+
+def month_start(day, months=0):
+    """First day of the month ``months`` after ``day``'s month."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def record_task_actions(actions, action, done_on=None):
+    """
+    Record that each task in ``actions`` was done or skipped.
+
+    ``actions`` is a list of (task, due_on) pairs, where due_on is the
+    task's next_due before the action. Writes one TaskCompletion per task
+    with a single bulk insert, then updates the rollups for the month of
+    ``done_on``. Call inside the transaction that saves the tasks.
+    """
+    if not actions:
+        return []
+    done_on = done_on or date.today()
+
+    events = TaskCompletion.objects.bulk_create([
+        TaskCompletion(
+            task_id=task.pk,
+            plant_id=task.plant_id,
+            user_id=task.user_id,
+            action=action,
+            done_on=done_on,
+            due_on=due_on,
+        )
+        for task, due_on in actions
+    ])
+
+    by_user = defaultdict(Counter)
+    by_plant = defaultdict(Counter)
+    for event in events:
+        counts = {
+            "done_count": int(event.action == TaskAction.DONE),
+            "skipped_count": int(event.action == TaskAction.SKIP),
+            "on_time_count": int(event.on_time),
+        }
+        by_user[event.user_id].update(counts)
+        by_plant[event.plant_id].update(counts)
+
+    month = month_start(done_on)
+    increment_rollups(UserTaskRollup, "user_id", by_user, month)
+    increment_rollups(PlantTaskRollup, "plant_id", by_plant, month)
+    return events
+
+
+def increment_rollups(model, key_field, counts, month):
+    """
+    Add ``counts`` ({key: Counter}) to the rollup rows for ``month``.
+
+    Missing rows are created first (ignoring ones that already exist),
+    then counters are incremented with F() expressions so concurrent
+    requests cannot lose updates. Keys receiving the same increments
+    share one UPDATE statement.
+    """
+    model.objects.bulk_create(
+        [model(**{key_field: key, "month": month}) for key in counts],
+        ignore_conflicts=True,
+    )
+
+    groups = defaultdict(list)
+    for key, counter in counts.items():
+        increments = tuple(sorted(
+            (field, value) for field, value in counter.items() if value
+        ))
+        if increments:
+            groups[increments].append(key)
+
+    for increments, keys in groups.items():
+        model.objects.filter(
+            **{f"{key_field}__in": keys, "month": month}
+        ).update(**{
+            field: F(field) + value for field, value in increments
+        })
+
+
+def monthly_stats(user, months=12, today=None):
+    """
+    Task history for the last ``months`` months (oldest first), plus
+    totals, completion and on-time rates, and the current streak of
+    months with at least one task done.
+    """
+    today = today or date.today()
+    last = month_start(today)
+    first = month_start(last, -(months - 1))
+
+    rollups = {
+        row.month: row
+        for row in UserTaskRollup.objects.filter(
+            user=user, month__gte=first, month__lte=last
+        )
+    }
+
+    rows = []
+    for offset in range(months):
+        month = month_start(first, offset)
+        rollup = rollups.get(month)
+        rows.append({
+            "month": month,
+            "done": rollup.done_count if rollup else 0,
+            "skipped": rollup.skipped_count if rollup else 0,
+            "on_time": rollup.on_time_count if rollup else 0,
+        })
+
+    done = sum(row["done"] for row in rows)
+    skipped = sum(row["skipped"] for row in rows)
+    on_time = sum(row["on_time"] for row in rows)
+
+    # The current month only breaks the streak once it is over
+    streak = 0
+    for index, row in enumerate(reversed(rows)):
+        if row["done"]:
+            streak += 1
+        elif index:
+            break
+
+    return {
+        "months": rows,
+        "done": done,
+        "skipped": skipped,
+        "completion_rate": done / (done + skipped) if done + skipped else None,
+        "on_time_rate": on_time / done if done else None,
+        "streak": streak,
+    }
+
+
+def plant_stats(user, since):
+    """
+    Done/skipped totals per plant since ``since``, busiest first.
+    """
+    return (
+        PlantTaskRollup.objects
+        .filter(plant__owner=user, month__gte=month_start(since))
+        .values("plant_id", "plant__name")
+        .annotate(
+            done=Sum("done_count"),
+            skipped=Sum("skipped_count"),
+            on_time=Sum("on_time_count"),
+        )
+        .order_by("-done", "plant__name")
+    )
@@ -0,0 +1,286 @@
+"""
+Periodic clean-up of rows and files nothing uses any more.
+
+Jobs (see JOBS):
+
+- sessions: expired rows in django_session. SESSION_EXPIRE_AT_BROWSER_CLOSE
+  sessions still get an expiry date, but Django never deletes them.
+- task_changes: TaskChange feed rows older than TASK_CHANGE_RETENTION_DAYS.
+  The reminder worker only reads rows written since its last poll.
+- attachments: Summernote uploads that no notes field links to.
+- images: plant photos in PLANT_IMAGE_FOLDER that no plant uses any
+  more, e.g. replaced photos. Nothing outside that folder is touched,
+  and images are only deleted once HOUSEKEEPING_DELETE_IMAGES is on
+  (a dry run still counts them), so a development database that shares
+  CLOUDINARY_URL with production cannot delete production's photos.
+
+Rows are deleted in batches: up to ``batch_size`` primary keys are
+selected, then exactly those rows are deleted with one short statement
+in autocommit mode. No transaction spans more than one batch, and
+nothing stays locked while the next batch is chosen, so housekeeping
+can run alongside live traffic. ``pause`` seconds between batches
+spread the load further. Files are only removed once they are older
+than HOUSEKEEPING_GRACE_HOURS, so uploads whose form has not been saved
+yet are left alone.
+"""
+
+import logging
+import time
+from datetime import timedelta
+from functools import reduce
+from importlib import import_module
+from operator import or_
+from pathlib import PurePosixPath
+
+import cloudinary.api
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_summernote.utils import get_attachment_model
+
+from .models import GardenBed, Plant, PlantTask, TaskChange
+from .purge import delete_images
+from .sharding import shard_databases
+
+logger = logging.getLogger(__name__)
+
+# (model, field) for every text field an attachment link can be
+# pasted into
+NOTES_FIELDS = (
+    (Plant, "notes"),
+    (PlantTask, "notes"),
+    (GardenBed, "description"),
+)
+
+
+def delete_in_batches(queryset, batch_size, pause=0, dry_run=False,
+                      progress=None):
+    """
+    Delete the rows of ``queryset`` ``batch_size`` at a time, without
+    loading them or sending signals. Only for models nothing else points
+    at. Returns the number of rows deleted (or that would be).
+    """
+    if dry_run:
+        return queryset.count()
+
+    model = queryset.model
+    total = 0
+    while True:
+        pks = list(queryset.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return total
+        batch = model._base_manager.filter(pk__in=pks)
+        total += batch._raw_delete(batch.db)
+        if progress:
+            progress(total)
+        if pause:
+            time.sleep(pause)
+
+
+def expired_sessions(now, batch_size, pause=0, dry_run=False,
+                     progress=None):
+    engine = import_module(settings.SESSION_ENGINE)
+    if not hasattr(engine.SessionStore, "get_model_class"):
+        # Cookie or cache sessions: no table to clean
+        return 0
+    session_model = engine.SessionStore.get_model_class()
+    return delete_in_batches(
+        session_model.objects.filter(expire_date__lt=now),
+        batch_size, pause, dry_run, progress,
+    )
+
+
+def old_task_changes(now, batch_size, pause=0, dry_run=False,
+                     progress=None):
+    cutoff = now - timedelta(days=settings.TASK_CHANGE_RETENTION_DAYS)
+    return delete_in_batches(
+        TaskChange.objects.filter(created_at__lt=cutoff),
+        batch_size, pause, dry_run, progress,
+    )
+
+
+def attachment_stem(name):
+    """
+    The part of a stored file name that appears in its URL: storages may
+    add a version before it and drop or change the extension after it.
+    """
+    path = PurePosixPath(name)
+    return str(path.with_suffix("")) if path.suffix else str(path)
+
+
+def orphaned_attachments(now, batch_size, pause=0, dry_run=False,
+                         progress=None):
+    """
+    Delete Summernote attachments that no notes field links to. Each
+    batch of attachments is checked with one query per notes field.
+    """
+    attachment_model = get_attachment_model()
+    cutoff = now - timedelta(hours=settings.HOUSEKEEPING_GRACE_HOURS)
+    attachments = (
+        attachment_model.objects.filter(uploaded__lt=cutoff).order_by("pk")
+    )
+
+    total = 0
+    last_pk = 0
+    while True:
+        batch = list(attachments.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return total
+        last_pk = batch[-1].pk
+
+        stems = {
+            attachment.pk: attachment_stem(attachment.file.name)
+            for attachment in batch
+        }
+        used = set()
+        for model, field in NOTES_FIELDS:
+            uses = reduce(or_, (
+                Q(**{f"{field}__contains": stem}) for stem in stems.values()
+            ))
+            for alias in shard_databases():
+                used_notes = (
+                    model.objects.using(alias).filter(uses)
+                    .values_list(field, flat=True)
+                )
+                for notes in used_notes.iterator():
+                    used.update(
+                        pk for pk, stem in stems.items() if stem in notes
+                    )
+
+        orphans = [
+            attachment for attachment in batch if attachment.pk not in used
+        ]
+        if orphans and not dry_run:
+            for attachment in orphans:
+                try:
+                    attachment.file.delete(save=False)
+                except Exception:
+                    logger.exception(
+                        "Could not delete attachment file %s",
+                        attachment.file.name,
+                    )
+            attachment_model.objects.filter(
+                pk__in=[attachment.pk for attachment in orphans]
+            ).delete()
+        total += len(orphans)
+        if progress:
+            progress(total)
+        if pause:
+            time.sleep(pause)
+
+
+def plant_image_ids():
+    """
+    Public ids of every plant image, streamed from the database (from
+    every shard when sharding is on).
+    """
+    ids = set()
+    for alias in shard_databases():
+        images = (
+            Plant.objects.using(alias)
+            .exclude(image__isnull=True).exclude(image="")
+            .values_list("image", flat=True)
+        )
+        ids.update(
+            getattr(image, "public_id", image)
+            for image in images.iterator()
+        )
+    return ids
+
+
+def unused_images(now, batch_size, pause=0, dry_run=False, progress=None):
+    """
+    Delete plant images in PLANT_IMAGE_FOLDER that no plant uses.
+    Resources are listed a page at a time, by prefix, so uploads from
+    anything else sharing the Cloudinary account are never seen.
+    """
+    if not dry_run and not settings.HOUSEKEEPING_DELETE_IMAGES:
+        raise ImproperlyConfigured(
+            "Set HOUSEKEEPING_DELETE_IMAGES=True to delete unused images "
+            "(--dry-run counts them without it)."
+        )
+    if not settings.PLANT_IMAGE_FOLDER:
+        raise ImproperlyConfigured("PLANT_IMAGE_FOLDER must not be empty.")
+    prefix = f"{settings.PLANT_IMAGE_FOLDER.strip('/')}/"
+    cutoff = now - timedelta(hours=settings.HOUSEKEEPING_GRACE_HOURS)
+    used = plant_image_ids()
+
+    total = 0
+    cursor = None
+    while True:
+        options = {
+            "type": "upload",
+            "prefix": prefix,
+            "max_results": min(batch_size, 500),
+        }
+        if cursor:
+            options["next_cursor"] = cursor
+        page = cloudinary.api.resources(**options)
+
+        unused = []
+        for resource in page.get("resources", []):
+            public_id = resource["public_id"]
+            created = parse_datetime(resource.get("created_at", ""))
+            if (
+                public_id in used
+                or not public_id.startswith(prefix)
+                or created is None
+                or created >= cutoff
+            ):
+                continue
+            unused.append(public_id)
+
+        if unused and not dry_run:
+            delete_images(unused)
+        total += len(unused)
+        if progress:
+            progress(total)
+
+        cursor = page.get("next_cursor")
+        if not cursor:
+            return total
+        if pause:
+            time.sleep(pause)
+
+
+JOBS = {
+    "sessions": expired_sessions,
+    "task_changes": old_task_changes,
+    "attachments": orphaned_attachments,
+    "images": unused_images,
+}
+
+
+def default_jobs():
+    """Every job, leaving out images unless deleting them is enabled."""
+    return [
+        job for job in JOBS
+        if job != "images" or settings.HOUSEKEEPING_DELETE_IMAGES
+    ]
+
+
+def run_housekeeping(jobs=None, batch_size=None, pause=0,
+                     dry_run=False, progress=None, now=None):
+    """
+    Run ``jobs`` (default: default_jobs()) in order and return
+    {job: rows or files deleted}.
+    ``progress(job, total_so_far)`` is called after each batch. A job
+    that fails is logged and the others still run.
+    """
+    jobs = jobs or default_jobs()
+    batch_size = batch_size or settings.HOUSEKEEPING_BATCH_SIZE
+    now = now or timezone.now()
+    totals = {}
+    for job in jobs:
+        def report(total, job=job):
+            if progress:
+                progress(job, total)
+
+        try:
+            totals[job] = JOBS[job](now, batch_size, pause, dry_run, report)
+        except Exception:
+            logger.exception("Housekeeping job %s failed", job)
+            totals[job] = None
+    return totals
@@ -0,0 +1,33 @@
+"""
+Shared helpers for optimised static image variants.
+
+The optimise_images management command writes modern-format "siblings"
+next to each source image (e.g. logo.png -> logo.webp, logo.avif) and the
+{% picture %} template tag looks for those siblings when rendering. Keeping
+the naming rules in one place means both sides always agree.
+"""
+
+from pathlib import PurePosixPath
+
+# Source formats the command will optimise (lower-case suffixes).
+SOURCE_SUFFIXES = (".png", ".jpg", ".jpeg")
+
+# Modern formats, in order of preference for the <picture> element.
+# (suffix, MIME type, Pillow format name)
+SIBLING_FORMATS = (
+    (".avif", "image/avif", "AVIF"),
+    (".webp", "image/webp", "WEBP"),
+)
+
+
+def sibling_path(path, suffix):
+    """
+    Return the path of the modern-format sibling for an image.
+
+    Works with both filesystem paths (pathlib.Path) and static paths
+    (plain strings such as "assets/images/logo.png").
+    Example: sibling_path("assets/logo.png", ".webp") -> "assets/logo.webp"
+    """
+    if isinstance(path, str):
+        return str(PurePosixPath(path).with_suffix(suffix))
+    return path.with_suffix(suffix)
@@ -0,0 +1,389 @@
+"""
+Management command: compare WSGI and ASGI throughput for the async pages.
+
+Seeds a throwaway database with seed_garden, makes every SQL query sleep
+for --latency-ms (standing in for a slow or distant database server),
+then sends the same GET requests for the async pages (dashboard, plant
+and bed lists, and the plant, bed and task detail pages; see
+core.async_views) through both of Django's entry points:
+
+- wsgi: the WSGI handler, called from a gthread-style pool of
+  --threads threads,
+- asgi: the ASGI handler, called directly from one event loop with up
+  to --concurrency requests in flight, like a uvicorn worker.
+
+Requests run through the full middleware stack with a logged-in session
+cookie. Throughput and p50/p95 latency (from when the server starts on a
+request) are reported per page and saved as JSON.
+
+Usage:
+    python manage.py benchmark_asgi
+    python manage.py benchmark_asgi --latency-ms 50 --concurrency 64 \\
+        --threads 4 --requests 400
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from io import BytesIO
+from itertools import cycle
+from time import perf_counter, sleep
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.benchmarking import (
+    benchmark_database, build_payload, compare_results, load_payload,
+    summarise, write_payload,
+)
+from core.models import GardenBed, Plant, PlantTask
+
+User = get_user_model()
+
+MODES = ("wsgi", "asgi")
+HOST = "localhost"
+
+
+@contextmanager
+def simulated_latency(seconds):
+    """Make every query on every connection sleep for ``seconds`` first."""
+    def wrapper(execute, sql, params, many, context):
+        sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def add_wrapper(sender, connection, **kwargs):
+        # Each thread reconnects per request on the same wrapper object
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+    if not seconds:
+        yield
+        return
+    # Request threads get it when they connect
+    connection_created.connect(add_wrapper)
+    for connection in connections.all(initialized_only=True):
+        add_wrapper(None, connection)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(add_wrapper)
+        for connection in connections.all(initialized_only=True):
+            if wrapper in connection.execute_wrappers:
+                connection.execute_wrappers.remove(wrapper)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare WSGI and ASGI throughput for the async pages with a "
+        "simulated slow database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=8,
+            help="Seeded users whose pages are requested in turn.",
+        )
+        parser.add_argument("--plants-per-user", type=int, default=20)
+        parser.add_argument("--tasks-per-plant", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--latency-ms", type=float, default=20.0,
+            help="Delay added to every SQL query.",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=200,
+            help="Requests sent to each server.",
+        )
+        parser.add_argument(
+            "--threads", type=int, default=4,
+            help="WSGI worker threads (gunicorn --threads).",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=32,
+            help="ASGI requests in flight at once.",
+        )
+        parser.add_argument(
+            "--mode",
+            action="append",
+            choices=MODES,
+            dest="modes",
+            help="Only benchmark this server (repeatable).",
+        )
+        parser.add_argument(
+            "--output", default=None,
+            help="Where to write the JSON results "
+                 "(default: benchmarks/results/).",
+        )
+        parser.add_argument(
+            "--compare", default=None,
+            help="Previous results JSON to compare p95 latency against.",
+        )
+        parser.add_argument(
+            "--use-current-db",
+            action="store_true",
+            help="Run against the configured database (already seeded) "
+                 "instead of a throwaway one.",
+        )
+
+    def handle(self, *args, **options):
+        for option in ("requests", "threads", "concurrency"):
+            if options[option] < 1:
+                raise CommandError(f"--{option} must be >= 1")
+        modes = options["modes"] or list(MODES)
+        database = (
+            nullcontext() if options["use_current_db"]
+            else benchmark_database()
+        )
+        # The per-request JSON log would drown the report, and the
+        # requests are plain HTTP.
+        timing_logger = logging.getLogger("core.request_timing")
+        old_level = timing_logger.level
+        timing_logger.setLevel(logging.WARNING)
+
+        try:
+            with database, override_settings(SECURE_SSL_REDIRECT=False):
+                if not options["use_current_db"]:
+                    self.stdout.write("Seeding benchmark database...")
+                    call_command(
+                        "seed_garden",
+                        users=options["users"],
+                        plants_per_user=options["plants_per_user"],
+                        tasks_per_plant=options["tasks_per_plant"],
+                        seed=options["seed"],
+                        stdout=self.stdout,
+                    )
+                jobs = self.build_jobs(options)
+                results = {}
+                config = {
+                    key: options[key]
+                    for key in (
+                        "users", "plants_per_user", "tasks_per_plant",
+                        "seed", "latency_ms", "requests", "threads",
+                        "concurrency", "use_current_db",
+                    )
+                }
+                with simulated_latency(options["latency_ms"] / 1000):
+                    for mode in modes:
+                        self.stdout.write(f"Benchmarking {mode}...")
+                        run = getattr(self, f"run_{mode}")
+                        samples, wall = run(jobs, options)
+                        results.update(self.collect(mode, samples, wall))
+                        config[f"{mode}_wall_seconds"] = round(wall, 3)
+                        config[f"{mode}_throughput_rps"] = round(
+                            len(samples) / wall, 2
+                        )
+        finally:
+            timing_logger.setLevel(old_level)
+
+        payload = build_payload("asgi", config, results, metric="p95_ms")
+        path = write_payload(payload, options["output"])
+
+        self.report(results, config, modes)
+        self.stdout.write(f"Results written to {path}")
+
+        if options["compare"]:
+            self.report_comparison(
+                load_payload(options["compare"])["results"], results
+            )
+
+    # ---------------------------------------------------------
+    # Requests
+    # ---------------------------------------------------------
+    def build_jobs(self, options):
+        """(page name, path, cookie header) for each request."""
+        users = list(
+            User.objects.filter(plants__tasks__isnull=False)
+            .distinct()
+            .order_by("pk")[:options["users"]]
+        )
+        if not users:
+            raise CommandError("No users with tasks to benchmark.")
+
+        pages = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            cookie = (
+                f"{settings.SESSION_COOKIE_NAME}="
+                f"{client.cookies[settings.SESSION_COOKIE_NAME].value}"
+            )
+            plant = Plant.objects.filter(owner=user).order_by("pk").first()
+            bed = GardenBed.objects.filter(owner=user).order_by("pk").first()
+            task = PlantTask.objects.filter(user=user).order_by("pk").first()
+            urls = {
+                "dashboard": reverse("dashboard"),
+                "plant_list": reverse("plant_list"),
+                "bed_list": reverse("bed_list"),
+                "plant_detail": reverse("plant_detail", args=[plant.pk]),
+                "task_detail": reverse("task_detail", args=[task.pk]),
+            }
+            if bed:
+                urls["bed_detail"] = reverse("bed_detail", args=[bed.pk])
+            pages.extend(
+                (name, url, cookie) for name, url in urls.items()
+            )
+
+        pages = cycle(pages)
+        return [next(pages) for _ in range(options["requests"])]
+
+    def run_wsgi(self, jobs, options):
+        # Built here, not with get_wsgi_application(): that runs
+        # django.setup() again, resetting the logging levels, and the
+        # middleware reads the overridden settings when it is loaded.
+        application = WSGIHandler()
+
+        def request(job):
+            name, url, cookie = job
+            path = urlsplit(url)
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path.path,
+                "QUERY_STRING": path.query,
+                "SERVER_NAME": HOST,
+                "SERVER_PORT": "80",
+                "SERVER_PROTOCOL": "HTTP/1.1",
+                "HTTP_HOST": HOST,
+                "HTTP_COOKIE": cookie,
+                "wsgi.url_scheme": "http",
+                "wsgi.input": BytesIO(),
+                "wsgi.errors": BytesIO(),
+            }
+            statuses = []
+            start = perf_counter()
+            response = application(
+                environ, lambda status, headers: statuses.append(status)
+            )
+            try:
+                b"".join(response)
+            finally:
+                response.close()
+            ok = statuses[0].startswith("200")
+            return name, perf_counter() - start, ok
+
+        started = perf_counter()
+        with ThreadPoolExecutor(options["threads"]) as pool:
+            samples = list(pool.map(request, jobs))
+        return samples, perf_counter() - started
+
+    def run_asgi(self, jobs, options):
+        application = ASGIHandler()
+
+        async def request(job, slots):
+            name, url, cookie = job
+            path = urlsplit(url)
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path.path,
+                "raw_path": path.path.encode(),
+                "query_string": path.query.encode(),
+                "root_path": "",
+                "headers": [
+                    (b"host", HOST.encode()),
+                    (b"cookie", cookie.encode()),
+                ],
+                "client": ("127.0.0.1", 50000),
+                "server": (HOST, 80),
+            }
+            messages = [{"type": "http.request", "body": b""}]
+            statuses = []
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                # The client never disconnects
+                await asyncio.Event().wait()
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses.append(message["status"])
+
+            async with slots:
+                start = perf_counter()
+                await application(scope, receive, send)
+                return name, perf_counter() - start, statuses == [200]
+
+        async def run_all():
+            slots = asyncio.Semaphore(options["concurrency"])
+            return await asyncio.gather(
+                *(request(job, slots) for job in jobs)
+            )
+
+        started = perf_counter()
+        samples = asyncio.run(run_all())
+        return samples, perf_counter() - started
+
+    def collect(self, mode, samples, wall):
+        timings = defaultdict(list)
+        errors = defaultdict(int)
+        for name, duration, ok in samples:
+            timings[name].append(duration)
+            if not ok:
+                errors[name] += 1
+
+        results = {}
+        for name, durations in timings.items():
+            summary = summarise(durations)
+            summary["errors"] = errors[name]
+            summary["rps"] = round(len(durations) / wall, 2)
+            results[f"{mode}/{name}"] = summary
+        return results
+
+    # ---------------------------------------------------------
+    # Reporting
+    # ---------------------------------------------------------
+    def report(self, results, config, modes):
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'page':<20}{'count':>7}{'err':>5}{'rps':>9}"
+            f"{'p50 ms':>10}{'p95 ms':>10}"
+        )
+        for name in sorted(results):
+            row = results[name]
+            self.stdout.write(
+                f"{name:<20}{row['count']:>7}{row['errors']:>5}"
+                f"{row['rps']:>9.1f}{row['p50_ms']:>10.1f}"
+                f"{row['p95_ms']:>10.1f}"
+            )
+        for mode in modes:
+            self.stdout.write(
+                f"{mode}: {config[f'{mode}_throughput_rps']} req/s over "
+                f"{config[f'{mode}_wall_seconds']}s"
+            )
+        if len(modes) == len(MODES):
+            speedup = (
+                config["asgi_throughput_rps"] / config["wsgi_throughput_rps"]
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"ASGI throughput: {speedup:.2f}x WSGI "
+                f"({config['latency_ms']:g} ms per query, "
+                f"{config['threads']} threads vs "
+                f"{config['concurrency']} in flight)"
+            ))
+
+    def report_comparison(self, baseline, results):
+        self.stdout.write("")
+        self.stdout.write("p95 latency vs baseline:")
+        for name, before, after, change in compare_results(
+            baseline, results, "p95_ms"
+        ):
+            line = (
+                f"  {name:<20}{before:>10.1f} -> {after:>10.1f} ms "
+                f"({change:+.1%})"
+            )
+            style = self.style.ERROR if change > 0.1 else self.style.SUCCESS
+            self.stdout.write(style(line))
@@ -0,0 +1,142 @@
+"""
+Management command: benchmark deleting a large account.
+
+Seeds a throwaway database with two identical gardens of --tasks tasks
+each (50,000 by default), then deletes one with user.delete(), as
+delete_account used to, and the other with core.purge.purge_user(). The
+wall time and peak Python memory (tracemalloc) of each are reported and
+saved as JSON.
+
+Usage:
+    python manage.py benchmark_deletion
+    python manage.py benchmark_deletion --tasks 10000 --batch-size 500
+"""
+
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarking import (
+    benchmark_database, build_payload, compare_results, load_payload,
+    write_payload,
+)
+from core.purge import purge_user
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare time and memory of user.delete() against the batched "
+        "account purge on a large garden."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tasks", type=int, default=50_000,
+            help="Tasks in each benchmark account.",
+        )
+        parser.add_argument("--tasks-per-plant", type=int, default=10)
+        parser.add_argument("--beds", type=int, default=20)
+        parser.add_argument(
+            "--batch-size", type=int, default=None,
+            help="Rows per statement for the purge "
+                 "(default: ACCOUNT_PURGE_BATCH_SIZE).",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--output", default=None,
+            help="Where to write the JSON results "
+                 "(default: benchmarks/results/).",
+        )
+        parser.add_argument(
+            "--compare", default=None,
+            help="Previous results JSON to compare seconds against.",
+        )
+        parser.add_argument(
+            "--use-current-db",
+            action="store_true",
+            help="Seed the accounts in the configured database instead of "
+                 "a throwaway one.",
+        )
+
+    def handle(self, *args, **options):
+        if options["tasks"] < 1 or options["tasks_per_plant"] < 1:
+            raise CommandError("--tasks and --tasks-per-plant must be >= 1")
+
+        plants = -(-options["tasks"] // options["tasks_per_plant"])
+        database = (
+            nullcontext() if options["use_current_db"]
+            else benchmark_database()
+        )
+        with database:
+            self.stdout.write("Seeding benchmark database...")
+            call_command(
+                "seed_garden",
+                users=2,
+                beds_per_user=options["beds"],
+                plants_per_user=plants,
+                tasks_per_plant=options["tasks_per_plant"],
+                seed=options["seed"],
+                prefix="deletion",
+                stdout=self.stdout,
+            )
+            cascade_user, batched_user = User.objects.filter(
+                username__startswith="deletion"
+            ).order_by("pk")
+
+            results = {
+                "cascade": self.measure(cascade_user.delete),
+                "batched": self.measure(
+                    lambda: purge_user(
+                        batched_user.pk, options["batch_size"]
+                    )
+                ),
+            }
+
+        config = {
+            key: options[key]
+            for key in ("tasks", "tasks_per_plant", "beds", "batch_size",
+                        "seed", "use_current_db")
+        }
+        payload = build_payload("deletion", config, results,
+                                metric="seconds")
+        path = write_payload(payload, options["output"])
+
+        self.stdout.write("")
+        self.stdout.write(f"{'case':<12}{'seconds':>10}{'peak MB':>10}")
+        for name, row in results.items():
+            self.stdout.write(
+                f"{name:<12}{row['seconds']:>10.3f}"
+                f"{row['peak_mb']:>10.1f}"
+            )
+        self.stdout.write(f"Results written to {path}")
+
+        if options["compare"]:
+            self.stdout.write("Seconds vs baseline:")
+            for name, before, after, change in compare_results(
+                load_payload(options["compare"])["results"], results,
+                "seconds",
+            ):
+                self.stdout.write(
+                    f"  {name:<12}{before:>10.3f} -> {after:>10.3f} s "
+                    f"({change:+.1%})"
+                )
+
+    def measure(self, delete):
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            delete()
+            seconds = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {
+            "seconds": round(seconds, 3),
+            "peak_mb": round(peak / 2**20, 2),
+        }
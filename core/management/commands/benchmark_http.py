@@ -0,0 +1,289 @@
+"""
+Management command: end-to-end HTTP benchmark of the main user journeys.
+
+Seeds a throwaway database with seed_garden, then runs simulated users in
+parallel threads. Each simulated user logs in and walks through the real
+URL patterns (dashboard across months, the year-ahead heatmap, plant
+list filters and sorts, plant detail, mark done / skip and bed CRUD)
+through Django's full request/response stack. Latency percentiles and
+throughput are reported per endpoint and saved as JSON so runs can be
+compared across commits.
+
+Usage:
+    python manage.py benchmark_http
+    python manage.py benchmark_http --users 50 --concurrency 8 \\
+        --iterations 5 --compare benchmarks/results/http-abc123-....json
+"""
+
+import logging
+import random
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import date
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.benchmarking import (
+    benchmark_database, build_payload, compare_results, load_payload,
+    summarise, write_payload,
+)
+from core.models import GardenBed, Plant, PlantTask, PlantType
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the main HTTP user journeys with concurrent simulated "
+        "users and report p50/p95/p99 latency per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=20,
+            help="Seeded users (each simulated user logs in as one).",
+        )
+        parser.add_argument("--plants-per-user", type=int, default=50)
+        parser.add_argument("--tasks-per-plant", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--concurrency", type=int, default=4,
+            help="Simulated users running at the same time (threads).",
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=3,
+            help="Times each simulated user repeats the journey.",
+        )
+        parser.add_argument(
+            "--output", default=None,
+            help="Where to write the JSON results "
+                 "(default: benchmarks/results/).",
+        )
+        parser.add_argument(
+            "--compare", default=None,
+            help="Previous results JSON to compare p95 latency against.",
+        )
+        parser.add_argument(
+            "--use-current-db",
+            action="store_true",
+            help="Run against the configured database (already seeded) "
+                 "instead of a throwaway one.",
+        )
+
+    def handle(self, *args, **options):
+        database = (
+            nullcontext() if options["use_current_db"]
+            else benchmark_database()
+        )
+        # The per-request JSON log would drown the report, and the test
+        # client talks plain HTTP.
+        timing_logger = logging.getLogger("core.request_timing")
+        old_level = timing_logger.level
+        timing_logger.setLevel(logging.WARNING)
+
+        try:
+            with database, override_settings(SECURE_SSL_REDIRECT=False):
+                if not options["use_current_db"]:
+                    self.stdout.write("Seeding benchmark database...")
+                    call_command(
+                        "seed_garden",
+                        users=options["users"],
+                        plants_per_user=options["plants_per_user"],
+                        tasks_per_plant=options["tasks_per_plant"],
+                        seed=options["seed"],
+                        stdout=self.stdout,
+                    )
+                results, wall = self.run_journeys(options)
+        finally:
+            timing_logger.setLevel(old_level)
+
+        total_requests = sum(r["count"] for r in results.values())
+        config = {
+            key: options[key]
+            for key in (
+                "users", "plants_per_user", "tasks_per_plant", "seed",
+                "concurrency", "iterations", "use_current_db",
+            )
+        }
+        config["wall_seconds"] = round(wall, 3)
+        config["throughput_rps"] = round(total_requests / wall, 2)
+
+        payload = build_payload("http", config, results, metric="p95_ms")
+        path = write_payload(payload, options["output"])
+
+        self.report(results, config)
+        self.stdout.write(f"Results written to {path}")
+
+        if options["compare"]:
+            self.report_comparison(
+                load_payload(options["compare"])["results"], results
+            )
+
+    # ---------------------------------------------------------
+    # Simulated users
+    # ---------------------------------------------------------
+    def run_journeys(self, options):
+        users = list(
+            User.objects.filter(plants__isnull=False)
+            .distinct()
+            .order_by("pk")[:options["users"]]
+        )
+        if not users:
+            users = list(User.objects.order_by("pk")[:options["users"]])
+
+        timings = defaultdict(list)
+        errors = defaultdict(int)
+        jobs = [
+            (users[n % len(users)], options["seed"] + n)
+            for n in range(max(options["concurrency"], 1))
+        ]
+
+        def simulate(job):
+            user, seed = job
+            try:
+                samples = self.simulate_user(
+                    user, random.Random(seed), options["iterations"]
+                )
+            finally:
+                close_old_connections()
+            return samples
+
+        started = perf_counter()
+        if options["concurrency"] <= 1:
+            outcomes = [simulate(job) for job in jobs]
+        else:
+            with ThreadPoolExecutor(options["concurrency"]) as pool:
+                outcomes = list(pool.map(simulate, jobs))
+        wall = perf_counter() - started
+
+        for samples in outcomes:
+            for name, duration, ok in samples:
+                timings[name].append(duration)
+                if not ok:
+                    errors[name] += 1
+
+        results = {}
+        for name, durations in timings.items():
+            summary = summarise(durations)
+            summary["errors"] = errors[name]
+            summary["rps"] = round(len(durations) / wall, 2)
+            results[name] = summary
+        return results, wall
+
+    def simulate_user(self, user, rng, iterations):
+        """Run the journey as ``user``; return (name, seconds, ok) rows."""
+        client = Client()
+        client.force_login(user)
+        samples = []
+
+        def hit(name, method, url, data=None, expect=(200, 302)):
+            start = perf_counter()
+            response = getattr(client, method)(url, data or {})
+            samples.append(
+                (name, perf_counter() - start,
+                 response.status_code in expect)
+            )
+            return response
+
+        today = date.today()
+        plant_ids = list(
+            Plant.objects.filter(owner=user).values_list("pk", flat=True)
+        )
+
+        for _ in range(iterations):
+            # Dashboard across the next few months
+            for offset in range(4):
+                month = (today.month - 1 + offset) % 12 + 1
+                year = today.year + (today.month - 1 + offset) // 12
+                hit(
+                    "dashboard", "get",
+                    reverse("dashboard") + f"?month={month}&year={year}",
+                )
+            hit(
+                "dashboard_sorted", "get",
+                reverse("dashboard") + "?sort=plant&direction=desc",
+            )
+            hit("heatmap", "get", reverse("workload_heatmap"))
+
+            # Plant list: filters, sorts and pagination
+            plant_list = reverse("plant_list")
+            hit("plant_list", "get", plant_list)
+            hit("plant_list_sorted", "get",
+                plant_list + "?sort=bed__name&direction=desc")
+            hit("plant_list_filtered", "get",
+                plant_list + f"?type={PlantType.VEGETABLE}&search=o")
+            hit("plant_list_paged", "get", plant_list + "?page=2",
+                expect=(200, 404))
+
+            # Plant detail
+            if plant_ids:
+                hit("plant_detail", "get",
+                    reverse("plant_detail", args=[rng.choice(plant_ids)]))
+
+            # Task actions on due tasks
+            due = list(
+                PlantTask.objects.filter(plant__owner=user, active=True)
+                .order_by("next_due")
+                .values_list("pk", flat=True)[:2]
+            )
+            if due:
+                hit("task_mark_done", "post",
+                    reverse("task_mark_done", args=[due[0]]))
+            if len(due) > 1:
+                hit("task_skip", "get", reverse("task_skip", args=[due[1]]))
+
+            # Bed CRUD
+            hit("bed_list", "get", reverse("bed_list"))
+            name = f"Bench bed {rng.random():.12f}"
+            hit("bed_create", "post", reverse("bed_create"),
+                {"name": name, "location": "Benchmark"})
+            bed = GardenBed.objects.filter(owner=user, name=name).first()
+            if bed:
+                hit("bed_detail", "get", reverse("bed_detail", args=[bed.pk]))
+                hit("bed_edit", "post", reverse("bed_edit", args=[bed.pk]),
+                    {"name": name + " edited", "location": "Benchmark"})
+                hit("bed_delete", "post",
+                    reverse("bed_delete", args=[bed.pk]))
+
+        return samples
+
+    # ---------------------------------------------------------
+    # Reporting
+    # ---------------------------------------------------------
+    def report(self, results, config):
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'endpoint':<22}{'count':>7}{'err':>5}{'rps':>9}"
+            f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        )
+        for name in sorted(results):
+            row = results[name]
+            self.stdout.write(
+                f"{name:<22}{row['count']:>7}{row['errors']:>5}"
+                f"{row['rps']:>9.1f}{row['p50_ms']:>10.1f}"
+                f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Total throughput: {config['throughput_rps']} req/s over "
+            f"{config['wall_seconds']}s"
+        ))
+
+    def report_comparison(self, baseline, results):
+        self.stdout.write("")
+        self.stdout.write("p95 latency vs baseline:")
+        for name, before, after, change in compare_results(
+            baseline, results, "p95_ms"
+        ):
+            line = (
+                f"  {name:<22}{before:>10.1f} -> {after:>10.1f} ms "
+                f"({change:+.1%})"
+            )
+            style = self.style.ERROR if change > 0.1 else self.style.SUCCESS
+            self.stdout.write(style(line))
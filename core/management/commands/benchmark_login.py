@@ -0,0 +1,231 @@
+"""
+Management command: benchmark the case-insensitive login lookup.
+
+Fills a throwaway database with --users users (one million by default),
+then times:
+
+- lookup/iexact: the old username__iexact query, which scans auth_user,
+- lookup/lower: the LOWER(username) query CaseInsensitiveUsernameBackend
+  uses, served by the functional unique index,
+- authenticate/known and authenticate/unknown: full logins through the
+  backend, including the password hasher. The two should take about the
+  same time, so response times do not reveal which usernames exist.
+
+It then simulates a credential-stuffing burst: --attack-attempts wrong
+passwords for one username from one IP address, with the login rate
+limits off and on, and reports the CPU time each run used
+(attack/unlimited and attack/limited). With the limits on, attempts past
+LOGIN_RATE_LIMIT_USERNAME are rejected without hashing.
+
+Usage:
+    python manage.py benchmark_login
+    python manage.py benchmark_login --users 100000 --samples 50
+"""
+
+import random
+import time
+from contextlib import nullcontext
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Value
+from django.db.models.functions import Lower
+from django.test import RequestFactory, override_settings
+
+from core.benchmarking import (
+    benchmark_database, build_payload, compare_results, load_payload,
+    summarise, write_payload,
+)
+
+PASSWORD = "benchmark-password"
+
+# Users inserted per INSERT while filling the database
+INSERT_BATCH = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark username lookup and login against a large user table "
+        "and report p50/p95 latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=1_000_000,
+            help="Users in the benchmark database.",
+        )
+        parser.add_argument(
+            "--samples", type=int, default=20,
+            help="Timed runs per case (logins run the real hasher).",
+        )
+        parser.add_argument(
+            "--attack-attempts", type=int, default=100,
+            help="Wrong-password attempts in the attack simulation.",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--output", default=None,
+            help="Where to write the JSON results "
+                 "(default: benchmarks/results/).",
+        )
+        parser.add_argument(
+            "--compare", default=None,
+            help="Previous results JSON to compare p50 latency against.",
+        )
+        parser.add_argument(
+            "--use-current-db",
+            action="store_true",
+            help="Add the users to the configured database instead of a "
+                 "throwaway one.",
+        )
+
+    def handle(self, *args, **options):
+        if min(options["users"], options["samples"],
+               options["attack_attempts"]) < 1:
+            raise CommandError(
+                "--users, --samples and --attack-attempts must be >= 1"
+            )
+
+        database = (
+            nullcontext() if options["use_current_db"]
+            else benchmark_database()
+        )
+        with database:
+            self.fill(options["users"])
+            self.stdout.write("Lookup query plan:")
+            self.stdout.write(
+                "  " + self.lookup("user0000001").explain()
+            )
+            results = self.run_cases(options)
+            results.update(self.attack(options["attack_attempts"]))
+
+        config = {
+            key: options[key]
+            for key in ("users", "samples", "attack_attempts", "seed",
+                        "use_current_db")
+        }
+        payload = build_payload("login", config, results, metric="p50_ms")
+        path = write_payload(payload, options["output"])
+
+        self.report(results)
+        self.stdout.write(f"Results written to {path}")
+
+        if options["compare"]:
+            self.stdout.write("p50 latency vs baseline:")
+            for name, before, after, change in compare_results(
+                load_payload(options["compare"])["results"], results,
+                "p50_ms",
+            ):
+                self.stdout.write(
+                    f"  {name:<22}{before:>10.3f} -> {after:>10.3f} ms "
+                    f"({change:+.1%})"
+                )
+
+    # ---------------------------------------------------------
+    # Data
+    # ---------------------------------------------------------
+    def fill(self, count):
+        """
+        Insert ``count`` users sharing one password hash, so filling the
+        table does not run the hasher a million times.
+        """
+        self.stdout.write(f"Creating {count} users...")
+        password = make_password(PASSWORD)
+        for start in range(0, count, INSERT_BATCH):
+            User.objects.bulk_create([
+                User(username=f"user{number:07d}", password=password)
+                for number in range(start, min(start + INSERT_BATCH, count))
+            ])
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE auth_user")
+
+    def lookup(self, username):
+        return (
+            User.objects
+            .alias(username_lower=Lower("username"))
+            .filter(username_lower=Lower(Value(username)))
+        )
+
+    # ---------------------------------------------------------
+    # Cases
+    # ---------------------------------------------------------
+    def run_cases(self, options):
+        rng = random.Random(options["seed"])
+        users = options["users"]
+
+        def known():
+            # Random capitalisation, as users type it
+            return f"USER{rng.randrange(users):07d}".capitalize()
+
+        def unknown():
+            return f"nobody{rng.randrange(users):07d}"
+
+        cases = {
+            "lookup/iexact": lambda: User.objects.get(
+                username__iexact=known()
+            ),
+            "lookup/lower": lambda: self.lookup(known()).get(),
+            "authenticate/known": lambda: authenticate(
+                username=known(), password=PASSWORD
+            ),
+            "authenticate/unknown": lambda: authenticate(
+                username=unknown(), password=PASSWORD
+            ),
+        }
+
+        results = {}
+        for name, case in cases.items():
+            case()  # warm up
+            durations = []
+            for _ in range(options["samples"]):
+                started = time.perf_counter()
+                case()
+                durations.append(time.perf_counter() - started)
+            results[name] = summarise(durations)
+        return results
+
+    def attack(self, attempts):
+        """
+        Time ``attempts`` wrong-password logins for one user from one IP
+        address, with the rate limits off and then on. Durations are CPU
+        time, including the hashing threads.
+        """
+        factory = RequestFactory()
+        results = {}
+        for name, enabled in (("attack/unlimited", False),
+                              ("attack/limited", True)):
+            cache.clear()
+            durations = []
+            with override_settings(LOGIN_RATE_LIMIT_ENABLED=enabled):
+                for _ in range(attempts):
+                    request = factory.post(
+                        "/accounts/login/", REMOTE_ADDR="203.0.113.7"
+                    )
+                    started = time.process_time()
+                    authenticate(
+                        request, username="user0000000", password="guess"
+                    )
+                    durations.append(time.process_time() - started)
+            results[name] = summarise(durations)
+            results[name]["cpu_s"] = round(sum(durations), 3)
+        cache.clear()
+        return results
+
+    def report(self, results):
+        self.stdout.write("")
+        self.stdout.write(f"{'case':<24}{'p50 ms':>10}{'p95 ms':>10}")
+        for name, row in results.items():
+            self.stdout.write(
+                f"{name:<24}{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}"
+            )
+        unlimited = results["attack/unlimited"]["cpu_s"]
+        limited = results["attack/limited"]["cpu_s"]
+        self.stdout.write(
+            f"Attack CPU time: {unlimited:.3f}s unlimited, "
+            f"{limited:.3f}s limited"
+        )
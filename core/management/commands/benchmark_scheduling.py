@@ -0,0 +1,212 @@
+"""
+Management command: micro-benchmarks for the PlantTask scheduling methods.
+
+Times is_in_season, get_frequency_delta, add_months, calculate_next_due,
+mark_done and skip with timeit, covering every frequency in
+PlantTask.TASK_FREQUENCY and every seasonal window shape (all year, a
+normal window, a window that wraps over the year end and a single-month
+window). The tasks are unsaved model instances, so no database is used.
+
+Results are written as JSON in the shared benchmark format. The
+reference run lives in benchmarks/baselines/scheduling.json; pass
+--compare to check the current code against it.
+
+Usage:
+    python manage.py benchmark_scheduling
+    python manage.py benchmark_scheduling --filter skip --compare
+    python manage.py benchmark_scheduling \\
+        --output benchmarks/baselines/scheduling.json
+"""
+
+import timeit
+from datetime import date
+from statistics import median
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from core.benchmarking import BASELINES_DIR, build_payload, write_payload
+from core.models import PlantTask
+
+# Fixed anchor so results do not depend on the day the benchmark runs.
+# Mid-March is outside the wrap-around and single-month windows, so those
+# cases include the day-by-day walk to the next season.
+ANCHOR = date(2026, 3, 15)
+
+# name: (all_year, seasonal_start_month, seasonal_end_month)
+WINDOWS = {
+    "all-year": (True, 1, 12),
+    "window": (False, 3, 9),
+    "wrap-around": (False, 11, 2),
+    "single-month": (False, 6, 6),
+}
+
+FREQUENCIES = [value for value, _ in PlantTask.TASK_FREQUENCY]
+
+
+def make_task(frequency="7d", window="all-year", **fields):
+    all_year, start_month, end_month = WINDOWS[window]
+    return PlantTask(
+        name="Benchmark",
+        frequency=frequency,
+        all_year=all_year,
+        seasonal_start_month=start_month,
+        seasonal_end_month=end_month,
+        **fields,
+    )
+
+
+def build_cases():
+    """
+    Return {case name: zero-argument callable}.
+
+    Calls that modify the task reset next_due first so every repetition
+    does the same amount of work.
+    """
+    cases = {}
+
+    for window in WINDOWS:
+        task = make_task(window=window)
+        cases[f"is_in_season[{window}]"] = (
+            lambda task=task: task.is_in_season(ANCHOR)
+        )
+        task = make_task(window=window)
+        cases[f"calculate_next_due[new/{window}]"] = (
+            lambda task=task: task.calculate_next_due(from_date=ANCHOR)
+        )
+
+    for frequency in FREQUENCIES:
+        task = make_task(frequency)
+        cases[f"get_frequency_delta[{frequency}]"] = task.get_frequency_delta
+
+        months = task.get_frequency_delta()["months"]
+        if months:
+            # 31st of the month so short months are clamped
+            cases[f"add_months[{months}]"] = (
+                lambda task=task, months=months:
+                task.add_months(date(2026, 1, 31), months)
+            )
+
+        for window in WINDOWS:
+            key = f"{frequency}/{window}"
+
+            task = make_task(frequency, window, last_done=ANCHOR)
+            cases[f"calculate_next_due[{key}]"] = (
+                lambda task=task: task.calculate_next_due(from_date=ANCHOR)
+            )
+
+            task = make_task(frequency, window)
+            cases[f"mark_done[{key}]"] = (
+                lambda task=task: task.mark_done(ANCHOR)
+            )
+
+            task = make_task(frequency, window)
+
+            def skip(task=task):
+                task.next_due = ANCHOR
+                task.skip()
+
+            cases[f"skip[{key}]"] = skip
+
+    return cases
+
+
+def time_case(func, repeat, min_time):
+    """
+    Time ``func`` and return per-call nanoseconds.
+
+    The loop count is doubled until one run takes at least ``min_time``
+    seconds, then that many calls are timed ``repeat`` times.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    runs = [
+        elapsed / number * 1e9
+        for elapsed in timer.repeat(repeat=repeat, number=number)
+    ]
+    return {
+        "best_ns": round(min(runs), 1),
+        "median_ns": round(median(runs), 1),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark the PlantTask scheduling methods for every "
+        "frequency and seasonal window shape."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat", type=int, default=7,
+            help="Timed runs per case (the best run is reported).",
+        )
+        parser.add_argument(
+            "--min-time", type=float, default=0.05,
+            help="Minimum seconds per timed run.",
+        )
+        parser.add_argument(
+            "--filter", default="",
+            help="Only run cases whose name contains this text.",
+        )
+        parser.add_argument(
+            "--output", default=None,
+            help="Where to write the JSON results "
+                 "(default: benchmarks/results/).",
+        )
+        parser.add_argument(
+            "--compare",
+            nargs="?",
+            const=str(BASELINES_DIR / "scheduling.json"),
+            default=None,
+            help="Compare against a results JSON "
+                 "(default: the checked-in baseline).",
+        )
+        parser.add_argument(
+            "--threshold", type=float, default=0.25,
+            help="Relative slowdown counted as a regression "
+                 "when comparing.",
+        )
+
+    def handle(self, *args, **options):
+        cases = {
+            name: func
+            for name, func in build_cases().items()
+            if options["filter"] in name
+        }
+
+        results = {}
+        for name, func in cases.items():
+            results[name] = time_case(
+                func, options["repeat"], options["min_time"]
+            )
+            self.stdout.write(
+                f"{name:<42}{results[name]['best_ns']:>10.0f} ns"
+            )
+
+        config = {
+            "repeat": options["repeat"],
+            "min_time": options["min_time"],
+            "filter": options["filter"],
+            "anchor": ANCHOR.isoformat(),
+        }
+        payload = build_payload(
+            "scheduling", config, results, metric="best_ns"
+        )
+        path = write_payload(payload, options["output"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Timed {len(results)} cases. Results written to {path}"
+        ))
+
+        if options["compare"]:
+            call_command(
+                "compare_benchmarks",
+                options["compare"],
+                str(path),
+                threshold=options["threshold"],
+                stdout=self.stdout,
+            )
@@ -0,0 +1,203 @@
+"""
+Management command: benchmark database queries per request for each
+session engine and message storage.
+
+Seeds a throwaway database with one garden, then for every combination
+of SESSION_ENGINE (db, cached_db, signed_cookies) and MESSAGE_STORAGE
+(fallback, cookie) runs two journeys through the test client:
+
+- dashboard: repeated GETs of the dashboard,
+- mark_done: marking a task done (which adds a flash message) followed
+  by the dashboard that shows it.
+
+Reports the queries per request, how many of them touch django_session,
+and p50/p95 latency.
+
+Usage:
+    python manage.py benchmark_sessions
+    python manage.py benchmark_sessions --requests 50
+"""
+
+import logging
+from contextlib import nullcontext
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.benchmarking import (
+    benchmark_database, build_payload, compare_results, load_payload,
+    summarise, write_payload,
+)
+from core.models import PlantTask
+
+User = get_user_model()
+
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+
+MESSAGE_STORAGES = {
+    "fallback": "django.contrib.messages.storage.fallback.FallbackStorage",
+    "cookie": "django.contrib.messages.storage.cookie.CookieStorage",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DB queries per request across session engines and "
+        "message storages."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests", type=int, default=20,
+            help="Timed requests per journey and configuration.",
+        )
+        parser.add_argument("--plants", type=int, default=50)
+        parser.add_argument("--tasks-per-plant", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--output", default=None,
+            help="Where to write the JSON results "
+                 "(default: benchmarks/results/).",
+        )
+        parser.add_argument(
+            "--compare", default=None,
+            help="Previous results JSON to compare queries against.",
+        )
+        parser.add_argument(
+            "--use-current-db",
+            action="store_true",
+            help="Seed the garden in the configured database instead of "
+                 "a throwaway one.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be >= 1")
+
+        database = (
+            nullcontext() if options["use_current_db"]
+            else benchmark_database()
+        )
+        # The per-request JSON log would drown the report
+        timing_logger = logging.getLogger("core.request_timing")
+        old_level = timing_logger.level
+        timing_logger.setLevel(logging.WARNING)
+
+        try:
+            with database, override_settings(SECURE_SSL_REDIRECT=False):
+                call_command(
+                    "seed_garden",
+                    users=1,
+                    plants_per_user=options["plants"],
+                    tasks_per_plant=options["tasks_per_plant"],
+                    seed=options["seed"],
+                    prefix="sessions",
+                    stdout=self.stdout,
+                )
+                user = User.objects.filter(
+                    username__startswith="sessions"
+                ).latest("pk")
+                results = {}
+                for engine, engine_path in SESSION_ENGINES.items():
+                    for storage, storage_path in MESSAGE_STORAGES.items():
+                        with override_settings(
+                            SESSION_ENGINE=engine_path,
+                            MESSAGE_STORAGE=storage_path,
+                        ):
+                            for journey, row in self.run_journeys(
+                                user, options["requests"]
+                            ).items():
+                                results[f"{engine}+{storage}/{journey}"] = row
+        finally:
+            timing_logger.setLevel(old_level)
+
+        config = {
+            key: options[key]
+            for key in ("requests", "plants", "tasks_per_plant", "seed",
+                        "use_current_db")
+        }
+        payload = build_payload(
+            "sessions", config, results, metric="queries_per_request"
+        )
+        path = write_payload(payload, options["output"])
+
+        self.report(results)
+        self.stdout.write(f"Results written to {path}")
+
+        if options["compare"]:
+            self.stdout.write("Queries per request vs baseline:")
+            for name, before, after, change in compare_results(
+                load_payload(options["compare"])["results"], results,
+                "queries_per_request",
+            ):
+                self.stdout.write(
+                    f"  {name:<40}{before:>8.2f} -> {after:>8.2f} "
+                    f"({change:+.1%})"
+                )
+
+    def run_journeys(self, user, requests):
+        cache.clear()
+        client = Client()
+        client.force_login(user)
+        dashboard = reverse("dashboard")
+        task_ids = list(
+            PlantTask.objects.filter(user=user)
+            .values_list("pk", flat=True)[:requests]
+        )
+        client.get(dashboard)  # warm up
+
+        journeys = {
+            "dashboard": [("get", dashboard)] * requests,
+            "mark_done": [
+                step
+                for pk in task_ids
+                for step in (
+                    ("post", reverse("task_mark_done", args=[pk])),
+                    ("get", dashboard),
+                )
+            ],
+        }
+
+        results = {}
+        for journey, steps in journeys.items():
+            durations = []
+            queries = session_queries = 0
+            for method, url in steps:
+                with CaptureQueriesContext(connection) as captured:
+                    started = perf_counter()
+                    getattr(client, method)(url)
+                    durations.append(perf_counter() - started)
+                queries += len(captured)
+                session_queries += sum(
+                    "django_session" in query["sql"] for query in captured
+                )
+            row = summarise(durations)
+            row["queries_per_request"] = round(queries / len(steps), 2)
+            row["session_queries_per_request"] = round(
+                session_queries / len(steps), 2
+            )
+            results[journey] = row
+        return results
+
+    def report(self, results):
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'case':<40}{'queries':>9}{'session':>9}{'p50 ms':>9}"
+        )
+        for name, row in results.items():
+            self.stdout.write(
+                f"{name:<40}{row['queries_per_request']:>9.2f}"
+                f"{row['session_queries_per_request']:>9.2f}"
+                f"{row['p50_ms']:>9.2f}"
+            )
@@ -0,0 +1,92 @@
+"""
+Management command: compare two benchmark results files.
+
+Works with the JSON written by any benchmark_* command. Every case found
+in both files is compared on the suite's headline metric (or --metric),
+and the command exits with an error if any case got slower by more than
+--threshold, so it can gate CI.
+
+Usage:
+    python manage.py compare_benchmarks \\
+        benchmarks/baselines/scheduling.json \\
+        benchmarks/results/scheduling-abc123-....json --threshold 0.2
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarking import compare_results, load_payload
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare benchmark results against a baseline and fail on "
+        "regressions over a threshold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("baseline", help="Baseline results JSON.")
+        parser.add_argument("current", help="New results JSON.")
+        parser.add_argument(
+            "--metric", default=None,
+            help="Result field to compare (default: the suite's metric).",
+        )
+        parser.add_argument(
+            "--threshold", type=float, default=0.25,
+            help="Relative slowdown counted as a regression "
+                 "(0.25 = 25%% slower).",
+        )
+
+    def handle(self, *args, **options):
+        baseline = load_payload(options["baseline"])
+        current = load_payload(options["current"])
+
+        if baseline["suite"] != current["suite"]:
+            raise CommandError(
+                f"Cannot compare a '{baseline['suite']}' baseline with "
+                f"'{current['suite']}' results."
+            )
+        metric = options["metric"] or current.get("metric")
+        if not metric:
+            raise CommandError("No metric recorded; pass --metric.")
+
+        if baseline["environment"] != current["environment"]:
+            self.stdout.write(self.style.WARNING(
+                "Environments differ, so timings may not be comparable: "
+                f"{baseline['environment']} vs {current['environment']}"
+            ))
+
+        threshold = options["threshold"]
+        rows = compare_results(
+            baseline["results"], current["results"], metric
+        )
+        regressions = []
+
+        self.stdout.write(
+            f"{metric} vs baseline {baseline['revision']} "
+            f"(threshold {threshold:+.0%}):"
+        )
+        for case, before, after, change in rows:
+            line = (
+                f"  {case:<42}{before:>12.1f} -> {after:>12.1f} "
+                f"({change:+.1%})"
+            )
+            if change > threshold:
+                regressions.append(case)
+                self.stdout.write(self.style.ERROR(line + "  REGRESSION"))
+            else:
+                self.stdout.write(line)
+
+        missing = sorted(set(baseline["results"]) - set(current["results"]))
+        if missing:
+            self.stdout.write(
+                f"{len(missing)} baseline case(s) not in the current run."
+            )
+
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} of {len(rows)} case(s) regressed by "
+                f"more than {threshold:.0%}: {', '.join(regressions)}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"No regressions in {len(rows)} case(s)."
+        ))
@@ -0,0 +1,115 @@
+"""
+Management command: delete expired sessions, old change feed rows and
+unused uploads in small batches (see core.housekeeping). The images job
+only runs by default, and only deletes, when HOUSEKEEPING_DELETE_IMAGES
+is on; ``housekeeping images --dry-run`` counts them either way.
+
+Run it from a scheduler such as Heroku Scheduler, or keep it running
+in-process with --every.
+
+Usage:
+    python manage.py housekeeping
+    python manage.py housekeeping sessions task_changes --dry-run
+    python manage.py housekeeping --batch-size 500 --pause 0.1
+    python manage.py housekeeping --every 3600
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from core.housekeeping import JOBS, default_jobs, run_housekeeping
+
+
+class Command(BaseCommand):
+    help = "Delete expired sessions and unused data in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "jobs",
+            nargs="*",
+            help=f"Jobs to run, from {', '.join(JOBS)} (default: all, "
+                 "leaving out images unless HOUSEKEEPING_DELETE_IMAGES "
+                 "is on).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Rows deleted per statement "
+                 "(default: HOUSEKEEPING_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches, to go easy on a busy "
+                 "database.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count what would be deleted without deleting it.",
+        )
+        parser.add_argument(
+            "--every",
+            type=float,
+            default=None,
+            help="Keep running, repeating the jobs every this many "
+                 "seconds.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] is not None and options["batch_size"] < 1:
+            raise CommandError("--batch-size must be >= 1")
+        if options["pause"] < 0:
+            raise CommandError("--pause must not be negative")
+        if options["every"] is not None and options["every"] <= 0:
+            raise CommandError("--every must be positive")
+        unknown = set(options["jobs"]) - set(JOBS)
+        if unknown:
+            raise CommandError(
+                f"Unknown jobs: {', '.join(sorted(unknown))} "
+                f"(choose from {', '.join(JOBS)})"
+            )
+
+        self.verbosity = options["verbosity"]
+        jobs = options["jobs"] or default_jobs()
+
+        if options["every"] is None:
+            failed = self.run(jobs, options)
+            if failed:
+                raise CommandError(f"Failed: {', '.join(failed)}")
+            return
+
+        try:
+            while True:
+                self.run(jobs, options)
+                close_old_connections()
+                time.sleep(options["every"])
+        except KeyboardInterrupt:
+            self.stdout.write("Housekeeping stopped.")
+
+    def run(self, jobs, options):
+        totals = run_housekeeping(
+            jobs,
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            dry_run=options["dry_run"],
+            progress=self.progress,
+        )
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        for job, total in totals.items():
+            if total is None:
+                self.stderr.write(f"{job}: failed, see the log")
+            else:
+                self.stdout.write(f"{job}: {verb.lower()} {total}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {sum(t for t in totals.values() if t)} items."
+        ))
+        return [job for job, total in totals.items() if total is None]
+
+    def progress(self, job, total):
+        if self.verbosity > 1:
+            self.stdout.write(f"  {job}: {total} so far")
@@ -0,0 +1,67 @@
+"""
+Management command: apply migrations to every shard.
+
+``migrate`` only migrates the default database. Shards get the whole
+schema too (they hold copies of their users for the foreign keys), so
+run this after ``migrate`` whenever sharding is on, e.g. in the release
+phase. It does nothing when SHARDS is empty.
+
+Usage:
+    python manage.py migrate_shards
+    python manage.py migrate_shards --shard shard_a
+    python manage.py migrate_shards core 0020
+"""
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Run migrate on each shard database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "app_label", nargs="?",
+            help="App to migrate (default: all apps).",
+        )
+        parser.add_argument(
+            "migration_name", nargs="?",
+            help="Migrate the app to this migration.",
+        )
+        parser.add_argument(
+            "--shard",
+            action="append",
+            dest="shards",
+            help="Only migrate this shard (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        shards = options["shards"] or settings.SHARDS
+        unknown = sorted(set(shards) - set(settings.SHARDS))
+        if unknown:
+            raise CommandError(f"Unknown shard: {', '.join(unknown)}")
+        if options["migration_name"] and not options["app_label"]:
+            raise CommandError("A migration name needs an app label.")
+        if not shards:
+            self.stdout.write("Sharding is off: no shards to migrate.")
+            return
+
+        targets = [
+            name for name in (options["app_label"], options["migration_name"])
+            if name
+        ]
+        for alias in shards:
+            self.stdout.write(f"Migrating {alias}...")
+            call_command(
+                "migrate", *targets,
+                database=alias,
+                interactive=False,
+                verbosity=options["verbosity"],
+                stdout=self.stdout,
+                stderr=self.stderr,
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Migrated {len(shards)} shard{'s' if len(shards) != 1 else ''}."
+        ))
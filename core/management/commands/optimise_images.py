@@ -0,0 +1,264 @@
+"""
+Management command: optimise the static image tree.
+
+Losslessly recompresses PNG and JPEG files in place (only when the
+result is smaller), writes WebP/AVIF siblings for the {% picture %}
+template tag and reports the bytes saved. JPEGs are optimised with
+jpegtran, which rewrites the entropy coding without decoding the image;
+without jpegtran on the PATH they are left alone.
+
+The siblings are committed next to their sources: Heroku builds the slug
+from git, so re-run the command and commit the result whenever a served
+image changes.
+
+Usage:
+    python manage.py optimise_images
+    python manage.py optimise_images static/assets/images/logos --dry-run
+"""
+
+import io
+import shutil
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image, features
+
+from core.images import SIBLING_FORMATS, SOURCE_SUFFIXES, sibling_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Losslessly optimise PNG/JPEG images and generate WebP/AVIF "
+        "siblings, reporting the savings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            help=(
+                "Files or directories to optimise "
+                "(default: the static assets/images folder)."
+            ),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the savings without writing any files.",
+        )
+        parser.add_argument(
+            "--formats",
+            default="avif,webp",
+            help="Comma separated sibling formats to generate ('' for none).",
+        )
+        parser.add_argument(
+            "--quality",
+            type=int,
+            default=80,
+            help="Quality used for lossy siblings (AVIF, and WebP of JPEGs).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate siblings even if they are newer than the source.",
+        )
+
+    def handle(self, *args, **options):
+        paths = [Path(p) for p in options["paths"]] or [
+            Path(settings.STATICFILES_DIRS[0]) / "assets" / "images"
+        ]
+        for path in paths:
+            if not path.exists():
+                raise CommandError(f"Path does not exist: {path}")
+
+        self.dry_run = options["dry_run"]
+        self.force = options["force"]
+        self.quality = options["quality"]
+        self.formats = self._enabled_formats(options["formats"])
+
+        self.jpegtran = shutil.which("jpegtran")
+
+        totals = {"before": 0, "after": 0, "siblings": 0}
+
+        images = self._collect(paths)
+        if self.jpegtran is None and any(
+            image.suffix.lower() in (".jpg", ".jpeg") for image in images
+        ):
+            self.stderr.write(
+                "jpegtran not found; JPEG sources are left unchanged."
+            )
+
+        for image_path in images:
+            try:
+                before, after, siblings = self._process(image_path)
+            except OSError as exc:
+                self.stderr.write(f"Skipped {image_path}: {exc}")
+                continue
+
+            totals["before"] += before
+            totals["after"] += after
+            totals["siblings"] += len(siblings)
+
+            sibling_text = ", ".join(
+                f"{suffix} {self._kb(size)}" for suffix, size in siblings
+            )
+            self.stdout.write(
+                f"{image_path}: {self._kb(before)} -> {self._kb(after)}"
+                + (f" ({sibling_text})" if sibling_text else "")
+            )
+
+        saved = totals["before"] - totals["after"]
+        percent = (saved / totals["before"] * 100) if totals["before"] else 0
+        prefix = "[dry run] " if self.dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Optimised sources: {self._kb(totals['before'])} -> "
+            f"{self._kb(totals['after'])} (saved {self._kb(saved)}, "
+            f"{percent:.1f}%). Siblings kept: {totals['siblings']}."
+        ))
+
+    # ---------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------
+    def _enabled_formats(self, requested):
+        """
+        Return the SIBLING_FORMATS entries that were requested AND are
+        supported by the installed Pillow build.
+        """
+        wanted = {
+            f".{name.strip().lower()}"
+            for name in requested.split(",")
+            if name.strip()
+        }
+        enabled = []
+        for suffix, mime, pil_format in SIBLING_FORMATS:
+            if suffix not in wanted:
+                continue
+            if not features.check(pil_format.lower()):
+                self.stderr.write(
+                    f"Pillow was built without {pil_format} support; "
+                    f"skipping {suffix} siblings."
+                )
+                continue
+            enabled.append((suffix, mime, pil_format))
+        return enabled
+
+    def _collect(self, paths):
+        """Yield every optimisable image under the given paths, sorted."""
+        files = set()
+        for path in paths:
+            candidates = [path] if path.is_file() else path.rglob("*")
+            for candidate in candidates:
+                if candidate.suffix.lower() in SOURCE_SUFFIXES:
+                    files.add(candidate)
+        return sorted(files)
+
+    def _process(self, path):
+        """
+        Optimise one image and write its siblings.
+
+        Returns (bytes_before, bytes_after, [(suffix, size), ...]).
+        """
+        before = path.stat().st_size
+        after = before
+
+        with Image.open(path) as img:
+            img.load()
+            lossless = img.format == "PNG"
+
+            optimised = self._optimise(img, path)
+            if optimised is not None and len(optimised) < before:
+                after = len(optimised)
+                if not self.dry_run:
+                    path.write_bytes(optimised)
+
+            siblings = []
+            for suffix, _mime, pil_format in self.formats:
+                size = self._write_sibling(
+                    img, path, suffix, pil_format, lossless, after
+                )
+                if size is not None:
+                    siblings.append((suffix, size))
+
+        return before, after, siblings
+
+    def _optimise(self, img, path):
+        """
+        Re-encode the image without changing its pixels.
+
+        PNGs are recompressed with optimize=True. JPEGs go through
+        jpegtran, which only rewrites the entropy coding (optimised
+        Huffman tables, progressive scan); decoding and re-encoding them
+        with Pillow would be lossy even at quality="keep".
+        """
+        if img.format == "PNG":
+            buffer = io.BytesIO()
+            img.save(buffer, "PNG", optimize=True)
+            return buffer.getvalue()
+        if img.format == "JPEG":
+            return self._jpegtran(path)
+        return None
+
+    def _jpegtran(self, path):
+        """
+        Losslessly optimised JPEG bytes, or None without jpegtran.
+        Raises OSError when jpegtran rejects the file, so it is skipped
+        like any other unreadable image.
+        """
+        if self.jpegtran is None:
+            return None
+        result = subprocess.run(
+            [self.jpegtran, "-copy", "all", "-optimize", "-progressive",
+             str(path)],
+            capture_output=True,
+        )
+        if result.returncode != 0:
+            message = result.stderr.decode(errors="replace").strip()
+            raise OSError(
+                f"jpegtran exited with status {result.returncode}"
+                + (f": {message}" if message else "")
+            )
+        return result.stdout
+
+    def _write_sibling(self, img, path, suffix, pil_format, lossless, limit):
+        """
+        Encode a modern-format sibling and keep it only if it is smaller
+        than the (optimised) source. Returns the sibling size or None.
+        """
+        target = sibling_path(path, suffix)
+
+        if (
+            not self.force
+            and target.exists()
+            and target.stat().st_mtime >= path.stat().st_mtime
+        ):
+            return target.stat().st_size
+
+        # WebP/AVIF only accept RGB(A); palette and greyscale images are
+        # expanded first (keeping any transparency).
+        has_alpha = img.mode in ("RGBA", "LA", "PA") or (
+            "transparency" in img.info
+        )
+        source = img.convert("RGBA" if has_alpha else "RGB")
+
+        buffer = io.BytesIO()
+        if pil_format == "WEBP" and lossless:
+            source.save(buffer, "WEBP", lossless=True, method=6)
+        else:
+            source.save(buffer, pil_format, quality=self.quality)
+        data = buffer.getvalue()
+
+        if len(data) >= limit:
+            # A sibling larger than the source is never worth serving.
+            if target.exists() and not self.dry_run:
+                target.unlink()
+            return None
+
+        if not self.dry_run:
+            target.write_bytes(data)
+        return len(data)
+
+    @staticmethod
+    def _kb(size):
+        return f"{size / 1024:.1f} KB"
@@ -0,0 +1,63 @@
+"""
+Management command: finish deleting accounts whose owners asked for
+them to be deleted.
+
+delete_account normally starts the purge in a background thread of the
+web process (see core.purge). This command picks up any that did not
+finish, e.g. after a restart; run it from a scheduler such as Heroku
+Scheduler.
+
+Usage:
+    python manage.py purge_accounts
+    python manage.py purge_accounts --batch-size 500
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import PendingDeletion
+from core.purge import purge_pending
+
+
+class Command(BaseCommand):
+    help = "Delete the data of accounts waiting to be deleted, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Rows deleted per statement "
+                 "(default: ACCOUNT_PURGE_BATCH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] is not None and options["batch_size"] < 1:
+            raise CommandError("--batch-size must be >= 1")
+        self.verbosity = options["verbosity"]
+
+        pending = list(
+            PendingDeletion.objects.values_list("pk", "user__username")
+        )
+        if not pending:
+            self.stdout.write("No accounts waiting to be deleted.")
+            return
+
+        for pk, username in pending:
+            self.stdout.write(f"Purging {username}...")
+            totals = purge_pending(
+                pk, options["batch_size"], progress=self.progress
+            )
+            if totals is not None:
+                summary = ", ".join(
+                    f"{count} {label}" for label, count in totals.items()
+                )
+                self.stdout.write(f"  deleted {summary}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {len(pending)} account"
+            f"{'s' if len(pending) != 1 else ''}."
+        ))
+
+    def progress(self, label, count):
+        if self.verbosity > 1:
+            self.stdout.write(f"  {label}: {count}")
@@ -0,0 +1,71 @@
+"""
+Management command: move each user's garden onto their shard.
+
+Run it after adding a shard to SHARDS, or after turning sharding on for
+an existing database (see core.rebalance for how gardens are moved and
+what to watch out for). Users already on the right shard are left
+alone, so it is safe to run again.
+
+Usage:
+    python manage.py rebalance_shards --dry-run
+    python manage.py rebalance_shards
+    python manage.py rebalance_shards --batch-size 500 -v 2
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.rebalance import rebalance
+
+
+class Command(BaseCommand):
+    help = "Move gardens that are not on their user's shard."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows written or deleted per statement.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count the users that would move, without moving them.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.SHARDS:
+            raise CommandError("Sharding is off: SHARDS is empty.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be >= 1")
+        self.verbosity = options["verbosity"]
+
+        moves, failed = rebalance(
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+            progress=self.progress,
+        )
+
+        verb = "would move" if options["dry_run"] else "moved"
+        for (source, target), users in sorted(moves.items()):
+            self.stdout.write(f"{source} -> {target}: {verb} {users}")
+        if failed:
+            raise CommandError(
+                f"Could not move {len(failed)} user"
+                f"{'s' if len(failed) != 1 else ''}: "
+                + ", ".join(map(str, failed))
+            )
+        total = sum(moves.values())
+        prefix = "[dry run] " if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{total} user{'s' if total != 1 else ''} "
+            f"{'to move' if options['dry_run'] else 'moved'}."
+        ))
+
+    def progress(self, user_id, source, target, counts):
+        if counts is not None and self.verbosity > 1:
+            summary = ", ".join(
+                f"{count} {label}" for label, count in counts.items()
+            )
+            self.stdout.write(f"  user {user_id}: {summary}")
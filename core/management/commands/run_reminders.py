@@ -0,0 +1,79 @@
+"""
+Management command: long-running worker that emails task reminders at
+REMINDER_HOUR on each task's due date.
+
+See core.reminders for how the schedule is kept without rescanning the
+task table. Run a single worker (the reminders process in the Procfile).
+The TaskChange feed holds task ids without a shard, so the worker does
+not run in sharded mode yet.
+
+Usage:
+    python manage.py run_reminders
+    python manage.py run_reminders --poll-seconds 10 --window-hours 48
+    python manage.py run_reminders --once
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from core.reminders import ReminderScheduler
+
+
+class Command(BaseCommand):
+    help = "Send task reminder emails as tasks fall due."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll-seconds",
+            type=float,
+            default=30,
+            help="How often to read the task change feed.",
+        )
+        parser.add_argument(
+            "--window-hours",
+            type=float,
+            default=24,
+            help="How far ahead reminders are loaded into memory.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send the reminders due now and exit.",
+        )
+
+    def handle(self, *args, **options):
+        if settings.SHARDS:
+            raise CommandError("Reminders do not support sharding yet.")
+        if options["poll_seconds"] <= 0 or options["window_hours"] <= 0:
+            raise CommandError(
+                "--poll-seconds and --window-hours must be positive"
+            )
+
+        scheduler = ReminderScheduler(
+            window=timedelta(hours=options["window_hours"]),
+            poll_interval=timedelta(seconds=options["poll_seconds"]),
+        )
+
+        if options["once"]:
+            scheduler.tick()
+            self.stdout.write(self.style.SUCCESS(
+                f"Sent {scheduler.sent} reminder email"
+                f"{'s' if scheduler.sent != 1 else ''}."
+            ))
+            return
+
+        self.stdout.write("Reminder worker started.")
+        try:
+            while True:
+                wait = scheduler.tick()
+                # Drop the connection if the database closed it while idle
+                close_old_connections()
+                time.sleep(wait)
+        except KeyboardInterrupt:
+            self.stdout.write(
+                f"Stopped after sending {scheduler.sent} reminder emails."
+            )
@@ -0,0 +1,364 @@
+"""
+Management command: generate synthetic garden data for load testing.
+
+Creates users with garden beds, plants and plant tasks at a configurable
+scale. Everything is written with bulk_create in batches and the output
+is fully deterministic for a given --seed and --today, so benchmarks run
+against identical data every time. With sharding on, users are created
+on the default database and their gardens on their own shards.
+
+Usage:
+    python manage.py seed_garden --users 100
+    python manage.py seed_garden --users 10000 --plants-per-user 50 \\
+        --tasks-per-plant 5 --seed 42 --today 2026-03-01
+"""
+
+import random
+from datetime import date, timedelta
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import (
+    GardenBed, Plant, PlantLifespan, PlantTask, PlantType
+)
+from core.sharding import shard_for_user, user_copy_fields
+
+User = get_user_model()
+
+# ---------------------------------------------------------
+# Realistic name pools
+# ---------------------------------------------------------
+BED_NAMES = [
+    "Front Border", "Back Border", "Herb Spiral", "Veg Patch", "Raised Bed",
+    "Greenhouse", "Patio Pots", "Rose Bed", "Orchard", "Cold Frame",
+    "Window Box", "Fruit Cage", "Shade Bed", "Cutting Garden", "Pond Edge",
+]
+LOCATIONS = ["Front garden", "Back garden", "Side path", "Allotment", ""]
+
+# (name, latin name, type, lifespan)
+PLANTS = [
+    ("Tomato", "Solanum lycopersicum", PlantType.VEGETABLE,
+     PlantLifespan.ANNUAL),
+    ("Runner Bean", "Phaseolus coccineus", PlantType.VEGETABLE,
+     PlantLifespan.ANNUAL),
+    ("Courgette", "Cucurbita pepo", PlantType.VEGETABLE, PlantLifespan.ANNUAL),
+    ("Carrot", "Daucus carota", PlantType.VEGETABLE, PlantLifespan.BIENNIAL),
+    ("Strawberry", "Fragaria x ananassa", PlantType.FRUIT,
+     PlantLifespan.PERENNIAL),
+    ("Apple", "Malus domestica", PlantType.TREE, PlantLifespan.PERENNIAL),
+    ("Raspberry", "Rubus idaeus", PlantType.FRUIT, PlantLifespan.PERENNIAL),
+    ("Basil", "Ocimum basilicum", PlantType.HERB, PlantLifespan.ANNUAL),
+    ("Rosemary", "Salvia rosmarinus", PlantType.HERB,
+     PlantLifespan.PERENNIAL),
+    ("Parsley", "Petroselinum crispum", PlantType.HERB,
+     PlantLifespan.BIENNIAL),
+    ("Rose", "Rosa", PlantType.SHRUB, PlantLifespan.PERENNIAL),
+    ("Lavender", "Lavandula angustifolia", PlantType.SHRUB,
+     PlantLifespan.PERENNIAL),
+    ("Dahlia", "Dahlia", PlantType.FLOWER, PlantLifespan.PERENNIAL),
+    ("Sweet Pea", "Lathyrus odoratus", PlantType.FLOWER,
+     PlantLifespan.ANNUAL),
+    ("Foxglove", "Digitalis purpurea", PlantType.FLOWER,
+     PlantLifespan.BIENNIAL),
+    ("Hydrangea", "Hydrangea macrophylla", PlantType.SHRUB,
+     PlantLifespan.PERENNIAL),
+]
+
+# (task name, weighted frequency choices)
+TASKS = [
+    ("Watering", ["7d", "7d", "14d"]),
+    ("Feeding", ["14d", "1m"]),
+    ("Deadheading", ["7d", "14d"]),
+    ("Weeding", ["14d", "1m"]),
+    ("Pruning", ["6m", "12m"]),
+    ("Mulching", ["12m"]),
+    ("Repotting", ["12m"]),
+    ("Pest check", ["14d", "1m"]),
+    ("Harvesting", ["7d", "14d"]),
+    ("Fertilising", ["3m", "6m"]),
+]
+
+# Seasonal windows: (all_year, start_month, end_month).
+# Includes wrap-around windows that cross the year end (e.g. Nov-Feb).
+SEASONAL_WINDOWS = [
+    (True, 1, 12),
+    (True, 1, 12),
+    (True, 1, 12),
+    (False, 3, 9),
+    (False, 4, 6),
+    (False, 5, 8),
+    (False, 9, 11),
+    (False, 11, 2),
+    (False, 10, 3),
+    (False, 12, 1),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate deterministic synthetic users, beds, plants and tasks "
+        "for load testing and benchmarks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--beds-per-user", type=int, default=3)
+        parser.add_argument("--plants-per-user", type=int, default=50)
+        parser.add_argument("--tasks-per-plant", type=int, default=5)
+        parser.add_argument(
+            "--seed", type=int, default=42,
+            help="Random seed (same seed + --today = identical data).",
+        )
+        parser.add_argument(
+            "--today",
+            type=date.fromisoformat,
+            default=None,
+            help="Anchor date for due dates (YYYY-MM-DD, default: today).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Rows per INSERT statement.",
+        )
+        parser.add_argument(
+            "--users-per-chunk", type=int, default=100,
+            help="Users generated per transaction (bounds memory use).",
+        )
+        parser.add_argument(
+            "--prefix", default="seed_user",
+            help="Username prefix for generated users.",
+        )
+        parser.add_argument(
+            "--password", default="gardener123",
+            help="Password given to every generated user.",
+        )
+        parser.add_argument(
+            "--overdue-ratio", type=float, default=0.2,
+            help="Share of active tasks whose next_due is in the past.",
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete previously generated users with this prefix first.",
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.today = options["today"] or date.today()
+        self.batch_size = options["batch_size"]
+        self.overdue_ratio = options["overdue_ratio"]
+
+        prefix = options["prefix"]
+        existing = User.objects.filter(username__startswith=prefix)
+        if options["clear"]:
+            deleted, _ = existing.delete()
+            self.stdout.write(f"Deleted {deleted} existing seeded rows.")
+        elif existing.exists():
+            raise CommandError(
+                f"Users starting with '{prefix}' already exist. "
+                "Use --clear or a different --prefix."
+            )
+
+        # Hashing is deliberately slow, so hash once and share the result.
+        password_hash = make_password(options["password"])
+
+        started = perf_counter()
+        totals = {"users": 0, "beds": 0, "plants": 0, "tasks": 0}
+        chunk = options["users_per_chunk"]
+
+        for first in range(0, options["users"], chunk):
+            last = min(first + chunk, options["users"])
+            counts = self.create_chunk(
+                range(first, last), prefix, password_hash, options
+            )
+            for key, value in counts.items():
+                totals[key] += value
+            self.stdout.write(
+                f"  {last}/{options['users']} users "
+                f"({totals['tasks']} tasks, {perf_counter() - started:.1f}s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {totals['users']} users, {totals['beds']} beds, "
+            f"{totals['plants']} plants and {totals['tasks']} tasks "
+            f"in {perf_counter() - started:.1f}s."
+        ))
+
+    # ---------------------------------------------------------
+    # Generation
+    # ---------------------------------------------------------
+    @transaction.atomic
+    def create_chunk(self, indexes, prefix, password_hash, options):
+        """Create one chunk of users and all of their garden data."""
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"{prefix}{index:06d}",
+                    email=f"{prefix}{index:06d}@example.com",
+                    password=password_hash,
+                )
+                for index in indexes
+            ],
+            batch_size=self.batch_size,
+        )
+        # Not every backend returns primary keys from bulk_create.
+        if users and users[0].pk is None:
+            users = list(User.objects.filter(
+                username__in=[user.username for user in users]
+            ).order_by("username"))
+
+        counts = {"users": len(users), "beds": 0, "plants": 0, "tasks": 0}
+        by_shard = {}
+        for user in users:
+            by_shard.setdefault(shard_for_user(user.pk), []).append(user)
+        for alias, shard_users in by_shard.items():
+            # One transaction per shard (None is the default database)
+            with transaction.atomic(using=alias):
+                if alias is not None:
+                    User.objects.using(alias).bulk_create(
+                        [User(**user_copy_fields(user))
+                         for user in shard_users],
+                        batch_size=self.batch_size,
+                    )
+                gardens = self.create_gardens(shard_users, alias, options)
+            for key, value in gardens.items():
+                counts[key] += value
+        return counts
+
+    def create_gardens(self, users, alias, options):
+        """Create the beds, plants and tasks of ``users`` on ``alias``."""
+        beds = GardenBed.objects.using(alias).bulk_create(
+            [
+                bed
+                for user in users
+                for bed in self.build_beds(user, options["beds_per_user"])
+            ],
+            batch_size=self.batch_size,
+        )
+        beds_by_owner = {}
+        for bed in beds:
+            beds_by_owner.setdefault(bed.owner_id, []).append(bed)
+
+        plants = Plant.objects.using(alias).bulk_create(
+            [
+                plant
+                for user in users
+                for plant in self.build_plants(
+                    user,
+                    beds_by_owner.get(user.pk, []),
+                    options["plants_per_user"],
+                )
+            ],
+            batch_size=self.batch_size,
+        )
+
+        tasks = PlantTask.objects.using(alias).bulk_create(
+            [
+                task
+                for plant in plants
+                for task in self.build_tasks(
+                    plant, options["tasks_per_plant"]
+                )
+            ],
+            batch_size=self.batch_size,
+        )
+
+        return {
+            "beds": len(beds),
+            "plants": len(plants),
+            "tasks": len(tasks),
+        }
+
+    def build_beds(self, user, count):
+        """Beds with unique (case-insensitive) names for one user."""
+        names = self.rng.sample(BED_NAMES, min(count, len(BED_NAMES)))
+        # Numbered names once the pool runs out
+        names += [f"Bed {n}" for n in range(len(names) + 1, count + 1)]
+        return [
+            GardenBed(
+                owner=user,
+                name=name,
+                location=self.rng.choice(LOCATIONS),
+            )
+            for name in names
+        ]
+
+    def build_plants(self, user, beds, count):
+        plants = []
+        for n in range(count):
+            name, latin, plant_type, lifespan = self.rng.choice(PLANTS)
+            plants.append(Plant(
+                owner=user,
+                name=f"{name} {n + 1}",
+                latin_name=latin,
+                type=plant_type,
+                lifespan=lifespan,
+                # Roughly one plant in ten is not in any bed
+                bed=(
+                    self.rng.choice(beds)
+                    if beds and self.rng.random() > 0.1 else None
+                ),
+                planting_date=self.today - timedelta(
+                    days=self.rng.randint(0, 5 * 365)
+                ),
+            ))
+        return plants
+
+    def build_tasks(self, plant, count):
+        tasks = []
+        templates = self.rng.sample(TASKS, min(count, len(TASKS)))
+        for name, frequencies in templates:
+            all_year, start_month, end_month = self.rng.choice(
+                SEASONAL_WINDOWS
+            )
+            task = PlantTask(
+                user_id=plant.owner_id,
+                plant=plant,
+                name=name,
+                frequency=self.rng.choice(frequencies),
+                all_year=all_year,
+                seasonal_start_month=start_month,
+                seasonal_end_month=end_month,
+                # Roughly one task in ten is a one-off
+                repeat=self.rng.random() > 0.1,
+            )
+            self.schedule(task)
+            tasks.append(task)
+        return tasks
+
+    def schedule(self, task):
+        """
+        Give the task a realistic history and next due date.
+
+        - Some tasks have never been done (next_due from the season).
+        - A configurable share are overdue by up to two months.
+        - The rest are due today or within one frequency interval.
+        - Some one-off tasks have already been completed (inactive).
+        """
+        roll = self.rng.random()
+
+        if roll < 0.1:
+            # Brand new task: never done
+            task.next_due = task.calculate_next_due(from_date=self.today)
+            return
+
+        delta = task.get_frequency_delta()
+        interval = delta["days"] or delta["months"] * 30
+
+        if not task.repeat and roll < 0.3:
+            # Completed one-off task
+            task.mark_done(
+                self.today - timedelta(days=self.rng.randint(1, 365))
+            )
+            return
+
+        if roll < 0.1 + self.overdue_ratio:
+            due = self.today - timedelta(days=self.rng.randint(1, 60))
+        else:
+            due = self.today + timedelta(days=self.rng.randint(0, interval))
+
+        task.last_done = due - timedelta(days=interval)
+        task.next_due = due
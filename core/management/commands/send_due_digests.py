@@ -0,0 +1,162 @@
+"""
+Management command: email every user a digest of tasks due today and
+overdue.
+
+Due tasks for all users are read with a single query (see
+core.digests), emails are rendered in a pool of worker processes, and
+they are sent in batches over one email backend connection. Meant to run
+once a day, e.g. from the Heroku Scheduler.
+
+With sharding on, every shard is read in turn (one query each), or just
+the shards given with --shard, so shards can be split across jobs.
+
+Usage:
+    python manage.py send_due_digests
+    python manage.py send_due_digests --workers 8 --batch-size 1000
+    python manage.py send_due_digests --date 2026-05-01 --dry-run
+    python manage.py send_due_digests --shard shard_a --shard shard_b
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import batched, chain, repeat
+
+import django
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand, CommandError
+
+from core.digests import due_digests, render_digests
+from core.sharding import shard_databases
+
+
+class Command(BaseCommand):
+    help = "Email each user a digest of their due and overdue tasks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            help="Send the digests for this day (YYYY-MM-DD, default today).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=min(4, os.cpu_count() or 1),
+            help="Processes rendering emails (1 renders in this process).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=200,
+            help="Digests handed to a worker at a time.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Emails passed to the email backend at a time.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Render the emails but do not send them.",
+        )
+        parser.add_argument(
+            "--shard",
+            action="append",
+            dest="shards",
+            help="Only send to users on this shard (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            today = (
+                date.fromisoformat(options["date"])
+                if options["date"] else date.today()
+            )
+        except ValueError:
+            raise CommandError(f"Invalid --date: {options['date']}")
+        for name in ("workers", "chunk_size", "batch_size"):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be >= 1")
+        databases = shard_databases()
+        if options["shards"]:
+            unknown = sorted(set(options["shards"]) - set(settings.SHARDS))
+            if unknown:
+                raise CommandError(f"Unknown shard: {', '.join(unknown)}")
+            databases = options["shards"]
+
+        started = time.perf_counter()
+        digests = chain.from_iterable(
+            due_digests(today, using=alias) for alias in databases
+        )
+        chunks = batched(digests, options["chunk_size"])
+
+        if options["workers"] == 1:
+            self.send(
+                map(render_digests, chunks, repeat(settings.SITE_URL)),
+                options,
+            )
+        else:
+            # spawn, so workers do not inherit the open database cursor
+            with ProcessPoolExecutor(
+                max_workers=options["workers"],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            ) as pool:
+                self.send(
+                    self.render_in_pool(pool, chunks, options["workers"]),
+                    options,
+                )
+
+        elapsed = time.perf_counter() - started
+        prefix = "[dry run] " if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Sent {self.sent} digest{'s' if self.sent != 1 else ''}"
+            f" for {today.isoformat()} in {elapsed:.1f}s."
+        ))
+
+    def render_in_pool(self, pool, chunks, workers):
+        """
+        Render chunks in ``pool``, a round of two per worker at a time.
+        Executor.map() submits its whole input at once, which would read
+        every digest into memory before the first email is sent.
+        """
+        for round_chunks in batched(chunks, 2 * workers):
+            yield from pool.map(
+                render_digests, round_chunks, repeat(settings.SITE_URL)
+            )
+
+    def send(self, rendered_chunks, options):
+        """
+        Send rendered emails in batches over a single connection.
+        """
+        self.sent = 0
+        connection = get_connection()
+        batch = []
+
+        def flush():
+            if options["dry_run"]:
+                self.sent += len(batch)
+            else:
+                self.sent += connection.send_messages(batch) or 0
+            batch.clear()
+
+        if not options["dry_run"]:
+            connection.open()
+        try:
+            for chunk in rendered_chunks:
+                for subject, body, recipient in chunk:
+                    batch.append(EmailMessage(
+                        subject, body, settings.DEFAULT_FROM_EMAIL,
+                        [recipient], connection=connection,
+                    ))
+                    if len(batch) >= options["batch_size"]:
+                        flush()
+            if batch:
+                flush()
+        finally:
+            connection.close()
@@ -0,0 +1,95 @@
+"""
+Per-request performance metrics.
+
+RequestTimingMiddleware starts a RequestMetrics object for every request
+and stores it in a context variable. Any code that runs during the request
+(the SQL execute wrapper, the timed template backend, cache lookups...)
+can then record against it without the object being passed around.
+
+All record_* helpers are no-ops outside a request (management commands,
+tests calling functions directly), so callers never need to check.
+"""
+
+from contextvars import ContextVar
+from time import perf_counter
+
+_current = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    Counters and timings collected while a single request is handled.
+
+    Durations are stored in seconds; use the *_ms properties for output.
+    """
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Extra named durations, e.g. {"hash": 0.25}
+        self.timings = {}
+
+    @property
+    def total_ms(self):
+        return (perf_counter() - self.started) * 1000
+
+    @property
+    def db_ms(self):
+        return self.db_time * 1000
+
+    @property
+    def template_ms(self):
+        return self.template_time * 1000
+
+
+def start():
+    """
+    Begin collecting metrics for a request.
+    Returns (metrics, token); pass the token to finish().
+    """
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def finish(token):
+    """Stop collecting metrics for the request that owns ``token``."""
+    _current.reset(token)
+
+
+def current():
+    """Return the active RequestMetrics, or None outside a request."""
+    return _current.get()
+
+
+def record_query(duration):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.db_queries += 1
+        metrics.db_time += duration
+
+
+def record_template(duration):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.template_time += duration
+
+
+def record_cache(hit):
+    """Record a cache lookup; ``hit`` is True when a value was found."""
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+def record_timing(name, duration):
+    """Add ``duration`` seconds to a named timing (summed per request)."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.timings[name] = metrics.timings.get(name, 0.0) + duration
@@ -0,0 +1,455 @@
+"""
+Custom middleware for the Garden Timekeeper project.
+
+RequestTimingMiddleware
+    Records where the time goes for every request (total, SQL, template
+    rendering, cache lookups), exposes the numbers to staff in a
+    Server-Timing header and writes one structured JSON log line per
+    request so slow views can be found in the production logs.
+
+ShardPinningMiddleware
+    Sends the logged-in user's queries to their shard when sharding is
+    configured (see core.sharding).
+
+ReplicaRoutingMiddleware
+    Serves read-only views from a read replica, except just after the
+    browser has written something (see core.replicas).
+
+ProfilingMiddleware
+    Lets staff run a single real request under a profiler by adding
+    ?_profile=sample (or cprofile) to the URL, returning a flame-graph
+    compatible report instead of the page.
+
+StaticFilesMiddleware
+    WhiteNoise, able to run in an async middleware chain.
+
+All of them work in both sync (WSGI) and async (ASGI) chains, like
+Django's own middleware. A sync-only middleware anywhere in the chain
+makes Django run everything below it in a thread that stays blocked in
+async_to_sync for the whole request, so the async views would hold a
+thread each just as under WSGI.
+"""
+
+import json
+import logging
+import random
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+
+from asgiref.sync import (
+    iscoroutinefunction, markcoroutinefunction, sync_to_async,
+)
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.functional import empty
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import metrics
+from .profiling import PROFILE_MODES, run_profiled
+from .replicas import (
+    _read_db, astreaming_from, mark_wrote, reads_from_replica,
+    recently_wrote, streaming_from, use_replica,
+)
+from .sharding import (
+    astreaming_on, shard_for_user, streaming_on, use_shard,
+)
+
+logger = logging.getLogger("core.request_timing")
+
+
+class SyncAndAsyncMiddleware:
+    """
+    Base for middleware that runs in sync and async chains. As in
+    Django's MiddlewareMixin, __call__ returns the coroutine from
+    __acall__ when the rest of the chain is async.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            # Tells Django to await __call__
+            markcoroutinefunction(self)
+
+
+class RequestTimingMiddleware(SyncAndAsyncMiddleware):
+    """
+    Collect per-request timing metrics.
+
+    This should be the FIRST entry in MIDDLEWARE so that the total time
+    includes every other middleware.
+
+    - SQL: every database connection is wrapped with an execute wrapper
+      that counts queries and sums their duration.
+    - Templates: core.template_backends.TimedDjangoTemplates records
+      render time (configured in TEMPLATES).
+    - Cache: the core.cache_backends classes record every read
+      (configured in CACHES).
+
+    The Server-Timing header is only added for staff users (or when DEBUG
+    is on) because it reveals internal details about the request.
+    """
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request_metrics, token = metrics.start()
+        try:
+            with ExitStack() as stack:
+                self._wrap_connections(stack)
+                response = self.get_response(request)
+        finally:
+            metrics.finish(token)
+        return self._finish(request, response, request_metrics)
+
+    async def __acall__(self, request):
+        request_metrics, token = metrics.start()
+        try:
+            with ExitStack() as stack:
+                # Connections belong to a thread: wrap the ones of the
+                # thread the request's sync_to_async calls (the ORM) run in
+                await sync_to_async(self._wrap_connections)(stack)
+                response = await self.get_response(request)
+        finally:
+            metrics.finish(token)
+        return self._finish(request, response, request_metrics)
+
+    def _wrap_connections(self, stack):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self._time_query))
+
+    def _finish(self, request, response, request_metrics):
+        total_ms = request_metrics.total_ms
+
+        if self._can_see_timings(request):
+            response["Server-Timing"] = self._server_timing(
+                request_metrics, total_ms
+            )
+
+        self._log(request, response, request_metrics, total_ms)
+
+        return response
+
+    @staticmethod
+    def _time_query(execute, sql, params, many, context):
+        """Database execute wrapper: time each query."""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.record_query(perf_counter() - start)
+
+    @staticmethod
+    def _can_see_timings(request):
+        if settings.DEBUG:
+            return True
+        user = getattr(request, "user", None)
+        return bool(user is not None and user.is_staff)
+
+    @staticmethod
+    def _server_timing(request_metrics, total_ms):
+        """
+        Build the Server-Timing header value.
+        Example: total;dur=12.5, db;dur=3.1;desc="4 queries", tpl;dur=6.0
+        """
+        entries = [
+            f"total;dur={total_ms:.1f}",
+            (
+                f"db;dur={request_metrics.db_ms:.1f};"
+                f'desc="{request_metrics.db_queries} queries"'
+            ),
+            f"tpl;dur={request_metrics.template_ms:.1f}",
+            (
+                f'cache;desc="{request_metrics.cache_hits} hits, '
+                f'{request_metrics.cache_misses} misses"'
+            ),
+        ]
+        entries += [
+            f"{name};dur={duration * 1000:.1f}"
+            for name, duration in request_metrics.timings.items()
+        ]
+        return ", ".join(entries)
+
+    @staticmethod
+    def _log(request, response, request_metrics, total_ms):
+        """Write one JSON line describing the request."""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
+        match = getattr(request, "resolver_match", None)
+        user = getattr(request, "user", None)
+        # Only read the user id if authentication has already loaded it,
+        # so logging never triggers an extra query.
+        user_id = None
+        if user is not None and getattr(user, "_wrapped", None) is not empty:
+            user_id = getattr(user, "pk", None)
+
+        record = {
+            "event": "request",
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "user_id": user_id,
+            "read_db": getattr(request, "read_db", None),
+            "shard": getattr(request, "shard", None),
+            "total_ms": round(total_ms, 1),
+            "db_queries": request_metrics.db_queries,
+            "db_ms": round(request_metrics.db_ms, 1),
+            "template_ms": round(request_metrics.template_ms, 1),
+            "cache_hits": request_metrics.cache_hits,
+            "cache_misses": request_metrics.cache_misses,
+        }
+        for name, duration in request_metrics.timings.items():
+            record[f"{name}_ms"] = round(duration * 1000, 1)
+
+        logger.info(json.dumps(record))
+
+
+class ShardPinningMiddleware(SyncAndAsyncMiddleware):
+    """
+    Pin the logged-in user's shard for the whole request, including
+    streamed content, and record it as request.shard.
+
+    Place it after AuthenticationMiddleware. It removes itself from the
+    chain when sharding is off.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SHARDS:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request.shard = None
+        if request.user.is_authenticated:
+            request.shard = shard_for_user(request.user.pk)
+        if request.shard is None:
+            return self.get_response(request)
+
+        with use_shard(request.shard):
+            response = self.get_response(request)
+        return self._stream_on_shard(request, response)
+
+    async def __acall__(self, request):
+        request.shard = None
+        # Loaded once here; the views and templates reuse it
+        request.user = await request.auser()
+        if request.user.is_authenticated:
+            request.shard = shard_for_user(request.user.pk)
+        if request.shard is None:
+            return await self.get_response(request)
+
+        with use_shard(request.shard):
+            response = await self.get_response(request)
+        return self._stream_on_shard(request, response)
+
+    @staticmethod
+    def _stream_on_shard(request, response):
+        if response.streaming:
+            stream = astreaming_on if response.is_async else streaming_on
+            response.streaming_content = stream(
+                request.shard, response.streaming_content
+            )
+        return response
+
+
+class ReplicaRoutingMiddleware(SyncAndAsyncMiddleware):
+    """
+    Route the reads of read-only views to a random READ_REPLICAS
+    database, and keep a browser on the primary for a few seconds after
+    any successful write (POST etc.).
+
+    Place it after AuthenticationMiddleware. It removes itself from the
+    chain when no replicas are configured.
+    """
+
+    def __init__(self, get_response):
+        if not settings.READ_REPLICAS:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request.read_db = None
+        # process_view() picks the replica; leaving the block puts the
+        # routing back once the response has been rendered
+        with use_replica(None):
+            response = self.get_response(request)
+        return self._finish(request, response)
+
+    async def __acall__(self, request):
+        request.read_db = None
+        with use_replica(None):
+            response = await self.get_response(request)
+        return self._finish(request, response)
+
+    @staticmethod
+    def _finish(request, response):
+        if request.read_db and response.streaming:
+            stream = astreaming_from if response.is_async else streaming_from
+            response.streaming_content = stream(
+                request.read_db, response.streaming_content
+            )
+        if request.method not in ("GET", "HEAD", "OPTIONS", "TRACE") \
+                and response.status_code < 400:
+            mark_wrote(response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # In an async chain Django runs this in a thread and copies the
+        # context variable back, so no token is kept to reset it with
+        if (
+            request.method in ("GET", "HEAD")
+            and reads_from_replica(view_func)
+            and not recently_wrote(request)
+        ):
+            request.read_db = random.choice(settings.READ_REPLICAS)
+            _read_db.set(request.read_db)
+        return None
+
+
+class ProfilingMiddleware(SyncAndAsyncMiddleware):
+    """
+    Profile a single request on demand.
+
+    A staff user adds ``?_profile=sample`` (sampling profiler, folded
+    stacks for flame graphs) or ``?_profile=cprofile`` (deterministic
+    profiler, pstats text) to any URL - or sends the same value in an
+    ``X-Profile`` header. The view runs normally under the profiler and
+    the report is returned instead of the page (and also written to
+    PROFILING_REPORT_DIR when that setting is configured).
+
+    Safeguards:
+      - Disabled unless PROFILING_ENABLED is True (the middleware removes
+        itself from the chain, so there is no overhead when off).
+      - Staff only: for anyone else the parameter is silently ignored.
+      - Rate limited per staff user (PROFILING_RATE_LIMIT_SECONDS).
+      - Reports contain code locations and timings only (see
+        core.profiling), and only ever profile the staff user's own
+        request, so no other user's data can end up in a report.
+
+    Place this LAST in MIDDLEWARE so only the view itself is profiled.
+    process_view() is synchronous: in an async chain Django runs it in a
+    thread, which only matters for the staff request being profiled.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        mode = (
+            request.GET.get("_profile")
+            or request.headers.get("X-Profile")
+        )
+        if not mode:
+            return None
+
+        user = getattr(request, "user", None)
+        if not (user and user.is_active and user.is_staff):
+            return None
+
+        if mode not in PROFILE_MODES:
+            mode = "sample"
+
+        # cache.add() is atomic: it only succeeds if the key is absent.
+        rate_limit = getattr(settings, "PROFILING_RATE_LIMIT_SECONDS", 30)
+        if not cache.add(f"profiling:{user.pk}", 1, timeout=rate_limit):
+            return HttpResponse(
+                f"Profiling is limited to one request every {rate_limit} "
+                "seconds. Please try again shortly.",
+                status=429,
+                content_type="text/plain",
+            )
+
+        # Async views (core.async_views) are run to completion
+        response, report = run_profiled(
+            mode,
+            view_func,
+            request,
+            *view_args,
+            sample_interval=getattr(
+                settings, "PROFILING_SAMPLE_INTERVAL", 0.001
+            ),
+            **view_kwargs,
+        )
+        # Render lazy (TemplateResponse) views inside the profile as well.
+        if hasattr(response, "render") and callable(response.render):
+            response.render()
+
+        view_name = request.resolver_match.view_name
+        extension = "txt" if mode == "cprofile" else "folded"
+        filename = (
+            f"{datetime.now():%Y%m%d-%H%M%S}-{view_name}-{mode}.{extension}"
+        )
+        self._store(filename, report)
+
+        profile_response = HttpResponse(report, content_type="text/plain")
+        profile_response["Content-Disposition"] = (
+            f'inline; filename="{filename}"'
+        )
+        profile_response["X-Profile-Status"] = str(response.status_code)
+        return profile_response
+
+    @staticmethod
+    def _store(filename, report):
+        """Write the report to PROFILING_REPORT_DIR, if configured."""
+        report_dir = getattr(settings, "PROFILING_REPORT_DIR", None)
+        if not report_dir:
+            return
+        path = Path(report_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        (path / filename).write_text(report)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware that can also run in an async chain. Finding a
+    static file is a dictionary lookup (a stat() with autorefresh in
+    development), so it is done in the event loop, as WhiteNoise's own
+    __call__ does it; the file itself is streamed by Django's handler.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,65 @@
+# Generated by Django 6.0.2 on 2026-10-19 05:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_planttask_task_name_not_blank_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlantTaskRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('done_count', models.PositiveIntegerField(default=0)),
+                ('skipped_count', models.PositiveIntegerField(default=0)),
+                ('on_time_count', models.PositiveIntegerField(default=0)),
+                ('plant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_rollups', to='core.plant')),
+            ],
+            options={
+                'ordering': ['month'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('plant', 'month'), name='unique_plant_task_rollup_month')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskCompletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('done', 'Done'), ('skip', 'Skipped')], max_length=4)),
+                ('done_on', models.DateField()),
+                ('due_on', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('plant', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='completions', to='core.plant')),
+                ('task', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='completions', to='core.planttask')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_completions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-done_on', '-id'],
+                'indexes': [models.Index(fields=['user', 'done_on'], name='core_taskco_user_id_da984f_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserTaskRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('done_count', models.PositiveIntegerField(default=0)),
+                ('skipped_count', models.PositiveIntegerField(default=0)),
+                ('on_time_count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['month'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('user', 'month'), name='unique_user_task_rollup_month')],
+            },
+        ),
+    ]
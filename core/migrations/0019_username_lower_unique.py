@@ -0,0 +1,42 @@
+"""
+Unique functional index on LOWER(username) for the user table.
+
+CaseInsensitiveUsernameBackend looks users up by LOWER(username); this
+index makes that an index lookup instead of a scan of every user, and
+enforces at the database level what registration already checks (no two
+usernames differing only in case). The user model belongs to
+django.contrib.auth, so the constraint is added with the schema editor
+rather than declared on a model here.
+"""
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+CONSTRAINT = models.UniqueConstraint(
+    Lower("username"), name="auth_user_username_lower_uniq"
+)
+
+
+def user_model(apps):
+    return apps.get_model(settings.AUTH_USER_MODEL)
+
+
+def add_constraint(apps, schema_editor):
+    schema_editor.add_constraint(user_model(apps), CONSTRAINT)
+
+
+def remove_constraint(apps, schema_editor):
+    schema_editor.remove_constraint(user_model(apps), CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("core", "0018_task_change_feed"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_constraint, remove_constraint),
+    ]
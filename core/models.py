@@ -6,7 +6,9 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.db.models.functions import Lower
 from django.conf import settings
+from django.utils import timezone
 from calendar import monthrange
+import secrets
 from datetime import date, timedelta
 # from django.utils import timezone
 from cloudinary.models import CloudinaryField
@@ -133,7 +135,9 @@ class Plant(models.Model):
     notes = models.TextField(blank=True)
 
     # Store images in Cloudinary - not locally or they won't display in Prod.
-    image = CloudinaryField("image", blank=True, null=True)
+    image = CloudinaryField(
+        "image", blank=True, null=True, folder=settings.PLANT_IMAGE_FOLDER
+    )
 
     class Meta:
         constraints = [
@@ -173,6 +177,12 @@ class PlantTask(models.Model):
                 condition=~models.Q(frequency=""),
             ),
         ]
+        indexes = [
+            # Date range scans by the digest and reminder commands
+            models.Index(
+                fields=["next_due", "active"], name="task_next_due_idx"
+            ),
+        ]
 
     # link to User
     user = models.ForeignKey(
@@ -260,6 +270,9 @@ class PlantTask(models.Model):
     # Active flag
     active = models.BooleanField(default=True)
 
+    # next_due the reminder worker last sent a reminder for
+    reminded_for = models.DateField(null=True, blank=True, editable=False)
+
     def __str__(self):
         return f"{self.name} ({self.plant.name})"
 
@@ -372,12 +385,30 @@ class PlantTask(models.Model):
 
         return next_date
 
+    # Fields mark_done() and skip() may change
+    SCHEDULE_FIELDS = ["last_done", "next_due", "active"]
+
+    def _changed_schedule_fields(self, before):
+        """
+        Returns the SCHEDULE_FIELDS whose values differ from ``before``,
+        a tuple of their previous values.
+        """
+        return [
+            field
+            for field, old_value in zip(self.SCHEDULE_FIELDS, before)
+            if getattr(self, field) != old_value
+        ]
+
     def mark_done(self, done_date=None):
         """
         Marks the task as completed.
         Updates last_done and calculates the next due date if repeating.
         Does not save the model — the caller should save().
+
+        Returns the names of the fields that changed, so the caller can
+        save with update_fields.
         """
+        before = (self.last_done, self.next_due, self.active)
 
         # 1. Set last_done
         self.last_done = done_date or date.today()
@@ -386,12 +417,12 @@ class PlantTask(models.Model):
         if not self.repeat:
             self.active = False
             self.next_due = None
-            return self
+            return self._changed_schedule_fields(before)
 
         # 3. Calculate next due date
         self.next_due = self.calculate_next_due(from_date=self.last_done)
 
-        return self
+        return self._changed_schedule_fields(before)
 
     def skip(self):
         """
@@ -399,7 +430,10 @@ class PlantTask(models.Model):
         Moves next_due forward by one frequency interval.
         Does not modify last_done.
         Does not save the model — the caller should save().
+
+        Returns the names of the fields that changed, like mark_done().
         """
+        before = (self.last_done, self.next_due, self.active)
 
         # 1. Determine the starting point
         current = self.next_due or date.today()
@@ -420,7 +454,27 @@ class PlantTask(models.Model):
         # 5. Update the task
         self.next_due = next_date
 
-        return self
+        return self._changed_schedule_fields(before)
+
+    def save_if_unchanged(self, fields, expected_next_due):
+        """
+        Writes only ``fields``, and only if next_due in the database is
+        still ``expected_next_due`` (the value this instance was loaded
+        with). This is a single conditional UPDATE, so when two devices
+        act on the same task at once only the first one wins.
+
+        Returns True if the row was updated, False on a conflict.
+        """
+        if not fields:
+            return True
+        updated = PlantTask.objects.filter(
+            pk=self.pk, next_due=expected_next_due
+        ).update(**{field: getattr(self, field) for field in fields})
+        if updated:
+            # update() skips the post_save signal
+            UserDataVersion.bump(self.user_id)
+            TaskChange.record([self.pk])
+        return updated == 1
 
     def is_overdue(self):
         """
@@ -433,3 +487,275 @@ class PlantTask(models.Model):
         Returns number of days until the task is next due
         """
         return (self.next_due - date.today()).days if self.next_due else None
+
+    def due_status(self, today=None):
+        """
+        Returns the dashboard status of the task:
+        "overdue", "due-today", "scheduled", or "" when nothing is due.
+        """
+        if not self.next_due:
+            return ""
+        today = today or date.today()
+        if self.next_due < today:
+            return "overdue"
+        if self.next_due == today:
+            return "due-today"
+        return "scheduled"
+
+
+# ================= TASK HISTORY MODELS =================
+
+
+class TaskAction(models.TextChoices):
+    """
+    What happened to a task in a TaskCompletion event.
+    """
+    # Constant = DBValue, Label
+    DONE = "done", "Done"
+    SKIP = "skip", "Skipped"
+
+
+class TaskCompletion(models.Model):
+    """
+    Append-only history of tasks being marked done or skipped.
+
+    mark_done() overwrites PlantTask.last_done, so every action is also
+    recorded here. Rows are never updated. The task and plant links are
+    kept as NULL if those are deleted, so the history survives.
+    """
+
+    task = models.ForeignKey(
+        PlantTask,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="completions"
+    )
+    plant = models.ForeignKey(
+        Plant,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="completions"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="task_completions"
+    )
+    action = models.CharField(max_length=4, choices=TaskAction.choices)
+    done_on = models.DateField()
+    # next_due when the action happened, to tell on-time from late
+    due_on = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-done_on", "-id"]
+        indexes = [
+            models.Index(fields=["user", "done_on"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_action_display()} on {self.done_on}"
+
+    @property
+    def on_time(self):
+        return (
+            self.action == TaskAction.DONE
+            and (self.due_on is None or self.done_on <= self.due_on)
+        )
+
+
+class TaskRollup(models.Model):
+    """
+    Monthly counts of TaskCompletion events.
+
+    Maintained incrementally as events are written (see core.history),
+    so statistics read one row per month instead of every event.
+    ``month`` is always the first day of the month.
+    """
+
+    month = models.DateField()
+    done_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    on_time_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        ordering = ["month"]
+
+
+class UserTaskRollup(TaskRollup):
+    """
+    Monthly task history for one user.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="task_rollups"
+    )
+
+    class Meta(TaskRollup.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "month"],
+                name="unique_user_task_rollup_month"
+            ),
+        ]
+
+
+class PlantTaskRollup(TaskRollup):
+    """
+    Monthly task history for one plant.
+    """
+
+    plant = models.ForeignKey(
+        Plant,
+        on_delete=models.CASCADE,
+        related_name="task_rollups"
+    )
+
+    class Meta(TaskRollup.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["plant", "month"],
+                name="unique_plant_task_rollup_month"
+            ),
+        ]
+
+
+# ================= CACHE VERSION MODELS =================
+
+
+class UserDataVersion(models.Model):
+    """
+    A counter bumped whenever a user's plants or tasks change.
+
+    Per-user caches (the workload heatmap, calendar feed ETags) include
+    the version in their key, so any change makes old entries unused
+    without deleting them. Model saves and deletes bump the version via
+    core.signals; code using update() or bulk_update() calls bump().
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="data_version"
+    )
+    version = models.PositiveBigIntegerField(default=1)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.user} v{self.version}"
+
+    @classmethod
+    def bump(cls, user_id):
+        """
+        Increment the user's version. Only an UPDATE, so it is safe while
+        the user is being deleted; users without a row yet have nothing
+        cached, and get their row from current().
+        """
+        cls.objects.filter(user_id=user_id).update(
+            version=models.F("version") + 1,
+            updated_at=timezone.now(),
+        )
+
+    @classmethod
+    def current(cls, user_id):
+        """
+        The user's UserDataVersion, created on first use. It is read from
+        the same database as the request's other reads (a replica in a
+        read-only view), so it matches the rows it versions; only a
+        missing row is created on the primary.
+        """
+        version = cls.objects.filter(user_id=user_id).first()
+        if version is None:
+            version = cls.objects.get_or_create(user_id=user_id)[0]
+        return version
+
+
+# ================= CHANGE FEED MODELS =================
+
+
+class TaskChange(models.Model):
+    """
+    Append-only feed of tasks whose schedule may have changed.
+
+    Written whenever a task is saved, deleted or updated in bulk, so the
+    reminder worker (core.reminders) can follow changes by reading rows
+    after the last id it saw instead of rescanning every task. task_id is
+    not a foreign key, so deletions are recorded too. Rows older than
+    TASK_CHANGE_RETENTION_DAYS are removed by the housekeeping command.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    task_id = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"Task {self.task_id} changed at {self.created_at}"
+
+    @classmethod
+    def record(cls, task_ids):
+        cls.objects.bulk_create([cls(task_id=pk) for pk in task_ids])
+
+
+# ================= CALENDAR FEED MODELS =================
+
+
+def new_feed_token():
+    return secrets.token_urlsafe(32)
+
+
+class CalendarFeed(models.Model):
+    """
+    The secret token in a user's iCalendar feed URL.
+
+    Calendar apps cannot log in, so the token is the only thing
+    protecting the feed. Resetting it breaks every existing
+    subscription.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="calendar_feed"
+    )
+    token = models.CharField(
+        max_length=64, unique=True, default=new_feed_token
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Calendar feed for {self.user}"
+
+    def reset(self):
+        """Replace the token, so the old feed URL stops working."""
+        self.token = new_feed_token()
+        self.save(update_fields=["token"])
+
+
+# ================= ACCOUNT DELETION MODELS =================
+
+
+class PendingDeletion(models.Model):
+    """
+    An account the user has asked to delete.
+
+    The user is deactivated at once and their data is purged in the
+    background (see core.purge), then the user row is deleted, which
+    removes this row too.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="pending_deletion"
+    )
+    requested_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["requested_at"]
+
+    def __str__(self):
+        return f"Deletion of {self.user} requested {self.requested_at}"
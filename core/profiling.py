@@ -0,0 +1,155 @@
+"""
+On-demand profilers used by ProfilingMiddleware.
+
+Two modes are supported, both using only the standard library:
+
+sample
+    A lightweight sampling profiler. A background thread snapshots the
+    request thread's call stack every few milliseconds and counts how
+    often each stack was seen. The report is in "folded stacks" format
+    (one "frame;frame;frame count" line per stack), which can be loaded
+    straight into speedscope.app or flamegraph.pl.
+
+cprofile
+    Python's deterministic cProfile, reported as pstats text sorted by
+    cumulative time.
+
+Async views are run to completion with async_to_sync, which runs them
+in an event loop on another thread, and their sync_to_async calls (the
+ORM) back in the calling thread. The profiler is therefore
+started inside the coroutine, and the sampler follows both threads.
+Under ASGI that loop is the server's own, so stacks from other requests
+running alongside can appear in a sampled report.
+
+Reports only ever contain code locations (file, function, line) and
+timings - never arguments, local variables, SQL parameters or response
+content - so a report cannot leak another user's data.
+"""
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+from asyncio import iscoroutinefunction
+from collections import Counter
+from pathlib import Path
+
+from asgiref.sync import async_to_sync
+
+PROFILE_MODES = ("sample", "cprofile")
+
+
+class StackSampler:
+    """
+    Sample the call stacks of one or more threads at a fixed interval.
+
+    Usage:
+        sampler = StackSampler(threading.get_ident(), interval=0.001)
+        with sampler:
+            do_work()
+        report = sampler.folded()
+    """
+
+    def __init__(self, *thread_ids, interval=0.001):
+        self.thread_ids = thread_ids
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in self.thread_ids:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.counts[self._stack(frame)] += 1
+
+    @staticmethod
+    def _stack(frame):
+        """Return the stack as a root-first "a;b;c" string."""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            filename = Path(code.co_filename).name
+            # ';' separates frames in the folded format
+            names.append(
+                f"{code.co_name} ({filename}:{code.co_firstlineno})"
+                .replace(";", ",")
+            )
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def folded(self):
+        """Return the samples in folded-stacks (flame graph) format."""
+        return "\n".join(
+            f"{stack} {count}"
+            for stack, count in sorted(self.counts.items())
+        ) + "\n"
+
+
+def _start_profiler(mode, thread_ids, sample_interval):
+    """
+    Start the requested profiler in the current thread (the sampler
+    follows ``thread_ids``). Returns a function that stops it and
+    returns the report text.
+    """
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def stop():
+            profiler.disable()
+            stream = io.StringIO()
+            stats = pstats.Stats(profiler, stream=stream)
+            stats.sort_stats("cumulative").print_stats(60)
+            return stream.getvalue()
+        return stop
+
+    sampler = StackSampler(*thread_ids, interval=sample_interval)
+    sampler.__enter__()
+
+    def stop():
+        sampler.__exit__(None, None, None)
+        return sampler.folded()
+    return stop
+
+
+def run_profiled(mode, func, *args, sample_interval=0.001, **kwargs):
+    """
+    Call ``func(*args, **kwargs)`` under the requested profiler; a
+    coroutine function is run to completion.
+
+    Returns (result, report_text). Exceptions raised by ``func`` are
+    propagated unchanged.
+    """
+    caller = threading.get_ident()
+
+    if iscoroutinefunction(func):
+        async def profiled():
+            stop = _start_profiler(
+                mode, (threading.get_ident(), caller), sample_interval
+            )
+            try:
+                result = await func(*args, **kwargs)
+            finally:
+                report = stop()
+            return result, report
+        return async_to_sync(profiled)()
+
+    stop = _start_profiler(mode, (caller,), sample_interval)
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        report = stop()
+    return result, report
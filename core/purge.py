@@ -0,0 +1,183 @@
+"""
+Background deletion of user accounts.
+
+user.delete() makes Django's collector load every related bed, plant,
+task and history row into memory to emulate the cascades and send
+signals, which takes minutes and hundreds of megabytes for a large
+garden. Instead, delete_account deactivates the user and records a
+PendingDeletion. purge_user() then deletes the user's rows a batch at a
+time, one table after another (children first), with plain
+``DELETE ... WHERE id IN (...)`` statements. Each batch is its own short
+transaction, so a purge can stop at any point and simply be run again.
+When the garden is gone the user row itself is deleted with delete(),
+which by then only has a handful of rows left to cascade to.
+
+Purges start in a background thread as soon as the request commits;
+the purge_accounts command finishes any that were interrupted.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import batched
+
+import cloudinary.api
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import F, Q
+
+from .models import (
+    GardenBed, PendingDeletion, Plant, PlantTask, PlantTaskRollup,
+    TaskChange, TaskCompletion, UserTaskRollup,
+)
+from .sharding import pinned_to_user
+
+logger = logging.getLogger(__name__)
+
+# Cloudinary's Admin API deletes at most 100 resources per call
+IMAGE_BATCH_SIZE = 100
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def purge_steps(user_id):
+    """(label, queryset) pairs for a user's rows, children first."""
+    return [
+        ("history", TaskCompletion.objects.filter(user_id=user_id)),
+        ("rollups", UserTaskRollup.objects.filter(user_id=user_id)),
+        ("rollups",
+         PlantTaskRollup.objects.filter(plant__owner_id=user_id)),
+        ("tasks", PlantTask.objects.filter(
+            Q(user_id=user_id) | Q(plant__owner_id=user_id)
+        )),
+        ("plants", Plant.objects.filter(owner_id=user_id)),
+        ("beds", GardenBed.objects.filter(owner_id=user_id)),
+    ]
+
+
+def delete_images(images):
+    """
+    Delete plant images from Cloudinary. Failures are logged, not
+    raised: the database rows are already gone, and orphaned images are
+    only wasted storage.
+    """
+    public_ids = [
+        getattr(image, "public_id", image) for image in images if image
+    ]
+    if not public_ids:
+        return 0
+
+    deleted = 0
+    for batch in batched(public_ids, IMAGE_BATCH_SIZE):
+        try:
+            cloudinary.api.delete_resources(list(batch))
+        except Exception:
+            logger.exception("Could not delete %s images", len(batch))
+        else:
+            deleted += len(batch)
+    return deleted
+
+
+def purge_user(user_id, batch_size=None, progress=None):
+    """
+    Delete a user and everything they own in batches of ``batch_size``
+    rows. ``progress(label, count)`` is called after each batch.
+    Returns the rows deleted per label.
+    """
+    batch_size = batch_size or settings.ACCOUNT_PURGE_BATCH_SIZE
+    with pinned_to_user(user_id):
+        totals = _purge_rows(user_id, batch_size, progress)
+    get_user_model().objects.filter(pk=user_id).delete()
+    return totals
+
+
+def _purge_rows(user_id, batch_size, progress=None):
+    totals = {}
+    for label, queryset in purge_steps(user_id):
+        totals.setdefault(label, 0)
+        model = queryset.model
+        while True:
+            if model is Plant:
+                rows = list(
+                    queryset.values_list("pk", "image")[:batch_size]
+                )
+                pks = [pk for pk, _ in rows]
+            else:
+                pks = list(
+                    queryset.values_list("pk", flat=True)[:batch_size]
+                )
+            if not pks:
+                break
+
+            batch = model._base_manager.filter(pk__in=pks)
+            with transaction.atomic(using=batch.db):
+                # One DELETE, without loading rows or sending signals;
+                # the rows that pointed at these are already gone
+                count = batch._raw_delete(batch.db)
+                if model is PlantTask:
+                    # Signals are skipped, so tell the reminder worker
+                    TaskChange.record(pks)
+            if model is Plant:
+                delete_images(image for _, image in rows)
+
+            totals[label] += count
+            if progress:
+                progress(label, count)
+    return totals
+
+
+def purge_pending(pending_id, batch_size=None, progress=None):
+    """
+    Purge the account behind a PendingDeletion, if it is still pending.
+    Returns the totals from purge_user(), or None if there was nothing
+    to do.
+    """
+    pending = PendingDeletion.objects.filter(pk=pending_id)
+    user_id = pending.values_list("user_id", flat=True).first()
+    if user_id is None:
+        return None
+    pending.update(attempts=F("attempts") + 1)
+    totals = purge_user(user_id, batch_size, progress)
+    logger.info("Purged user %s: %s", user_id, totals)
+    return totals
+
+
+def purge_pool():
+    """The process-wide purge thread, created on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="account-purge"
+                )
+    return _pool
+
+
+def _purge_in_thread(pending_id):
+    try:
+        purge_pending(pending_id)
+    except Exception:
+        # Left pending; purge_accounts will retry it
+        logger.exception("Purge of PendingDeletion %s failed", pending_id)
+    finally:
+        connection.close()
+
+
+def request_deletion(user):
+    """
+    Deactivate ``user`` and queue their account for purging. With
+    ACCOUNT_PURGE_IN_PROCESS the purge starts in a background thread
+    once the current transaction commits.
+    """
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=["is_active"])
+        pending, _ = PendingDeletion.objects.get_or_create(user=user)
+        if settings.ACCOUNT_PURGE_IN_PROCESS:
+            transaction.on_commit(
+                lambda: purge_pool().submit(_purge_in_thread, pending.pk)
+            )
+    return pending
@@ -0,0 +1,155 @@
+"""
+Sliding-window rate limiting on top of the cache.
+
+Each key keeps one counter per fixed window. The sliding count is the
+current window's counter plus the previous window's, weighted by how
+much of the previous window still overlaps the last ``window`` seconds.
+So every key needs just two small counters, whatever the traffic;
+they are updated with the cache's atomic incr() and expire by
+themselves.
+
+Login attempts are reserved with reserve() before the password is
+hashed: the counter is incremented first and the attempt rejected if
+that takes it over the limit, so concurrent attempts cannot all pass a
+check before any of them is counted. A successful login releases its
+reservation, so it never uses up the allowance.
+
+With the default local-memory cache the limits are per process; set
+CACHE_BACKEND to Redis or Memcached to share them between workers.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class SlidingWindowLimiter:
+    """
+    Allow at most ``limit`` hits per key in any ``window`` seconds.
+    """
+
+    def __init__(self, scope, limit, window):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+
+    def _key(self, key, index):
+        digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return f"ratelimit:{self.scope}:{digest}:{index}"
+
+    def _wait(self, current, previous, offset):
+        """Seconds until one more hit is allowed (0 if it is now)."""
+        overlap = 1 - offset / self.window
+        if current + previous * overlap + 1 <= self.limit:
+            return 0
+        if current + 1 > self.limit:
+            # Blocked at least until the next window starts
+            return int(self.window - offset) + 1
+        # Blocked until enough of the previous window slides out
+        allowed_overlap = (self.limit - 1 - current) / previous
+        return int((overlap - allowed_overlap) * self.window) + 1
+
+    def _incr(self, counter):
+        """Atomically add one to ``counter``; returns the new count."""
+        # add() is a no-op if the counter exists; incr() is atomic
+        cache.add(counter, 0, timeout=2 * self.window)
+        try:
+            return cache.incr(counter)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.set(counter, 1, timeout=2 * self.window)
+            return 1
+
+    def reserve(self, key, now=None):
+        """
+        Count a hit for ``key`` if it is allowed. Returns (retry_after,
+        counter): retry_after is 0 and counter the cache key to pass to
+        release() if the hit was counted; otherwise nothing is counted
+        and retry_after is the seconds to wait.
+        """
+        now = time.time() if now is None else now
+        index, offset = divmod(now, self.window)
+        counter = self._key(key, int(index))
+        current = self._incr(counter)
+        previous = cache.get(self._key(key, int(index) - 1), 0)
+        wait = self._wait(current - 1, previous, offset)
+        if wait:
+            release(counter)
+            return wait, None
+        return 0, counter
+
+
+def release(counter):
+    """Take back a hit counted by SlidingWindowLimiter.reserve()."""
+    try:
+        cache.decr(counter)
+    except ValueError:
+        # The counter has expired; nothing left to take back
+        pass
+
+
+def client_ip(request):
+    """
+    The client's IP address. Behind RATE_LIMIT_PROXY_COUNT trusted
+    proxies (e.g. 1 on Heroku) it is read from X-Forwarded-For, where
+    each proxy appends the address it received the request from.
+    """
+    proxies = settings.RATE_LIMIT_PROXY_COUNT
+    if proxies:
+        header = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        forwarded = [
+            part.strip() for part in header.split(",") if part.strip()
+        ]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def login_limiters():
+    window = settings.LOGIN_RATE_WINDOW
+    return (
+        SlidingWindowLimiter(
+            "login-ip", settings.LOGIN_RATE_LIMIT_IP, window
+        ),
+        SlidingWindowLimiter(
+            "login-user", settings.LOGIN_RATE_LIMIT_USERNAME, window
+        ),
+    )
+
+
+def login_keys(request, username):
+    """(limiter, key) pairs a login attempt is counted against."""
+    ip_limiter, user_limiter = login_limiters()
+    return [
+        (ip_limiter, client_ip(request)),
+        (user_limiter, (username or "").strip().casefold()),
+    ]
+
+
+def reserve_login_attempt(request, username):
+    """
+    Count a login attempt against the IP address and the normalised
+    username, before the password is hashed. Returns (retry_after,
+    counters): retry_after is 0 if the attempt may go ahead, otherwise
+    the seconds to wait, and nothing is counted. Pass ``counters`` to
+    release_login_attempt() if the login succeeds.
+    """
+    if not settings.LOGIN_RATE_LIMIT_ENABLED:
+        return 0, []
+    waits, counters = zip(*(
+        limiter.reserve(key)
+        for limiter, key in login_keys(request, username)
+    ))
+    counters = [counter for counter in counters if counter]
+    if max(waits):
+        release_login_attempt(counters)
+        return max(waits), []
+    return 0, counters
+
+
+def release_login_attempt(counters):
+    """Uncount a login attempt that succeeded."""
+    for counter in counters:
+        release(counter)
@@ -0,0 +1,211 @@
+"""
+Moving gardens onto the right shard after SHARDS changes.
+
+A user's shard is a hash of their id modulo the number of shards (see
+core.sharding), so adding a shard gives some existing users a new home,
+and turning sharding on leaves every garden on the default database.
+rebalance() finds each user with rows on a database that is not their
+shard and moves them:
+
+1. Every user gets a copy on their shard (sync_users), so the copied
+   rows' foreign keys to the user hold.
+2. The garden is copied to the new shard in one transaction. Primary
+   keys are only unique within a database, so the copies get new ones
+   and the foreign keys between them are remapped.
+3. The old rows are deleted from the source in one transaction, a batch
+   of primary keys per statement, like an account purge.
+
+A move that fails in step 2 leaves the garden where it was. If step 3
+fails, the garden is on both databases and the user is reported.
+
+Run it straight after deploying the new SHARDS, ideally with the site in
+maintenance mode: until a user has been moved, their shard has none of
+their garden. Moved plants and tasks get new ids, so old links to them
+stop working. Shards can be added, but not removed.
+"""
+
+import logging
+from itertools import batched
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import (
+    GardenBed, Plant, PlantTask, PlantTaskRollup, TaskCompletion,
+    UserDataVersion, UserTaskRollup,
+)
+from .purge import purge_steps
+from .sharding import (
+    forget_user, shard_databases, shard_for_user, user_copy_fields
+)
+
+logger = logging.getLogger(__name__)
+
+# Models with a direct user foreign key, and its column
+OWNER_COLUMNS = [
+    (GardenBed, "owner_id"),
+    (Plant, "owner_id"),
+    (PlantTask, "user_id"),
+    (TaskCompletion, "user_id"),
+    (UserTaskRollup, "user_id"),
+]
+
+
+def source_databases():
+    """Shards, plus the default database when it is not one of them."""
+    databases = shard_databases()
+    if DEFAULT_DB_ALIAS not in databases:
+        databases.insert(0, DEFAULT_DB_ALIAS)
+    return databases
+
+
+def sync_users(batch_size):
+    """
+    Copy every user without one to their shard. Returns the number of
+    users read.
+    """
+    User = get_user_model()
+    users = User._base_manager.using(DEFAULT_DB_ALIAS).order_by("pk")
+    total = 0
+    for batch in batched(users.iterator(chunk_size=batch_size), batch_size):
+        by_shard = {}
+        for user in batch:
+            by_shard.setdefault(shard_for_user(user.pk), []).append(
+                User(**user_copy_fields(user))
+            )
+        for alias, copies in by_shard.items():
+            if alias not in (None, DEFAULT_DB_ALIAS):
+                User._base_manager.using(alias).bulk_create(
+                    copies, ignore_conflicts=True
+                )
+        total += len(batch)
+    return total
+
+
+def misplaced_users(source):
+    """{user_id: home shard} for users with rows on ``source``."""
+    owners = set()
+    for model, column in OWNER_COLUMNS:
+        owners.update(
+            model._base_manager.using(source)
+            .values_list(column, flat=True).distinct()
+        )
+    return {
+        user_id: shard_for_user(user_id)
+        for user_id in sorted(owners)
+        if shard_for_user(user_id) not in (None, source)
+    }
+
+
+def copy_rows(queryset, target, remap=None, batch_size=None):
+    """
+    Insert copies of ``queryset``'s rows into ``target`` with new
+    primary keys. ``remap`` maps foreign key columns to {old: new} ids.
+    Returns {old pk: new pk}.
+    """
+    rows = list(queryset.order_by("pk"))
+    old_pks = [row.pk for row in rows]
+    for row in rows:
+        row.pk = None
+        row._state.adding = True
+        for column, ids in (remap or {}).items():
+            value = getattr(row, column)
+            if value is not None:
+                setattr(row, column, ids.get(value))
+    queryset.model._base_manager.using(target).bulk_create(
+        rows, batch_size=batch_size
+    )
+    return dict(zip(old_pks, (row.pk for row in rows)))
+
+
+def copy_garden(user_id, source, target, batch_size=None):
+    """Copy a user's garden from ``source`` to ``target``."""
+    def rows(model, **filters):
+        return model._base_manager.using(source).filter(**filters)
+
+    beds = copy_rows(
+        rows(GardenBed, owner_id=user_id), target, batch_size=batch_size
+    )
+    plants = copy_rows(
+        rows(Plant, owner_id=user_id), target, {"bed_id": beds}, batch_size
+    )
+    tasks = copy_rows(
+        rows(PlantTask, plant__owner_id=user_id), target,
+        {"plant_id": plants}, batch_size,
+    )
+    history = copy_rows(
+        rows(TaskCompletion, user_id=user_id), target,
+        {"task_id": tasks, "plant_id": plants}, batch_size,
+    )
+    rollups = copy_rows(
+        rows(UserTaskRollup, user_id=user_id), target, batch_size=batch_size
+    )
+    rollups.update(copy_rows(
+        rows(PlantTaskRollup, plant__owner_id=user_id), target,
+        {"plant_id": plants}, batch_size,
+    ))
+    return {
+        "beds": len(beds), "plants": len(plants), "tasks": len(tasks),
+        "history": len(history), "rollups": len(rollups),
+    }
+
+
+def delete_garden(user_id, source, batch_size):
+    """Delete a user's garden from ``source``, children first."""
+    for _, queryset in purge_steps(user_id):
+        queryset = queryset.using(source)
+        pks = list(queryset.values_list("pk", flat=True))
+        for batch_pks in batched(pks, batch_size):
+            batch = queryset.model._base_manager.using(source).filter(
+                pk__in=batch_pks
+            )
+            batch._raw_delete(source)
+
+
+def move_user(user_id, source, target, batch_size):
+    """
+    Move a user's garden from ``source`` to ``target``. Returns the rows
+    copied per label.
+    """
+    with transaction.atomic(using=target):
+        counts = copy_garden(user_id, source, target, batch_size)
+    with transaction.atomic(using=source):
+        delete_garden(user_id, source, batch_size)
+    if source != DEFAULT_DB_ALIAS:
+        forget_user(user_id, source)
+    # Cached pages hold the old ids
+    UserDataVersion.bump(user_id)
+    return counts
+
+
+def rebalance(batch_size=1000, dry_run=False, progress=None):
+    """
+    Move every misplaced garden to its shard. ``progress(user_id,
+    source, target, counts)`` is called after each move, with counts
+    None for a move that failed (and was logged).
+
+    Returns {(source, target): users} for the moves made, or that would
+    be with ``dry_run``, and the list of user ids whose move failed.
+    """
+    if not dry_run:
+        sync_users(batch_size)
+
+    moves = {}
+    failed = []
+    for source in source_databases():
+        for user_id, target in misplaced_users(source).items():
+            moves[source, target] = moves.get((source, target), 0) + 1
+            if dry_run:
+                continue
+            try:
+                counts = move_user(user_id, source, target, batch_size)
+            except Exception:
+                logger.exception(
+                    "Could not move user %s from %s to %s",
+                    user_id, source, target,
+                )
+                failed.append(user_id)
+                counts = None
+            if progress:
+                progress(user_id, source, target, counts)
+    return moves, failed
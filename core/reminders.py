@@ -0,0 +1,256 @@
+"""
+Per-task reminder emails at REMINDER_HOUR on each task's due date.
+
+ReminderScheduler keeps a heap of upcoming (remind_at, task_id) entries
+and only ever reads:
+
+- tasks due inside the current look-ahead window, loaded a window at a
+  time as time moves on, and
+- TaskChange rows written since the last poll, to update the heap
+  incrementally when tasks are edited, completed, skipped or deleted.
+
+TaskChange rows are written inside the views' transactions, so they do
+not become visible in id order: a row can commit after one with a higher
+id has been read. Each poll therefore also re-reads the rows created in
+the last CHANGE_LOOKBACK and applies any it has not seen yet. This holds
+as long as transactions (plus clock skew between processes) take less
+than CHANGE_LOOKBACK.
+
+Changed tasks are pushed again rather than removed from the heap; each
+task's current entry is kept in ``self.current`` and stale heap entries
+are dropped when they reach the top. A reminder is sent once per due
+date: sending records it in PlantTask.reminded_for.
+"""
+
+import heapq
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from itertools import batched
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import PlantTask, TaskChange
+
+logger = logging.getLogger(__name__)
+
+# Tasks refetched per query when applying changes
+CHANGE_BATCH_SIZE = 500
+
+# How far back each poll re-reads the change feed for late commits
+CHANGE_LOOKBACK = timedelta(minutes=5)
+
+
+def remind_at(next_due):
+    """When a task due on ``next_due`` is reminded."""
+    return timezone.make_aware(
+        datetime.combine(next_due, time(settings.REMINDER_HOUR))
+    )
+
+
+def reminder_tasks():
+    """Active tasks of active users with an email, not yet reminded."""
+    return (
+        PlantTask.objects
+        .filter(
+            active=True,
+            next_due__isnull=False,
+            plant__owner__is_active=True,
+        )
+        .exclude(plant__owner__email="")
+        .filter(
+            Q(reminded_for__isnull=True) | ~Q(reminded_for=F("next_due"))
+        )
+    )
+
+
+class ReminderScheduler:
+    """
+    In-memory schedule of reminders, kept current from the TaskChange
+    feed. Call tick() regularly; it returns how long to wait before the
+    next call.
+    """
+
+    def __init__(self, window=timedelta(days=1),
+                 poll_interval=timedelta(seconds=30), connection=None):
+        self.window = window
+        self.poll_interval = poll_interval
+        self.connection = connection
+        self.heap = []
+        self.current = {}  # task_id -> (remind_at, next_due)
+        self.loaded_until = None
+        self.change_cursor = None
+        # Change ids read within CHANGE_LOOKBACK -> their created_at
+        self.seen_changes = {}
+        self.sent = 0
+
+    # ---------------------------------------------------------
+    # Loading
+    # ---------------------------------------------------------
+    def start(self, now):
+        """
+        Load today's and the first window's reminders. The change cursor
+        is taken first, so changes made while loading are applied too.
+        """
+        self.change_cursor = (
+            TaskChange.objects.order_by("-id")
+            .values_list("id", flat=True).first() or 0
+        )
+        # Already reflected in what is loaded below
+        self.seen_changes = dict(
+            TaskChange.objects.filter(
+                id__lte=self.change_cursor,
+                created_at__gte=timezone.now() - CHANGE_LOOKBACK,
+            ).values_list("id", "created_at")
+        )
+        # Reminders missed earlier today (e.g. after a restart) are
+        # still sent; older ones are not.
+        self.loaded_until = timezone.localdate(now)
+        self.extend_window(now)
+
+    def extend_window(self, now):
+        """Load due dates up to the end of the look-ahead window."""
+        until = timezone.localdate(now + self.window) + timedelta(days=1)
+        if until <= self.loaded_until:
+            return
+        tasks = reminder_tasks().filter(
+            next_due__gte=self.loaded_until, next_due__lt=until
+        ).values_list("pk", "next_due")
+        for pk, next_due in tasks.iterator():
+            self.schedule(pk, next_due)
+        self.loaded_until = until
+
+    def schedule(self, pk, next_due):
+        entry = (remind_at(next_due), next_due)
+        if self.current.get(pk) != entry:
+            self.current[pk] = entry
+            heapq.heappush(self.heap, (entry[0], pk, next_due))
+
+    def apply_changes(self, now):
+        """
+        Refresh tasks listed in the change feed since the last poll.
+        Tasks no longer due between today and the end of the window (or
+        deleted) are forgotten; their heap entries are dropped when
+        popped.
+        """
+        # created_at comes from the web processes' clocks, not ``now``
+        cutoff = timezone.now() - CHANGE_LOOKBACK
+        changes = [
+            change for change in
+            TaskChange.objects.filter(
+                Q(id__gt=self.change_cursor) | Q(created_at__gte=cutoff)
+            ).order_by("id").values_list("id", "task_id", "created_at")
+            if change[0] not in self.seen_changes
+        ]
+        self.seen_changes = {
+            pk: created_at for pk, created_at in self.seen_changes.items()
+            if created_at >= cutoff
+        }
+        if not changes:
+            return 0
+        self.change_cursor = max(self.change_cursor, changes[-1][0])
+        self.seen_changes.update(
+            (pk, created_at) for pk, _, created_at in changes
+        )
+        task_ids = {task_id for _, task_id, _ in changes}
+
+        for batch in batched(sorted(task_ids), CHANGE_BATCH_SIZE):
+            for pk in batch:
+                self.current.pop(pk, None)
+            tasks = reminder_tasks().filter(
+                pk__in=batch,
+                next_due__gte=timezone.localdate(now),
+                next_due__lt=self.loaded_until,
+            ).values_list("pk", "next_due")
+            for pk, next_due in tasks:
+                self.schedule(pk, next_due)
+        return len(task_ids)
+
+    # ---------------------------------------------------------
+    # Sending
+    # ---------------------------------------------------------
+    def pop_due(self, now):
+        """Task ids and due dates whose reminder time has come."""
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            when, pk, next_due = heapq.heappop(self.heap)
+            if self.current.get(pk) == (when, next_due):
+                del self.current[pk]
+                due.append((pk, next_due))
+        return due
+
+    def dispatch(self, due):
+        """
+        Email each user one reminder for their tasks in ``due``. Tasks
+        are reloaded, and only marked reminded if still due on the same
+        date, so a task completed in the meantime is not reminded.
+        """
+        expected = dict(due)
+        tasks = (
+            reminder_tasks()
+            .filter(pk__in=expected)
+            .select_related("plant", "plant__owner")
+        )
+        by_user = defaultdict(list)
+        for task in tasks:
+            if task.next_due == expected[task.pk]:
+                by_user[task.plant.owner].append(task)
+
+        messages = []
+        for user, user_tasks in by_user.items():
+            count = len(user_tasks)
+            messages.append(EmailMessage(
+                f"Reminder: {count} garden task{'s' if count != 1 else ''}"
+                " due today",
+                render_to_string("core/emails/task_reminder.txt", {
+                    "username": user.username,
+                    "tasks": user_tasks,
+                    "site_url": settings.SITE_URL,
+                }),
+                settings.DEFAULT_FROM_EMAIL,
+                [user.email],
+            ))
+        if not messages:
+            return 0
+
+        connection = self.connection or get_connection()
+        sent = connection.send_messages(messages) or 0
+
+        by_date = defaultdict(list)
+        for user_tasks in by_user.values():
+            for task in user_tasks:
+                by_date[task.next_due].append(task.pk)
+        for next_due, pks in by_date.items():
+            # Conditional, in case a task changed while sending
+            PlantTask.objects.filter(pk__in=pks, next_due=next_due).update(
+                reminded_for=next_due
+            )
+        self.sent += sent
+        return sent
+
+    def tick(self, now=None):
+        """
+        Apply changes, load the next window if needed and send due
+        reminders. Returns the seconds until the next tick is needed.
+        """
+        now = now or timezone.now()
+        if self.change_cursor is None:
+            self.start(now)
+        else:
+            self.apply_changes(now)
+            self.extend_window(now)
+
+        due = self.pop_due(now)
+        if due:
+            sent = self.dispatch(due)
+            logger.info("Sent %s reminder emails for %s tasks", sent,
+                        len(due))
+
+        wait = self.poll_interval
+        if self.heap:
+            wait = min(wait, max(self.heap[0][0] - now, timedelta(0)))
+        return wait.total_seconds()
@@ -0,0 +1,103 @@
+"""
+Read-replica routing for read-only views.
+
+Views marked with @read_only_view (or ReadOnlyViewMixin for class-based
+views) have their GET and HEAD queries sent to one of the databases in
+READ_REPLICAS by ReplicaRoutingMiddleware. Everything else, and every
+write, uses the default (primary) database.
+
+Replicas lag slightly behind the primary, so a user who has just
+changed something would not see it on a replica. Any successful write
+request therefore sets a short-lived cookie, and while it lasts
+(REPLICA_STICKY_SECONDS) that browser's reads stay on the primary. The
+cookie travels with the browser, so it works across web processes.
+
+The chosen database is kept in a context variable that
+garden_timekeeper.routers.ReplicaRouter reads, like the request metrics
+in core.metrics.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+STICKY_COOKIE = "primary_until"
+
+_read_db = ContextVar("read_db", default=None)
+
+
+def current_read_db():
+    """The replica alias reads are routed to, or None for the primary."""
+    return _read_db.get()
+
+
+@contextmanager
+def use_replica(alias):
+    """Route reads in the block to ``alias`` (None for the primary)."""
+    token = _read_db.set(alias)
+    try:
+        yield
+    finally:
+        _read_db.reset(token)
+
+
+def read_only_view(view):
+    """Mark a function-based view as safe to serve from a replica."""
+    view.reads_from_replica = True
+    return view
+
+
+class ReadOnlyViewMixin:
+    """Mark a class-based view as safe to serve from a replica."""
+
+    reads_from_replica = True
+
+
+def reads_from_replica(view_func):
+    view_class = getattr(view_func, "view_class", None)
+    return bool(
+        getattr(view_func, "reads_from_replica", False)
+        or getattr(view_class, "reads_from_replica", False)
+    )
+
+
+def recently_wrote(request, now=None):
+    """True while the sticky cookie from a recent write is valid."""
+    now = time.time() if now is None else now
+    try:
+        until = float(request.COOKIES.get(STICKY_COOKIE, 0))
+    except ValueError:
+        return False
+    return now < until
+
+
+def mark_wrote(response, now=None):
+    """Keep this browser's reads on the primary for a while."""
+    now = time.time() if now is None else now
+    sticky = settings.REPLICA_STICKY_SECONDS
+    response.set_cookie(
+        STICKY_COOKIE,
+        str(int(now + sticky)),
+        max_age=sticky,
+        httponly=True,
+        samesite="Lax",
+        secure=settings.SESSION_COOKIE_SECURE,
+    )
+
+
+def streaming_from(alias, chunks):
+    """
+    Keep routing a streamed response's reads to ``alias`` while its
+    content is generated, after the view itself has returned.
+    """
+    with use_replica(alias):
+        yield from chunks
+
+
+async def astreaming_from(alias, chunks):
+    """streaming_from() for a response streamed from an async iterator."""
+    with use_replica(alias):
+        async for chunk in chunks:
+            yield chunk
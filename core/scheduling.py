@@ -0,0 +1,304 @@
+"""
+Projection of PlantTask schedules over a date range.
+
+PlantTask.skip() defines the schedule: from each due date, add one
+frequency interval, then move forward day by day until the date is in
+the seasonal window. Doing that per task in Python is too slow for
+year-long projections of thousands of tasks, so ScheduleProjector turns
+it into array lookups:
+
+- For every (frequency, seasonal window, repeat) combination a "next
+  occurrence" table is built once with numpy: next[i] is the day index
+  of the occurrence after day i.
+- Tasks with the same combination and first due date produce identical
+  occurrences, so they are projected once and weighted by how many
+  tasks share them.
+- All distinct schedules then advance together, one table lookup per
+  occurrence. counts() sums them per day with np.bincount; occurrences()
+  expands them back to the individual tasks.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+from django.core.cache import cache
+
+from .models import PlantTask, UserDataVersion
+
+# Fields needed to project a task, in the order projection rows use
+PROJECTION_FIELDS = (
+    "frequency",
+    "all_year",
+    "seasonal_start_month",
+    "seasonal_end_month",
+    "repeat",
+    "next_due",
+)
+
+# Workload heatmaps are cached per user data version
+WORKLOAD_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def add_months(day, months):
+    """
+    Same date ``months`` later, clamped to the month's last day.
+    """
+    return PlantTask().add_months(day, months)
+
+
+class ScheduleProjector:
+    """
+    Projects task occurrences over the days ``start`` <= day < ``end``.
+
+    Rows are tuples in PROJECTION_FIELDS order. Overdue tasks count as
+    due on ``start``, because completing them then is what schedules
+    their next occurrence.
+    """
+
+    def __init__(self, start, end):
+        self.start = start
+        self.days = (end - start).days
+        # Room for a yearly step from the last day, then up to a year of
+        # out-of-season days before the window opens again.
+        self.span = self.days + 2 * 366 + 31
+
+        self.origin = np.datetime64(start, "D")
+        dates = self.origin + np.arange(self.span)
+        self.month_starts = dates.astype("datetime64[M]")
+        self.month_numbers = self.month_starts.astype(int) % 12 + 1
+        self.days_of_month = (
+            dates - self.month_starts.astype("datetime64[D]")
+        ).astype(int) + 1
+
+        self._tables = {}
+
+    # ---------------------------------------------------------
+    # Lookup tables
+    # ---------------------------------------------------------
+    def step_table(self, frequency):
+        """Day index of each day plus one frequency interval."""
+        delta = PlantTask(frequency=frequency).get_frequency_delta()
+        index = np.arange(self.days)
+        if delta["days"]:
+            return index + delta["days"]
+
+        # Month arithmetic, clamping the day like PlantTask.add_months
+        target = self.month_starts[:self.days] + delta["months"]
+        first = target.astype("datetime64[D]")
+        month_length = ((target + 1).astype("datetime64[D]") - first)
+        day = np.minimum(
+            self.days_of_month[:self.days], month_length.astype(int)
+        )
+        return (first + day - 1 - self.origin).astype(int)
+
+    def season_table(self, all_year, start_month, end_month):
+        """First in-season day index on or after each day."""
+        months = self.month_numbers
+        if all_year:
+            in_season = np.ones(self.span, dtype=bool)
+        elif start_month <= end_month:
+            in_season = (months >= start_month) & (months <= end_month)
+        else:
+            # Window wraps over the year end
+            in_season = (months >= start_month) | (months <= end_month)
+
+        positions = np.where(in_season, np.arange(self.span), self.span)
+        return np.minimum.accumulate(positions[::-1])[::-1]
+
+    def next_table(self, frequency, all_year, start_month, end_month,
+                   repeat):
+        """
+        Day index of the occurrence after each day, or self.days when
+        there is none in range. Has one extra entry for self.days.
+        """
+        key = (frequency, all_year, start_month, end_month, repeat)
+        table = self._tables.get(key)
+        if table is None:
+            table = np.full(self.days + 1, self.days)
+            if repeat:
+                season = self.season_table(all_year, start_month, end_month)
+                table[:self.days] = np.minimum(
+                    season[self.step_table(frequency)], self.days
+                )
+            self._tables[key] = table
+        return table
+
+    # ---------------------------------------------------------
+    # Projection
+    # ---------------------------------------------------------
+    def first_index(self, next_due):
+        """Day index of the first occurrence, or None if out of range."""
+        if next_due is None:
+            return None
+        index = max((next_due - self.start).days, 0)
+        return index if index < self.days else None
+
+    def group(self, rows):
+        """
+        Group row indexes by (signature, first day index). Rows in one
+        group have identical occurrences. Rows with nothing due in range
+        are left out.
+        """
+        groups = {}
+        for row_index, (*signature, next_due) in enumerate(rows):
+            first = self.first_index(next_due)
+            if first is not None:
+                groups.setdefault((tuple(signature), first), []).append(
+                    row_index
+                )
+        return groups
+
+    def walk(self, keys):
+        """
+        Advance every (signature, first) schedule in ``keys`` together.
+
+        Yields (schedule_ids, day_indexes) arrays, one pair per step,
+        where schedule_ids index into ``keys``. Every step moves at least
+        a week forward, so there is at most one step per week in range.
+        """
+        signatures = {}
+        for signature, _ in keys:
+            signatures.setdefault(signature, len(signatures))
+        tables = np.stack([
+            self.next_table(*signature) for signature in signatures
+        ])
+
+        signature_ids = np.array([signatures[sig] for sig, _ in keys])
+        positions = np.array([first for _, first in keys])
+        schedule_ids = np.arange(len(keys))
+
+        while len(positions):
+            yield schedule_ids, positions
+            positions = tables[signature_ids, positions]
+            in_range = positions < self.days
+            signature_ids = signature_ids[in_range]
+            positions = positions[in_range]
+            schedule_ids = schedule_ids[in_range]
+
+    def counts(self, rows):
+        """
+        Number of occurrences on each day, as an array of self.days ints.
+        """
+        groups = self.group(rows)
+        counts = np.zeros(self.days, dtype=int)
+        if not groups:
+            return counts
+
+        keys = list(groups)
+        weights = np.array([len(groups[key]) for key in keys])
+        for schedule_ids, positions in self.walk(keys):
+            counts += np.bincount(
+                positions, weights=weights[schedule_ids],
+                minlength=self.days,
+            ).astype(int)
+        return counts
+
+    def occurrences(self, rows):
+        """
+        Every occurrence in range as (date, row index) pairs, ordered by
+        date and then row index.
+        """
+        groups = self.group(rows)
+        if not groups:
+            return []
+
+        keys = list(groups)
+        members = [groups[key] for key in keys]
+        pairs = []
+        for schedule_ids, positions in self.walk(keys):
+            for schedule_id, position in zip(
+                schedule_ids.tolist(), positions.tolist()
+            ):
+                pairs.extend(
+                    (position, row_index)
+                    for row_index in members[schedule_id]
+                )
+        pairs.sort()
+
+        dates = [
+            self.start + timedelta(days=day) for day in range(self.days)
+        ]
+        return [(dates[day], row_index) for day, row_index in pairs]
+
+
+def workload_counts(user, start, months=12):
+    """
+    Tasks due per day for ``months`` months from ``start``.
+
+    Returns a list of ints, one per day. Cached per user data version,
+    so any change to the user's plants or tasks recomputes it.
+    """
+    end = add_months(start, months)
+    version = UserDataVersion.current(user.pk).version
+    key = f"workload:{user.pk}:v{version}:{start.isoformat()}:{months}"
+
+    counts = cache.get(key)
+    if counts is None:
+        rows = (
+            PlantTask.objects
+            .filter(
+                plant__owner=user,
+                active=True,
+                next_due__isnull=False,
+                next_due__lt=end,
+            )
+            .order_by()
+            .values_list(*PROJECTION_FIELDS)
+        )
+        counts = ScheduleProjector(start, end).counts(rows).tolist()
+        cache.set(key, counts, WORKLOAD_CACHE_TIMEOUT)
+    return counts
+
+
+def occurrence_rows(user, end, today, hide_overdue=False):
+    """The rows task_occurrences() projects, as an unevaluated queryset."""
+    tasks = PlantTask.objects.filter(
+        plant__owner=user,
+        active=True,
+        next_due__isnull=False,
+        next_due__lt=end,
+    )
+    if hide_overdue:
+        tasks = tasks.filter(next_due__gte=today)
+    return (
+        tasks.order_by("pk")
+        .values_list("pk", "name", "plant__name", *PROJECTION_FIELDS)
+    )
+
+
+def project_occurrences(rows, start, end, today):
+    projector = ScheduleProjector(today, end)
+    return [
+        (day, rows[index][0], rows[index][1], rows[index][2])
+        for day, index in projector.occurrences(
+            [row[3:] for row in rows]
+        )
+        if day >= start
+    ]
+
+
+def task_occurrences(user, start, end, today, hide_overdue=False):
+    """
+    Every occurrence of the user's active tasks over ``start`` <= day <
+    ``end``, as (date, task pk, task name, plant name) tuples ordered by
+    date.
+
+    Schedules are projected from ``today``, where overdue tasks fall
+    due, so a range further ahead shows where tasks will actually land.
+    ``end`` must be after ``today``.
+    """
+    rows = list(occurrence_rows(user, end, today, hide_overdue))
+    return project_occurrences(rows, start, end, today)
+
+
+async def atask_occurrences(user, start, end, today, hide_overdue=False):
+    """Async version of task_occurrences(), for async views."""
+    rows = [
+        row async for row in occurrence_rows(user, end, today, hide_overdue)
+    ]
+    return project_occurrences(rows, start, end, today)
+
+
+def first_of_week(day):
+    """Monday of the week containing ``day``."""
+    return date.fromordinal(day.toordinal() - day.weekday())
@@ -0,0 +1,174 @@
+"""
+Optional user sharding across several databases.
+
+When SHARDS lists database aliases, each user's garden lives on one of
+them, picked by a stable hash of the user id (shard_for_user). That is
+their beds, plants and tasks, plus the task history and rollups that
+have foreign keys to them (SHARDED_MODELS). Users, sessions, feeds and
+the TaskChange feed stay on the default database.
+
+garden_timekeeper.routers.ShardRouter sends queries on sharded models
+to, in order:
+
+- the database of the object the query starts from (``plant.tasks``);
+- the owner's shard when it starts from a user (``user.plants``);
+- the shard pinned for the current request or block. The middleware
+  pins the logged-in user's shard; other code uses pinned_to_user().
+
+Anything else raises ShardNotPinned rather than quietly reading the
+default database. Code that works across users (digests, housekeeping,
+commands) loops over shard_databases() with ``.using()``.
+
+Each shard keeps a copy of the auth_user rows of the users it holds,
+without their password, so foreign keys and joins to the owner work
+inside the shard. User signals keep the copies up to date.
+
+The shard is the hash modulo the number of shards, so adding a shard
+moves some existing users to it: run rebalance_shards straight after
+changing SHARDS. Without SHARDS nothing here does anything.
+"""
+
+import hashlib
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+SHARDED_MODELS = frozenset({
+    "core.gardenbed",
+    "core.plant",
+    "core.planttask",
+    "core.taskcompletion",
+    "core.usertaskrollup",
+    "core.planttaskrollup",
+})
+
+# Not copied to the shards: the password stays on the default database,
+# and login timestamps change too often to be worth copying
+UNSYNCED_USER_FIELDS = frozenset({"password", "last_login"})
+
+_shard = ContextVar("shard", default=None)
+
+
+class ShardNotPinned(RuntimeError):
+    """A sharded model was queried without knowing which shard to use."""
+
+
+def is_sharded(model):
+    return (
+        bool(settings.SHARDS)
+        and model._meta.label_lower in SHARDED_MODELS
+    )
+
+
+def shard_for_user(user_id):
+    """
+    The alias of the shard holding ``user_id``'s garden, or None when
+    sharding is off. Stable across processes and restarts (unlike
+    hash()), and the same for 42 and "42".
+    """
+    if not settings.SHARDS:
+        return None
+    digest = hashlib.sha256(str(user_id).encode()).digest()
+    return settings.SHARDS[
+        int.from_bytes(digest[:8], "big") % len(settings.SHARDS)
+    ]
+
+
+def shard_databases():
+    """Every database that may hold sharded rows."""
+    return list(settings.SHARDS) or [DEFAULT_DB_ALIAS]
+
+
+def current_shard():
+    return _shard.get()
+
+
+@contextmanager
+def use_shard(alias):
+    """Send sharded queries in the block to ``alias``."""
+    token = _shard.set(alias)
+    try:
+        yield
+    finally:
+        _shard.reset(token)
+
+
+def pinned_to_user(user_id):
+    """Send sharded queries in the block to ``user_id``'s shard."""
+    if not settings.SHARDS:
+        return nullcontext()
+    return use_shard(shard_for_user(user_id))
+
+
+@contextmanager
+def atomic_for_user(user_id):
+    """
+    transaction.atomic() for a write to ``user_id``'s garden: on their
+    shard, and on the default database too (data versions, the change
+    feed) when that is a different one. The default database commits
+    first, so a shard that then fails to commit leaves at most a needless
+    version bump, never a change without one.
+    """
+    shard = shard_for_user(user_id) or DEFAULT_DB_ALIAS
+    with transaction.atomic(using=shard):
+        if shard == DEFAULT_DB_ALIAS:
+            yield
+        else:
+            with transaction.atomic():
+                yield
+
+
+def streaming_on(alias, chunks):
+    """
+    Keep a streamed response's queries on ``alias`` while its content
+    is generated, after the view itself has returned.
+    """
+    with use_shard(alias):
+        yield from chunks
+
+
+async def astreaming_on(alias, chunks):
+    """streaming_on() for a response streamed from an async iterator."""
+    with use_shard(alias):
+        async for chunk in chunks:
+            yield chunk
+
+
+def user_copy_fields(user):
+    """The user's columns as stored in their shard's copy."""
+    fields = {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if field.name not in UNSYNCED_USER_FIELDS
+    }
+    # Unusable, so the copy could never be used to log in
+    fields["password"] = "!"
+    return fields
+
+
+def sync_user(user):
+    """Create or update ``user``'s copy on their shard."""
+    shard = shard_for_user(user.pk)
+    if shard is None or shard == DEFAULT_DB_ALIAS:
+        return
+    User = get_user_model()
+    fields = user_copy_fields(user)
+    copies = User._base_manager.using(shard).filter(pk=user.pk)
+    if not copies.update(**fields):
+        User._base_manager.using(shard).bulk_create(
+            [User(**fields)], ignore_conflicts=True
+        )
+
+
+def forget_user(user_id, alias=None):
+    """
+    Delete ``user_id``'s copy, and anything of theirs still on the
+    shard, from ``alias`` (their shard by default).
+    """
+    alias = alias or shard_for_user(user_id)
+    if alias is None or alias == DEFAULT_DB_ALIAS:
+        return
+    get_user_model()._base_manager.using(alias).filter(pk=user_id).delete()
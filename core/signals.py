@@ -0,0 +1,48 @@
+"""
+Signal handlers for the core app.
+
+Keep UserDataVersion in step with changes made through model saves and
+deletes, so per-user caches are invalidated, and write task changes to
+the TaskChange feed. Bulk writes that bypass signals call
+UserDataVersion.bump() and TaskChange.record() themselves.
+
+With sharding on, also keep each user's copy on their shard in step
+(see core.sharding).
+"""
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Plant, PlantTask, TaskChange, UserDataVersion
+from .sharding import UNSYNCED_USER_FIELDS, forget_user, sync_user
+
+
+@receiver(post_save, sender=PlantTask)
+@receiver(post_delete, sender=PlantTask)
+def task_changed(sender, instance, **kwargs):
+    UserDataVersion.bump(instance.user_id)
+    TaskChange.record([instance.pk])
+
+
+@receiver(post_save, sender=Plant)
+@receiver(post_delete, sender=Plant)
+def plant_changed(sender, instance, **kwargs):
+    UserDataVersion.bump(instance.owner_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, using, update_fields=None, **kwargs):
+    # Only the default database's users are copied, not the copies
+    if not settings.SHARDS or using != DEFAULT_DB_ALIAS:
+        return
+    if update_fields and set(update_fields) <= UNSYNCED_USER_FIELDS:
+        return
+    sync_user(instance)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_deleted(sender, instance, using, **kwargs):
+    if settings.SHARDS and using == DEFAULT_DB_ALIAS:
+        forget_user(instance.pk)
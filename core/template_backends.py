@@ -0,0 +1,36 @@
+"""
+Template backend that records render time for RequestTimingMiddleware.
+
+It behaves exactly like Django's own DjangoTemplates backend; the only
+difference is that every top-level render() is timed and added to the
+current request's metrics (see core.metrics). Included templates render
+inside their parent, so they are counted as part of the parent's time.
+"""
+
+from time import perf_counter
+
+from django.template.backends.django import DjangoTemplates, Template
+
+from . import metrics
+
+
+class TimedTemplate(Template):
+    """A DjangoTemplates template whose render() time is recorded."""
+
+    def render(self, context=None, request=None):
+        start = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.record_template(perf_counter() - start)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend returning TimedTemplate instances."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
@@ -0,0 +1,66 @@
+from functools import lru_cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.forms.utils import flatatt
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from core.images import SIBLING_FORMATS, sibling_path
+
+register = template.Library()
+
+
+@lru_cache(maxsize=256)
+def available_sources(path):
+    """
+    Return the (static path, MIME type) pairs of the modern-format
+    siblings that exist for ``path``, in order of preference.
+
+    The lookup touches the filesystem, so results are cached for the life
+    of the process. Siblings are generated by ``optimise_images`` and
+    committed; restart the dev server for new ones to be picked up.
+    """
+    sources = []
+    for suffix, mime, _pil_format in SIBLING_FORMATS:
+        candidate = sibling_path(path, suffix)
+        if finders.find(candidate):
+            sources.append((candidate, mime))
+    return tuple(sources)
+
+
+@register.simple_tag
+def picture(path, alt="", **attrs):
+    """
+    Render a <picture> element that serves the best available format.
+
+    The browser picks the first <source> it supports (AVIF, then WebP)
+    and falls back to the original image in the <img> tag, so pages work
+    whether or not ``optimise_images`` has generated the siblings.
+
+    Parameters
+    ----------
+    path : str
+        Static path of the original image, e.g. "assets/images/logo.png".
+    alt : str
+        Alternative text for the <img> element (required for a11y).
+    **attrs : str
+        Extra attributes for the <img> element (class, width, loading...).
+
+    Usage in templates
+    ------------------
+    {% load picture_tags %}
+    {% picture "assets/images/logo.png" alt="Logo" class="navbar-logo" %}
+    """
+    sources = format_html_join(
+        "",
+        '<source srcset="{}" type="{}">',
+        ((static(src), mime) for src, mime in available_sources(path)),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" alt="{}"{}></picture>',
+        sources,
+        static(path),
+        alt,
+        flatatt(attrs),
+    )
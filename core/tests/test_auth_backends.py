@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+
+class CaseInsensitiveUsernameBackendTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="Mark", password="testpass123"
+        )
+
+    def test_any_capitalisation_logs_in(self):
+        for username in ("Mark", "mark", "MARK"):
+            with self.subTest(username=username):
+                self.assertEqual(
+                    authenticate(username=username, password="testpass123"),
+                    self.user,
+                )
+
+    def test_lookup_compares_lowercased_username(self):
+        with CaptureQueriesContext(connection) as queries:
+            authenticate(username="mark", password="testpass123")
+        self.assertIn('LOWER("auth_user"."username")', queries[0]["sql"])
+
+    def test_wrong_password_or_inactive_user_fails(self):
+        self.assertIsNone(authenticate(username="mark", password="nope"))
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(
+            authenticate(username="mark", password="testpass123")
+        )
+
+    def test_unknown_user_still_runs_hasher(self):
+        with mock.patch.object(
+            User, "set_password", autospec=True
+        ) as set_password:
+            self.assertIsNone(
+                authenticate(username="nobody", password="testpass123")
+            )
+        set_password.assert_called_once()
+
+    def test_usernames_differing_in_case_are_rejected(self):
+        with self.assertRaises(IntegrityError):
+            User.objects.create_user(username="MARK", password="x")
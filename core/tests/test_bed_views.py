@@ -1,7 +1,11 @@
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth.models import User
-from core.models import GardenBed
+from core.models import GardenBed, Plant, PlantType
 
 
 class BedViewTests(TestCase):
@@ -178,6 +182,50 @@ class BedViewTests(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertFalse(GardenBed.objects.filter(pk=self.bed1.pk).exists())
 
+    def test_bed_delete_keeps_plants_without_a_bed(self):
+        plant = Plant.objects.create(
+            owner=self.user, bed=self.bed1, name="Tomato",
+            type=PlantType.VEGETABLE,
+        )
+        self.client.login(username="mark", password="pass")
+
+        self.client.post(reverse("bed_delete", args=[self.bed1.pk]))
+
+        plant.refresh_from_db()
+        self.assertIsNone(plant.bed)
+
+    def test_bed_delete_queries_do_not_grow_with_plants(self):
+        def plant_bed(bed, count):
+            Plant.objects.bulk_create([
+                Plant(owner=self.user, bed=bed, name=f"Plant {number}",
+                      type=PlantType.VEGETABLE)
+                for number in range(count)
+            ])
+
+        plant_bed(self.bed1, 1)
+        plant_bed(self.bed2, 50)
+        self.client.login(username="mark", password="pass")
+
+        with CaptureQueriesContext(connection) as one_plant:
+            self.client.post(reverse("bed_delete", args=[self.bed1.pk]))
+        with CaptureQueriesContext(connection) as many_plants, \
+                mock.patch.object(Plant, "from_db") as from_db:
+            self.client.post(reverse("bed_delete", args=[self.bed2.pk]))
+
+        self.assertEqual(len(many_plants), len(one_plant))
+        # The plants are updated in the database, never loaded
+        from_db.assert_not_called()
+        plant_queries = [
+            query["sql"] for query in many_plants
+            if '"core_plant"' in query["sql"]
+        ]
+        self.assertEqual(len(plant_queries), 1)
+        self.assertTrue(plant_queries[0].startswith('UPDATE "core_plant"'))
+        self.assertEqual(
+            Plant.objects.filter(owner=self.user, bed__isnull=True).count(),
+            51,
+        )
+
     def test_user_cannot_delete_other_users_bed(self):
         self.client.login(username="mark", password="pass")
 
@@ -0,0 +1,196 @@
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth.models import User
+from core.benchmarking import compare_results, percentile, summarise
+from io import StringIO
+from pathlib import Path
+import json
+import tempfile
+
+
+class BenchmarkHelperTests(SimpleTestCase):
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_summarise_reports_milliseconds(self):
+        summary = summarise([0.001, 0.002, 0.003])
+        self.assertEqual(summary["count"], 3)
+        self.assertEqual(summary["p50_ms"], 2.0)
+        self.assertEqual(summary["max_ms"], 3.0)
+
+    def test_compare_results_reports_relative_change(self):
+        rows = compare_results(
+            {"a": {"p95_ms": 10.0}, "b": {"p95_ms": 4.0}},
+            {"a": {"p95_ms": 15.0}, "c": {"p95_ms": 1.0}},
+            "p95_ms",
+        )
+        self.assertEqual(rows, [("a", 10.0, 15.0, 0.5)])
+
+
+class BenchmarkHttpCommandTests(TestCase):
+
+    def test_runs_journeys_and_writes_json(self):
+        call_command(
+            "seed_garden", users=1, plants_per_user=3, tasks_per_plant=2,
+            stdout=StringIO(),
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "http.json"
+            call_command(
+                "benchmark_http", use_current_db=True, users=1,
+                concurrency=1, iterations=1, output=str(output),
+                stdout=StringIO(),
+            )
+            payload = json.loads(output.read_text())
+
+        self.assertEqual(payload["suite"], "http")
+        results = payload["results"]
+        for endpoint in ("dashboard", "plant_list", "plant_detail",
+                         "task_mark_done", "task_skip", "bed_create"):
+            self.assertIn(endpoint, results)
+            self.assertEqual(results[endpoint]["errors"], 0)
+            self.assertIn("p95_ms", results[endpoint])
+
+
+class BenchmarkLoginCommandTests(TestCase):
+
+    def test_times_lookups_and_logins(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "login.json"
+            call_command(
+                "benchmark_login", use_current_db=True, users=20,
+                samples=1, attack_attempts=3, output=str(output),
+                stdout=StringIO(),
+            )
+            payload = json.loads(output.read_text())
+
+        self.assertEqual(payload["suite"], "login")
+        self.assertEqual(
+            sorted(payload["results"]),
+            ["attack/limited", "attack/unlimited", "authenticate/known",
+             "authenticate/unknown", "lookup/iexact", "lookup/lower"],
+        )
+
+
+class BenchmarkDeletionCommandTests(TestCase):
+
+    def test_deletes_both_accounts_and_reports_memory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "deletion.json"
+            call_command(
+                "benchmark_deletion", use_current_db=True, tasks=30,
+                tasks_per_plant=3, beds=2, batch_size=7,
+                output=str(output), stdout=StringIO(),
+            )
+            payload = json.loads(output.read_text())
+
+        self.assertEqual(payload["suite"], "deletion")
+        self.assertEqual(sorted(payload["results"]), ["batched", "cascade"])
+        self.assertIn("peak_mb", payload["results"]["batched"])
+        self.assertFalse(User.objects.filter(username__startswith="deletion"))
+
+
+class BenchmarkSessionsCommandTests(TestCase):
+
+    def test_reports_queries_for_every_configuration(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "sessions.json"
+            call_command(
+                "benchmark_sessions", use_current_db=True, requests=2,
+                plants=2, tasks_per_plant=1, output=str(output),
+                stdout=StringIO(),
+            )
+            payload = json.loads(output.read_text())
+
+        results = payload["results"]
+        self.assertEqual(len(results), 12)
+        self.assertEqual(
+            results["db+fallback/dashboard"]["session_queries_per_request"],
+            1,
+        )
+        self.assertEqual(
+            results["cached_db+cookie/dashboard"]
+            ["session_queries_per_request"],
+            0,
+        )
+
+
+class BenchmarkAsgiCommandTests(TransactionTestCase):
+    # The ASGI handler runs each request in a thread of its own, so the
+    # seeded garden has to be committed for it to be visible.
+
+    def test_serves_every_page_through_both_handlers(self):
+        call_command(
+            "seed_garden", users=1, plants_per_user=3, tasks_per_plant=2,
+            stdout=StringIO(),
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "asgi.json"
+            call_command(
+                "benchmark_asgi", use_current_db=True, users=1, requests=12,
+                latency_ms=1, threads=2, concurrency=4, output=str(output),
+                stdout=StringIO(),
+            )
+            payload = json.loads(output.read_text())
+
+        self.assertEqual(payload["suite"], "asgi")
+        self.assertGreater(payload["config"]["asgi_throughput_rps"], 0)
+        for mode in ("wsgi", "asgi"):
+            for page in ("dashboard", "plant_list", "bed_list",
+                         "plant_detail", "bed_detail", "task_detail"):
+                result = payload["results"][f"{mode}/{page}"]
+                self.assertEqual(result["count"], 2)
+                self.assertEqual(result["errors"], 0)
+
+        with self.assertRaises(CommandError):
+            call_command("benchmark_asgi", threads=0, stdout=StringIO())
+
+
+class BenchmarkSchedulingCommandTests(SimpleTestCase):
+
+    def run_suite(self, output, **options):
+        call_command(
+            "benchmark_scheduling", repeat=1, min_time=0.0001,
+            output=str(output), stdout=StringIO(), **options
+        )
+        return json.loads(output.read_text())
+
+    def test_covers_every_frequency_and_window(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            payload = self.run_suite(Path(tmp) / "scheduling.json")
+
+        self.assertEqual(payload["metric"], "best_ns")
+        results = payload["results"]
+        for frequency in ("7d", "14d", "1m", "3m", "6m", "12m"):
+            for window in ("all-year", "window", "wrap-around",
+                           "single-month"):
+                self.assertIn(f"skip[{frequency}/{window}]", results)
+                self.assertIn(f"mark_done[{frequency}/{window}]", results)
+        self.assertGreater(results["add_months[12]"]["best_ns"], 0)
+
+    def test_compare_fails_on_regression(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            current = Path(tmp) / "current.json"
+            self.run_suite(current, filter="is_in_season")
+
+            baseline = json.loads(current.read_text())
+            for row in baseline["results"].values():
+                row["best_ns"] /= 10
+            slower = Path(tmp) / "baseline.json"
+            slower.write_text(json.dumps(baseline))
+
+            call_command(
+                "compare_benchmarks", str(current), str(current),
+                stdout=StringIO(),
+            )
+            with self.assertRaisesMessage(CommandError, "regressed"):
+                call_command(
+                    "compare_benchmarks", str(slower), str(current),
+                    stdout=StringIO(),
+                )
@@ -0,0 +1,119 @@
+from django.test import TestCase, SimpleTestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from core.calendar_feed import fold
+from core.models import CalendarFeed, Plant, PlantTask, PlantType
+import datetime
+
+
+class FoldTests(SimpleTestCase):
+
+    def test_short_lines_are_not_folded(self):
+        self.assertEqual(fold("SUMMARY:Water"), "SUMMARY:Water\r\n")
+
+    def test_long_lines_fold_at_75_octets_between_characters(self):
+        line = "SUMMARY:" + "é" * 80
+        folded = fold(line)
+
+        parts = folded.split("\r\n")
+        self.assertEqual(parts[-1], "")
+        for part in parts[:-1]:
+            self.assertLessEqual(len(part.encode()), 75)
+        self.assertEqual(folded.replace("\r\n ", "").rstrip(), line)
+
+
+class CalendarFeedTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="mark", password="pass")
+        self.today = datetime.date.today()
+        self.plant = Plant.objects.create(
+            owner=self.user, name="Tomato", type=PlantType.VEGETABLE
+        )
+        self.task = PlantTask.objects.create(
+            user=self.user, plant=self.plant, name="Watering, deep",
+            frequency="7d", next_due=self.today,
+        )
+        self.feed = CalendarFeed.objects.create(user=self.user)
+        self.url = reverse("calendar_feed", args=[self.feed.token])
+
+    def get_feed(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        if response.streaming:
+            response.ics = b"".join(response.streaming_content).decode()
+        return response
+
+    def test_all_year_task_uses_rrule(self):
+        response = self.get_feed()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["Content-Type"], "text/calendar; charset=utf-8"
+        )
+        self.assertTrue(response.ics.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(response.ics.endswith("END:VCALENDAR\r\n"))
+        self.assertIn("RRULE:FREQ=DAILY;INTERVAL=7", response.ics)
+        self.assertIn("SUMMARY:Watering\\, deep (Tomato)", response.ics)
+        self.assertEqual(response.ics.count("BEGIN:VEVENT"), 1)
+
+    def test_seasonal_task_is_expanded(self):
+        self.task.all_year = False
+        self.task.seasonal_start_month = self.today.month
+        self.task.seasonal_end_month = self.today.month
+        self.task.frequency = "12m"
+        self.task.save()
+
+        text = self.get_feed().ics
+
+        self.assertNotIn("RRULE", text)
+        self.assertEqual(text.count("BEGIN:VEVENT"), 1)
+        self.assertIn(
+            f"DTSTART;VALUE=DATE:{self.today:%Y%m%d}", text
+        )
+
+    def test_overdue_task_starts_today(self):
+        self.task.next_due = self.today - datetime.timedelta(days=10)
+        self.task.save()
+        self.assertIn(
+            f"DTSTART;VALUE=DATE:{self.today:%Y%m%d}", self.get_feed().ics
+        )
+
+    def test_inactive_tasks_and_other_users_are_left_out(self):
+        other = User.objects.create_user(username="anna", password="pass")
+        plant = Plant.objects.create(
+            owner=other, name="Basil", type=PlantType.HERB
+        )
+        PlantTask.objects.create(
+            user=other, plant=plant, name="Feeding", frequency="7d",
+            next_due=self.today,
+        )
+        self.task.active = False
+        self.task.save()
+
+        self.assertNotIn("BEGIN:VEVENT", self.get_feed().ics)
+
+    def test_unchanged_feed_is_not_modified(self):
+        etag = self.get_feed()["ETag"]
+
+        with self.assertNumQueries(2):
+            response = self.get_feed(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.task.frequency = "14d"
+        self.task.save()
+        self.assertEqual(self.get_feed(if_none_match=etag).status_code, 200)
+
+    def test_unknown_token_is_not_found(self):
+        response = self.client.get(reverse("calendar_feed", args=["nope"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_settings_page_shows_and_resets_token(self):
+        self.client.login(username="mark", password="pass")
+        settings_url = reverse("calendar_feed_settings")
+
+        self.assertContains(self.client.get(settings_url), self.feed.token)
+
+        self.client.post(settings_url)
+        self.feed.refresh_from_db()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertContains(self.client.get(settings_url), self.feed.token)
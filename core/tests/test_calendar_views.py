@@ -1,6 +1,10 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth.models import User
+from core.models import Plant, PlantTask, PlantType
+from core.views import RANGE_PAGE_SIZE
 import datetime
 
 
@@ -28,6 +32,20 @@ class CalendarViewTests(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertIn("/accounts/login/", response.url)
 
+    @override_settings(
+        SESSION_ENGINE="django.contrib.sessions.backends.cached_db"
+    )
+    def test_dashboard_reads_session_from_cache(self):
+        self.client.login(username="mark", password="pass")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("dashboard"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([
+            query for query in queries
+            if "django_session" in query["sql"]
+        ])
+
     def test_dashboard_loads_for_logged_in_user(self):
         self.client.login(username="mark", password="pass")
         response = self.client.get(reverse("dashboard"))
@@ -93,3 +111,95 @@ class CalendarViewTests(TestCase):
 
         self.assertEqual(response.context["selected_month"], self.today.month)
         self.assertEqual(response.context["selected_year"], self.today.year)
+
+
+class DashboardRangeViewTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="mark", password="pass")
+        self.today = datetime.date.today()
+        self.plant = Plant.objects.create(
+            owner=self.user, name="Tomato", type=PlantType.VEGETABLE
+        )
+        self.task = PlantTask.objects.create(
+            user=self.user, plant=self.plant, name="Watering",
+            frequency="7d", next_due=self.today,
+        )
+        self.client.login(username="mark", password="pass")
+
+    def get(self, **params):
+        return self.client.get(reverse("dashboard"), params)
+
+    def test_year_view_lists_every_occurrence(self):
+        response = self.get(view="year")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "core/dashboard_range.html")
+        self.assertEqual(response.context["start"].year, self.today.year)
+        days_left = (
+            datetime.date(self.today.year + 1, 1, 1) - self.today
+        ).days
+        self.assertEqual(response.context["total"], (days_left + 6) // 7)
+        self.assertEqual(response.context["task_count"], 1)
+
+    def test_week_view_starts_on_monday(self):
+        response = self.get(view="week")
+        start = response.context["start"]
+        self.assertEqual(start.weekday(), 0)
+        self.assertEqual(response.context["entries"][0]["date"], self.today)
+
+    def test_quarter_view_follows_date(self):
+        anchor = datetime.date(self.today.year + 1, 5, 20)
+        response = self.get(view="quarter", date=anchor.isoformat())
+
+        self.assertEqual(
+            response.context["start"], datetime.date(anchor.year, 4, 1)
+        )
+        self.assertEqual(
+            response.context["last_day"], datetime.date(anchor.year, 6, 30)
+        )
+        self.assertTrue(response.context["has_previous"])
+
+    def test_past_or_invalid_date_snaps_back_to_today(self):
+        for value in ("2000-01-01", "not-a-date"):
+            with self.subTest(value=value):
+                response = self.get(view="quarter", date=value)
+                self.assertLessEqual(response.context["start"], self.today)
+                self.assertFalse(response.context["has_previous"])
+
+    def test_overdue_task_is_due_today_unless_hidden(self):
+        self.task.next_due = self.today - datetime.timedelta(days=3)
+        self.task.save()
+
+        entry = self.get(view="week").context["entries"][0]
+        self.assertEqual(entry["date"], self.today)
+        self.assertTrue(entry["overdue"])
+
+        response = self.get(view="week", hide_overdue="1")
+        self.assertEqual(response.context["total"], 0)
+
+    def test_occurrences_are_paginated(self):
+        for number in range(RANGE_PAGE_SIZE):
+            PlantTask.objects.create(
+                user=self.user, plant=self.plant, name=f"Task {number}",
+                frequency="7d", next_due=self.today,
+            )
+
+        first = self.get(view="week")
+        second = self.get(view="week", page=2)
+
+        self.assertEqual(len(first.context["entries"]), RANGE_PAGE_SIZE)
+        self.assertEqual(len(second.context["entries"]), 1)
+        self.assertContains(first, "page=2")
+
+    def test_other_users_tasks_are_not_listed(self):
+        other = User.objects.create_user(username="anna", password="pass")
+        other_plant = Plant.objects.create(
+            owner=other, name="Basil", type=PlantType.HERB
+        )
+        PlantTask.objects.create(
+            user=other, plant=other_plant, name="Feeding",
+            frequency="7d", next_due=self.today,
+        )
+        response = self.get(view="year")
+        self.assertNotContains(response, "Feeding")
@@ -0,0 +1,123 @@
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.contrib.auth.models import User
+from core.digests import due_digests
+from core.management.commands.send_due_digests import Command
+from core.models import Plant, PlantTask, PlantType
+import datetime
+
+
+class DueDigestTests(TestCase):
+
+    TODAY = datetime.date(2026, 5, 1)
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="mark", password="pass", email="mark@example.com"
+        )
+        self.plant = Plant.objects.create(
+            owner=self.user, name="Tomato", type=PlantType.VEGETABLE
+        )
+        self.make_task(self.user, self.plant, "Watering", self.TODAY)
+        self.make_task(
+            self.user, self.plant, "Feeding",
+            self.TODAY - datetime.timedelta(days=3),
+        )
+        # Not due yet
+        self.make_task(
+            self.user, self.plant, "Pruning",
+            self.TODAY + datetime.timedelta(days=1),
+        )
+
+    def make_task(self, user, plant, name, next_due, **fields):
+        return PlantTask.objects.create(
+            user=user, plant=plant, name=name, frequency="7d",
+            next_due=next_due, **fields
+        )
+
+    def make_user(self, username, email="", **fields):
+        user = User.objects.create_user(
+            username=username, password="pass", email=email, **fields
+        )
+        plant = Plant.objects.create(
+            owner=user, name="Basil", type=PlantType.HERB
+        )
+        self.make_task(user, plant, "Harvest", self.TODAY)
+        return user
+
+    def send(self, *args):
+        out = StringIO()
+        call_command(
+            "send_due_digests", "--date", self.TODAY.isoformat(), *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test_digests_use_one_query_for_all_users(self):
+        for number in range(5):
+            self.make_user(f"user{number}", f"user{number}@example.com")
+
+        with self.assertNumQueries(1):
+            digests = list(due_digests(self.TODAY))
+
+        self.assertEqual(len(digests), 6)
+        mark = next(d for d in digests if d["username"] == "mark")
+        self.assertEqual(
+            [task["name"] for task in mark["overdue"]], ["Feeding"]
+        )
+        self.assertEqual(
+            [task["name"] for task in mark["due_today"]], ["Watering"]
+        )
+
+    def test_users_without_email_or_inactive_are_skipped(self):
+        self.make_user("noemail")
+        self.make_user("gone", "gone@example.com", is_active=False)
+        emails = [digest["email"] for digest in due_digests(self.TODAY)]
+        self.assertEqual(emails, ["mark@example.com"])
+
+    def test_command_sends_one_email_per_user(self):
+        self.make_user("anna", "anna@example.com")
+        output = self.send("--workers", "1", "--batch-size", "1")
+
+        self.assertIn("Sent 2 digests", output)
+        self.assertEqual(len(mail.outbox), 2)
+        message = next(m for m in mail.outbox if m.to == ["mark@example.com"])
+        self.assertEqual(message.subject, "2 garden tasks to catch up on")
+        self.assertIn("Feeding (Tomato), due 28 April", message.body)
+        self.assertIn("Watering (Tomato)", message.body)
+        self.assertNotIn("Pruning", message.body)
+        self.assertIn("/dashboard/", message.body)
+
+    def test_command_renders_in_worker_processes(self):
+        self.send("--workers", "2")
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Watering", mail.outbox[0].body)
+
+    def test_dry_run_sends_nothing(self):
+        output = self.send("--workers", "1", "--dry-run")
+        self.assertIn("[dry run] Sent 1 digest ", output)
+        self.assertEqual(mail.outbox, [])
+
+
+class RenderInPoolTests(SimpleTestCase):
+
+    def test_chunks_are_read_a_round_at_a_time(self):
+        read = []
+
+        def chunks():
+            for number in range(10):
+                read.append(number)
+                yield [number]
+
+        class Pool:
+            def map(self, function, *iterables):
+                return [chunk for chunk, _ in zip(*iterables)]
+
+        rendered = Command().render_in_pool(Pool(), chunks(), workers=2)
+
+        self.assertEqual(next(rendered), [0])
+        self.assertEqual(read, [0, 1, 2, 3])
+        self.assertEqual(list(rendered), [[n] for n in range(1, 10)])
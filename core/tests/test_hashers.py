@@ -0,0 +1,75 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher, check_password, make_password,
+)
+from django.test import SimpleTestCase, override_settings
+
+from core import hashers, metrics
+from core.hashers import BoundedPBKDF2PasswordHasher
+
+
+class BoundedHasherTests(SimpleTestCase):
+
+    def setUp(self):
+        # Start each test with a pool built from its own settings
+        hashers._pool = None
+
+    def tearDown(self):
+        if hashers._pool is not None:
+            hashers._pool.shutdown()
+        hashers._pool = None
+
+    def test_hashes_match_plain_pbkdf2(self):
+        bounded = BoundedPBKDF2PasswordHasher()
+        self.assertEqual(
+            bounded.encode("secret", "salt", 1000),
+            PBKDF2PasswordHasher().encode("secret", "salt", 1000),
+        )
+
+    def test_existing_hashes_still_verify(self):
+        encoded = PBKDF2PasswordHasher().encode("secret", "salt", 1000)
+        self.assertTrue(check_password("secret", encoded))
+        self.assertFalse(check_password("wrong", encoded))
+        self.assertTrue(check_password("secret", make_password("secret")))
+
+    @override_settings(PASSWORD_HASH_WORKERS=2)
+    def test_concurrent_hashes_are_capped(self):
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def slow_encode(self, password, salt, iterations=None):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return "hash"
+
+        with mock.patch.object(PBKDF2PasswordHasher, "encode", slow_encode):
+            with ThreadPoolExecutor(max_workers=6) as callers:
+                results = list(callers.map(
+                    lambda _: BoundedPBKDF2PasswordHasher().encode(
+                        "secret", "salt"
+                    ),
+                    range(6),
+                ))
+
+        self.assertEqual(results, ["hash"] * 6)
+        self.assertEqual(peak, 2)
+
+    def test_queue_and_hash_time_are_recorded(self):
+        request_metrics, token = metrics.start()
+        try:
+            BoundedPBKDF2PasswordHasher().encode("secret", "salt", 1000)
+        finally:
+            metrics.finish(token)
+
+        self.assertIn("hash_queue", request_metrics.timings)
+        self.assertGreater(request_metrics.timings["hash"], 0)
@@ -0,0 +1,158 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from core.history import monthly_stats, plant_stats, record_task_actions
+from core.models import (
+    Plant, PlantTask, PlantType, PlantTaskRollup, TaskAction,
+    TaskCompletion, UserTaskRollup,
+)
+import datetime
+
+
+class TaskHistoryTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="mark", password="pass")
+        self.plant = Plant.objects.create(
+            owner=self.user, name="Tomato", type=PlantType.VEGETABLE
+        )
+        self.other_plant = Plant.objects.create(
+            owner=self.user, name="Basil", type=PlantType.HERB
+        )
+        self.task = PlantTask.objects.create(
+            user=self.user,
+            plant=self.plant,
+            name="Watering",
+            frequency="7d",
+            next_due=datetime.date.today(),
+        )
+        self.client.login(username="mark", password="pass")
+
+    def make_task(self, plant, name="Feeding"):
+        return PlantTask.objects.create(
+            user=self.user, plant=plant, name=name, frequency="14d",
+            next_due=datetime.date.today(),
+        )
+
+    # ---------------------------------------------------------
+    # EVENTS WRITTEN BY THE VIEWS
+    # ---------------------------------------------------------
+
+    def test_mark_done_records_completion_and_rollups(self):
+        self.client.post(reverse("task_mark_done", args=[self.task.pk]))
+
+        event = TaskCompletion.objects.get()
+        self.assertEqual(event.task, self.task)
+        self.assertEqual(event.plant, self.plant)
+        self.assertEqual(event.action, TaskAction.DONE)
+        self.assertEqual(event.due_on, datetime.date.today())
+        self.assertTrue(event.on_time)
+
+        rollup = UserTaskRollup.objects.get(user=self.user)
+        self.assertEqual(rollup.month, datetime.date.today().replace(day=1))
+        self.assertEqual(
+            (rollup.done_count, rollup.skipped_count, rollup.on_time_count),
+            (1, 0, 1),
+        )
+
+    def test_repeated_mark_done_on_the_same_day_is_recorded_once(self):
+        url = reverse("task_mark_done", args=[self.task.pk])
+        self.client.post(url)
+        response = self.client.post(url)
+        self.client.post(
+            reverse("task_bulk_action"),
+            {"action": "done", "task_ids": [self.task.pk]},
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(TaskCompletion.objects.count(), 1)
+        self.assertEqual(UserTaskRollup.objects.get().done_count, 1)
+        self.assertEqual(PlantTaskRollup.objects.get().done_count, 1)
+
+    def test_skip_records_skip(self):
+        self.client.post(reverse("task_skip", args=[self.task.pk]))
+        self.client.post(reverse("task_skip", args=[self.task.pk]))
+
+        self.assertEqual(
+            TaskCompletion.objects.filter(action=TaskAction.SKIP).count(), 2
+        )
+        rollup = PlantTaskRollup.objects.get(plant=self.plant)
+        self.assertEqual(rollup.skipped_count, 2)
+        self.assertEqual(rollup.done_count, 0)
+
+    def test_bulk_action_records_every_task(self):
+        second = self.make_task(self.plant)
+        third = self.make_task(self.other_plant)
+
+        self.client.post(reverse("task_bulk_action"), {
+            "action": "done",
+            "task_ids": [self.task.pk, second.pk, third.pk],
+        })
+
+        self.assertEqual(TaskCompletion.objects.count(), 3)
+        self.assertEqual(
+            UserTaskRollup.objects.get(user=self.user).done_count, 3
+        )
+        self.assertEqual(
+            dict(PlantTaskRollup.objects.values_list("plant", "done_count")),
+            {self.plant.pk: 2, self.other_plant.pk: 1},
+        )
+
+    def test_history_survives_task_deletion(self):
+        self.client.post(reverse("task_mark_done", args=[self.task.pk]))
+        self.task.delete()
+
+        event = TaskCompletion.objects.get()
+        self.assertIsNone(event.task)
+        self.assertEqual(event.plant, self.plant)
+
+    # ---------------------------------------------------------
+    # STATISTICS
+    # ---------------------------------------------------------
+
+    def test_monthly_stats_reads_rollups(self):
+        today = datetime.date(2026, 3, 15)
+        late = datetime.date(2026, 1, 1)
+        record_task_actions(
+            [(self.task, late)], TaskAction.DONE, datetime.date(2026, 1, 5)
+        )
+        record_task_actions(
+            [(self.task, None)], TaskAction.DONE, datetime.date(2026, 2, 5)
+        )
+        record_task_actions(
+            [(self.task, None)], TaskAction.SKIP, datetime.date(2026, 2, 20)
+        )
+
+        # One query, however many events there are
+        with self.assertNumQueries(1):
+            stats = monthly_stats(self.user, months=3, today=today)
+
+        self.assertEqual(
+            [(row["month"].month, row["done"]) for row in stats["months"]],
+            [(1, 1), (2, 1), (3, 0)],
+        )
+        self.assertEqual(stats["done"], 2)
+        self.assertAlmostEqual(stats["completion_rate"], 2 / 3)
+        self.assertEqual(stats["on_time_rate"], 0.5)
+        # March has nothing yet but is not over, so the streak holds
+        self.assertEqual(stats["streak"], 2)
+
+    def test_plant_stats_groups_by_plant(self):
+        record_task_actions(
+            [(self.task, None), (self.make_task(self.other_plant), None)],
+            TaskAction.DONE,
+        )
+        rows = list(plant_stats(self.user, datetime.date.today()))
+        self.assertEqual(
+            {row["plant__name"]: row["done"] for row in rows},
+            {"Tomato": 1, "Basil": 1},
+        )
+
+    def test_history_page(self):
+        self.client.post(reverse("task_mark_done", args=[self.task.pk]))
+        response = self.client.get(reverse("task_history"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "core/history.html")
+        self.assertEqual(response.context["stats"]["done"], 1)
+        self.assertContains(response, "Tomato")
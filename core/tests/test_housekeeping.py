@@ -0,0 +1,223 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django_summernote.utils import get_attachment_model
+from core.housekeeping import run_housekeeping
+from core.models import Plant, PlantTask, PlantType, TaskChange
+import datetime
+
+NOW = timezone.make_aware(datetime.datetime(2026, 6, 1, 12))
+LONG_AGO = NOW - datetime.timedelta(days=30)
+
+
+class HousekeepingRowTests(TestCase):
+
+    def test_expired_sessions_are_deleted_in_batches(self):
+        for number in range(5):
+            Session.objects.create(
+                session_key=f"old{number}", session_data="",
+                expire_date=NOW - datetime.timedelta(minutes=1),
+            )
+        Session.objects.create(
+            session_key="live", session_data="",
+            expire_date=NOW + datetime.timedelta(days=1),
+        )
+        progress = mock.Mock()
+
+        totals = run_housekeeping(
+            ["sessions"], batch_size=2, progress=progress, now=NOW
+        )
+
+        self.assertEqual(totals, {"sessions": 5})
+        self.assertEqual(
+            list(Session.objects.values_list("session_key", flat=True)),
+            ["live"],
+        )
+        self.assertEqual(
+            progress.call_args_list,
+            [mock.call("sessions", total) for total in (2, 4, 5)],
+        )
+
+    @override_settings(
+        SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies"
+    )
+    def test_cookie_sessions_have_nothing_to_delete(self):
+        self.assertEqual(
+            run_housekeeping(["sessions"], now=NOW), {"sessions": 0}
+        )
+
+    @override_settings(TASK_CHANGE_RETENTION_DAYS=7)
+    def test_old_task_changes_are_deleted(self):
+        TaskChange.objects.bulk_create([
+            TaskChange(task_id=1, created_at=LONG_AGO),
+            TaskChange(task_id=2, created_at=NOW),
+        ])
+        self.assertEqual(
+            run_housekeeping(["task_changes"], now=NOW),
+            {"task_changes": 1},
+        )
+        self.assertEqual(
+            list(TaskChange.objects.values_list("task_id", flat=True)), [2]
+        )
+
+    def test_dry_run_deletes_nothing(self):
+        TaskChange.objects.create(task_id=1, created_at=LONG_AGO)
+        self.assertEqual(
+            run_housekeeping(["task_changes"], dry_run=True, now=NOW),
+            {"task_changes": 1},
+        )
+        self.assertTrue(TaskChange.objects.exists())
+
+
+@override_settings(HOUSEKEEPING_GRACE_HOURS=24)
+class HousekeepingUploadTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="mark", password="pass")
+        self.attachment_model = get_attachment_model()
+
+    def attach(self, name, uploaded=LONG_AGO):
+        attachment = self.attachment_model.objects.create(file=name)
+        self.attachment_model.objects.filter(pk=attachment.pk).update(
+            uploaded=uploaded
+        )
+        return attachment
+
+    def test_only_unreferenced_old_attachments_are_deleted(self):
+        used = self.attach("summernote/2026-05-01/used_abc.png")
+        orphan = self.attach("summernote/2026-05-01/orphan_def.png")
+        recent = self.attach("summernote/2026-06-01/new_ghi.png", NOW)
+        Plant.objects.create(
+            owner=self.user, name="Tomato", type=PlantType.VEGETABLE,
+            notes='<img src="https://res.cloudinary.com/demo/image/upload/'
+                  'v1/media/summernote/2026-05-01/used_abc">',
+        )
+        storage = self.attachment_model._meta.get_field("file").storage
+
+        with mock.patch.object(storage, "delete") as delete:
+            totals = run_housekeeping(
+                ["attachments"], batch_size=2, now=NOW
+            )
+
+        self.assertEqual(totals, {"attachments": 1})
+        delete.assert_called_once_with(orphan.file.name)
+        self.assertEqual(
+            set(self.attachment_model.objects.values_list("pk", flat=True)),
+            {used.pk, recent.pk},
+        )
+
+    def test_attachments_linked_from_task_notes_are_kept(self):
+        used = self.attach("summernote/2026-05-01/task_abc.png")
+        plant = Plant.objects.create(
+            owner=self.user, name="Tomato", type=PlantType.VEGETABLE,
+        )
+        PlantTask.objects.create(
+            user=self.user, plant=plant, name="Watering", frequency="7d",
+            notes='<img src="https://res.cloudinary.com/demo/image/upload/'
+                  'v1/media/summernote/2026-05-01/task_abc">',
+        )
+        storage = self.attachment_model._meta.get_field("file").storage
+
+        with mock.patch.object(storage, "delete") as delete:
+            totals = run_housekeeping(["attachments"], now=NOW)
+
+        self.assertEqual(totals, {"attachments": 0})
+        delete.assert_not_called()
+        self.assertTrue(
+            self.attachment_model.objects.filter(pk=used.pk).exists()
+        )
+
+    @override_settings(
+        HOUSEKEEPING_DELETE_IMAGES=True, PLANT_IMAGE_FOLDER="plants"
+    )
+    @mock.patch("core.purge.cloudinary.api.delete_resources")
+    @mock.patch("core.housekeeping.cloudinary.api.resources")
+    def test_only_unused_old_images_are_deleted(self, resources,
+                                                delete_resources):
+        Plant.objects.create(
+            owner=self.user, name="Tomato", type=PlantType.VEGETABLE,
+            image="image/upload/v1/plants/in_use.jpg",
+        )
+        old = "2026-05-01T10:00:00Z"
+        resources.side_effect = [
+            {
+                "resources": [
+                    {"public_id": "plants/in_use", "created_at": old},
+                    {"public_id": "plants/replaced", "created_at": old},
+                ],
+                "next_cursor": "page2",
+            },
+            {
+                "resources": [
+                    {"public_id": "other_app/x", "created_at": old},
+                    {"public_id": "plants/just_uploaded",
+                     "created_at": "2026-06-01T11:00:00Z"},
+                ],
+            },
+        ]
+
+        totals = run_housekeeping(["images"], now=NOW)
+
+        self.assertEqual(totals, {"images": 1})
+        delete_resources.assert_called_once_with(["plants/replaced"])
+        self.assertEqual(
+            resources.call_args_list[0].kwargs["prefix"], "plants/"
+        )
+        self.assertEqual(
+            resources.call_args_list[1].kwargs["next_cursor"], "page2"
+        )
+
+    @override_settings(HOUSEKEEPING_DELETE_IMAGES=False)
+    @mock.patch("core.purge.cloudinary.api.delete_resources")
+    @mock.patch("core.housekeeping.cloudinary.api.resources")
+    def test_images_are_only_deleted_when_enabled(self, resources,
+                                                  delete_resources):
+        resources.return_value = {"resources": [
+            {"public_id": "plants/replaced",
+             "created_at": "2026-05-01T10:00:00Z"},
+        ]}
+
+        with self.assertLogs("core.housekeeping", "ERROR"):
+            totals = run_housekeeping(["images"], now=NOW)
+        self.assertEqual(totals, {"images": None})
+        self.assertNotIn("images", run_housekeeping(now=NOW))
+
+        totals = run_housekeeping(["images"], dry_run=True, now=NOW)
+        self.assertEqual(totals, {"images": 1})
+        delete_resources.assert_not_called()
+
+
+class HousekeepingCommandTests(TestCase):
+
+    def test_reports_per_job_totals(self):
+        TaskChange.objects.create(
+            task_id=1, created_at=timezone.now() - datetime.timedelta(days=30)
+        )
+        out = StringIO()
+        call_command("housekeeping", "task_changes", "--dry-run", stdout=out)
+        self.assertIn("task_changes: would delete 1", out.getvalue())
+        self.assertTrue(TaskChange.objects.exists())
+
+        call_command("housekeeping", "task_changes", stdout=StringIO())
+        self.assertFalse(TaskChange.objects.exists())
+
+    def test_unknown_job_is_an_error(self):
+        with self.assertRaises(CommandError):
+            call_command("housekeeping", "everything", stdout=StringIO())
+
+    @override_settings(HOUSEKEEPING_DELETE_IMAGES=True)
+    @mock.patch("core.housekeeping.cloudinary.api.resources")
+    def test_failed_job_is_reported_after_the_others(self, resources):
+        resources.side_effect = Exception("Cloudinary is down")
+        with self.assertLogs("core.housekeeping", "ERROR"), \
+                self.assertRaisesMessage(CommandError, "Failed: images"):
+            call_command(
+                "housekeeping", "sessions", "images",
+                stdout=StringIO(), stderr=StringIO(),
+            )
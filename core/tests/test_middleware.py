@@ -0,0 +1,209 @@
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from core.models import GardenBed
+from core.profiling import StackSampler, run_profiled
+from unittest import mock
+import calendar
+import json
+import threading
+import time
+
+
+class RequestTimingMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="mark", password="pass")
+        self.staff = User.objects.create_user(
+            username="admin", password="pass", is_staff=True
+        )
+        GardenBed.objects.create(owner=self.user, name="Main Bed")
+
+    # ---------------------------------------------------------
+    # SERVER-TIMING HEADER
+    # ---------------------------------------------------------
+
+    def test_server_timing_hidden_from_normal_users(self):
+        self.client.login(username="mark", password="pass")
+        response = self.client.get(reverse("bed_list"))
+        self.assertNotIn("Server-Timing", response.headers)
+
+    def test_server_timing_shown_to_staff(self):
+        self.client.login(username="admin", password="pass")
+        response = self.client.get(reverse("dashboard"))
+
+        header = response.headers["Server-Timing"]
+        self.assertIn("total;dur=", header)
+        self.assertIn("db;dur=", header)
+        self.assertIn("tpl;dur=", header)
+
+    # ---------------------------------------------------------
+    # STRUCTURED LOG LINE
+    # ---------------------------------------------------------
+
+    def test_request_is_logged_as_json(self):
+        self.client.login(username="mark", password="pass")
+
+        with self.assertLogs("core.request_timing", level="INFO") as logs:
+            self.client.get(reverse("bed_list"))
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record["view"], "bed_list")
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["user_id"], self.user.pk)
+        self.assertGreater(record["db_queries"], 0)
+        self.assertGreater(record["template_ms"], 0)
+
+    @override_settings(
+        SESSION_ENGINE="django.contrib.sessions.backends.cached_db"
+    )
+    def test_cache_reads_are_counted(self):
+        self.client.login(username="mark", password="pass")
+        cache.clear()
+
+        with self.assertLogs("core.request_timing", level="INFO") as logs:
+            # The first request loads the session from the database and
+            # caches it; the second is served from the cache.
+            self.client.get(reverse("bed_list"))
+            self.client.get(reverse("bed_list"))
+
+        first, second = (
+            json.loads(record.getMessage()) for record in logs.records
+        )
+        self.assertGreater(first["cache_misses"], 0)
+        self.assertGreater(second["cache_hits"], 0)
+
+    # ---------------------------------------------------------
+    # ASYNC (ASGI) CHAIN
+    # ---------------------------------------------------------
+
+    @override_settings(
+        DEBUG=True,
+        PROFILING_ENABLED=True,
+        READ_REPLICAS=["default"],
+        SHARDS=["default"],
+    )
+    def test_asgi_chain_has_no_sync_middleware(self):
+        # Django logs (in DEBUG) each middleware it has to adapt
+        with self.assertNoLogs("django.request", "DEBUG"):
+            ASGIHandler()
+
+    async def test_async_requests_are_timed(self):
+        await self.async_client.alogin(username="admin", password="pass")
+
+        with self.assertLogs("core.request_timing", level="INFO") as logs:
+            response = await self.async_client.get(reverse("bed_list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("db;dur=", response.headers["Server-Timing"])
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record["view"], "bed_list")
+        self.assertGreater(record["db_queries"], 0)
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_RATE_LIMIT_SECONDS=30)
+class ProfilingMiddlewareTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="mark", password="pass")
+        self.staff = User.objects.create_user(
+            username="admin", password="pass", is_staff=True
+        )
+
+    def test_profile_parameter_ignored_for_normal_users(self):
+        self.client.login(username="mark", password="pass")
+        response = self.client.get(reverse("dashboard") + "?_profile=cprofile")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "core/dashboard.html")
+
+    def test_staff_can_profile_with_cprofile(self):
+        self.client.login(username="admin", password="pass")
+        response = self.client.get(reverse("dashboard") + "?_profile=cprofile")
+
+        self.assertEqual(response["Content-Type"], "text/plain")
+        self.assertEqual(response["X-Profile-Status"], "200")
+        report = response.content.decode()
+        self.assertIn("function calls", report)
+        # dashboard is an async view: its own frames are in the report
+        self.assertRegex(report, r"views\.py:\d+\(dashboard\)")
+
+    def test_staff_can_profile_with_sampler_via_header(self):
+        def slow_monthrange(year, month):
+            end = time.perf_counter() + 0.02
+            while time.perf_counter() < end:
+                pass
+            return calendar.monthrange(year, month)
+
+        self.client.login(username="admin", password="pass")
+        # Keeps the dashboard coroutine itself busy for long enough to
+        # be sampled
+        with mock.patch("core.views.monthrange", slow_monthrange):
+            response = self.client.get(
+                reverse("dashboard"), headers={"X-Profile": "sample"}
+            )
+
+        self.assertEqual(response["Content-Type"], "text/plain")
+        self.assertIn(".folded", response["Content-Disposition"])
+        self.assertIn(
+            "dashboard (views.py", response.content.decode()
+        )
+
+    def test_profiling_is_rate_limited(self):
+        self.client.login(username="admin", password="pass")
+        url = reverse("dashboard") + "?_profile=cprofile"
+
+        self.client.get(url)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_profile_parameter_ignored_when_disabled(self):
+        self.client.login(username="admin", password="pass")
+        response = self.client.get(reverse("dashboard") + "?_profile=cprofile")
+
+        self.assertTemplateUsed(response, "core/dashboard.html")
+
+
+class StackSamplerTests(SimpleTestCase):
+
+    def test_folded_output_is_root_first(self):
+        def busy():
+            end = time.perf_counter() + 0.05
+            while time.perf_counter() < end:
+                pass
+
+        sampler = StackSampler(threading.get_ident(), interval=0.001)
+        with sampler:
+            busy()
+
+        report = sampler.folded()
+        self.assertIn("busy (test_middleware.py", report)
+        line = report.splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+
+    def test_coroutines_are_sampled_in_their_own_thread(self):
+        async def busy_view(request):
+            end = time.perf_counter() + 0.05
+            while time.perf_counter() < end:
+                pass
+            return "done"
+
+        result, report = run_profiled("sample", busy_view, None)
+
+        self.assertEqual(result, "done")
+        self.assertIn("busy_view (test_middleware.py", report)
+
+    def test_coroutines_are_profiled_with_cprofile(self):
+        async def busy_view(request):
+            return sum(range(1000))
+
+        result, report = run_profiled("cprofile", busy_view, None)
+
+        self.assertEqual(result, sum(range(1000)))
+        self.assertIn("(busy_view)", report)
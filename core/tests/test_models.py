@@ -231,6 +231,61 @@ class PlantTaskModelTests(TestCase):
         task.skip()
         self.assertEqual(task.next_due, datetime.date(2024, 4, 1))
 
+    # ---------------------------------------------------------
+    # CHANGED FIELDS + CONDITIONAL SAVE
+    # ---------------------------------------------------------
+
+    def test_mark_done_reports_changed_fields(self):
+        task = PlantTask(frequency="7d", last_done=datetime.date(2024, 4, 1))
+        changed = task.mark_done(datetime.date(2024, 5, 1))
+        self.assertEqual(changed, ["last_done", "next_due"])
+
+        task = PlantTask(repeat=False, next_due=datetime.date(2024, 5, 1))
+        changed = task.mark_done(datetime.date(2024, 5, 1))
+        self.assertEqual(changed, ["last_done", "next_due", "active"])
+
+    def test_skip_reports_changed_fields(self):
+        task = PlantTask(frequency="7d", next_due=datetime.date(2024, 5, 1))
+        self.assertEqual(task.skip(), ["next_due"])
+
+    def test_save_if_unchanged_detects_concurrent_update(self):
+        task = PlantTask.objects.create(
+            plant=self.plant,
+            user=self.user,
+            name="Watering",
+            frequency="7d",
+            next_due=datetime.date(2024, 5, 1),
+        )
+        loaded_next_due = task.next_due
+
+        # Another device skips the task first
+        PlantTask.objects.filter(pk=task.pk).update(
+            next_due=datetime.date(2024, 5, 8)
+        )
+
+        changed = task.mark_done(datetime.date(2024, 5, 2))
+        self.assertFalse(task.save_if_unchanged(changed, loaded_next_due))
+
+        task.refresh_from_db()
+        self.assertEqual(task.next_due, datetime.date(2024, 5, 8))
+        self.assertIsNone(task.last_done)
+
+    # ---------------------------------------------------------
+    # DUE STATUS
+    # ---------------------------------------------------------
+
+    def test_due_status(self):
+        today = datetime.date(2024, 5, 1)
+        task = PlantTask(frequency="7d")
+
+        self.assertEqual(task.due_status(today), "")
+        task.next_due = datetime.date(2024, 4, 30)
+        self.assertEqual(task.due_status(today), "overdue")
+        task.next_due = today
+        self.assertEqual(task.due_status(today), "due-today")
+        task.next_due = datetime.date(2024, 5, 2)
+        self.assertEqual(task.due_status(today), "scheduled")
+
 
 # =========================================================
 # NEW TESTS — DUPLICATE BED NAME VALIDATION
@@ -0,0 +1,118 @@
+from django.test import SimpleTestCase
+from django.core.management import call_command
+from io import StringIO
+from pathlib import Path
+from PIL import Image
+from unittest import mock, skipUnless
+import shutil
+import subprocess
+import tempfile
+
+COMMAND = "core.management.commands.optimise_images"
+
+
+class OptimiseImagesCommandTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+
+        # A flat-colour PNG saved without optimisation compresses well.
+        self.png = self.root / "flat.png"
+        Image.new("RGB", (200, 200), (40, 120, 60)).save(
+            self.png, "PNG", compress_level=0
+        )
+
+    def run_command(self, *args, stderr=None):
+        out = StringIO()
+        call_command(
+            "optimise_images", str(self.root), *args,
+            stdout=out, stderr=stderr or StringIO(),
+        )
+        return out.getvalue()
+
+    def make_jpeg(self):
+        jpeg = self.root / "photo.jpg"
+        Image.effect_noise((64, 64), 40).convert("RGB").save(
+            jpeg, "JPEG", quality=90
+        )
+        return jpeg
+
+    def test_png_is_optimised_in_place_without_changing_pixels(self):
+        before = self.png.stat().st_size
+        with Image.open(self.png) as img:
+            original_pixels = list(img.getdata())
+
+        self.run_command("--formats", "")
+
+        self.assertLess(self.png.stat().st_size, before)
+        with Image.open(self.png) as img:
+            self.assertEqual(list(img.getdata()), original_pixels)
+
+    @skipUnless(shutil.which("jpegtran"), "jpegtran is not installed")
+    def test_jpeg_pixels_are_unchanged(self):
+        jpeg = self.make_jpeg()
+        before = jpeg.stat().st_size
+        with Image.open(jpeg) as img:
+            original_pixels = list(img.getdata())
+
+        self.run_command("--formats", "")
+
+        self.assertLess(jpeg.stat().st_size, before)
+        with Image.open(jpeg) as img:
+            self.assertEqual(list(img.getdata()), original_pixels)
+
+    @mock.patch(f"{COMMAND}.subprocess.run")
+    @mock.patch(f"{COMMAND}.shutil.which", return_value="/bin/jpegtran")
+    def test_jpegs_are_rewritten_by_jpegtran(self, which, run):
+        jpeg = self.make_jpeg()
+        run.return_value = subprocess.CompletedProcess(
+            [], 0, stdout=b"optimised", stderr=b""
+        )
+
+        self.run_command("--formats", "")
+
+        run.assert_called_once()
+        self.assertEqual(
+            run.call_args.args[0],
+            ["/bin/jpegtran", "-copy", "all", "-optimize", "-progressive",
+             str(jpeg)],
+        )
+        self.assertEqual(jpeg.read_bytes(), b"optimised")
+
+    def test_jpegtran_failure_skips_only_that_file(self):
+        jpeg = self.make_jpeg()
+        original = jpeg.read_bytes()
+        fake = self.root / "bin" / "jpegtran"
+        fake.parent.mkdir()
+        fake.write_text("#!/bin/sh\necho 'Corrupt JPEG data' >&2\nexit 1\n")
+        fake.chmod(0o755)
+        err = StringIO()
+
+        with mock.patch(f"{COMMAND}.shutil.which", return_value=str(fake)):
+            output = self.run_command("--formats", "", stderr=err)
+
+        self.assertIn(f"Skipped {jpeg}", err.getvalue())
+        self.assertIn("Corrupt JPEG data", err.getvalue())
+        self.assertEqual(jpeg.read_bytes(), original)
+        # The other images are still optimised and the totals reported
+        self.assertIn("flat.png", output)
+        self.assertIn("saved", output)
+
+    def test_webp_sibling_is_generated(self):
+        self.run_command("--formats", "webp")
+        self.assertTrue((self.root / "flat.webp").exists())
+
+    def test_dry_run_writes_nothing(self):
+        before = self.png.stat().st_size
+        output = self.run_command("--dry-run")
+
+        self.assertEqual(self.png.stat().st_size, before)
+        self.assertFalse((self.root / "flat.webp").exists())
+        self.assertIn("[dry run]", output)
+
+    def test_report_includes_savings(self):
+        output = self.run_command("--formats", "")
+        self.assertIn("flat.png", output)
+        self.assertIn("saved", output)
@@ -0,0 +1,150 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.history import record_task_actions
+from core.models import (
+    CalendarFeed, GardenBed, PendingDeletion, Plant, PlantTask,
+    PlantTaskRollup, PlantType, TaskAction, TaskChange, TaskCompletion,
+    UserTaskRollup,
+)
+from core.purge import purge_user, request_deletion
+import datetime
+
+
+class PurgeTestMixin:
+
+    def make_garden(self, username, plants=3, tasks_per_plant=2):
+        user = User.objects.create_user(username=username, password="pass")
+        bed = GardenBed.objects.create(owner=user, name="Veg patch")
+        for number in range(plants):
+            plant = Plant.objects.create(
+                owner=user, bed=bed, name=f"Plant {number}",
+                type=PlantType.VEGETABLE,
+                image=f"plants/{username}-{number}" if number == 0 else None,
+            )
+            for task_number in range(tasks_per_plant):
+                PlantTask.objects.create(
+                    user=user, plant=plant, name=f"Task {task_number}",
+                    frequency="7d", next_due=datetime.date.today(),
+                )
+        record_task_actions(
+            [(task, task.next_due)
+             for task in PlantTask.objects.filter(user=user)[:2]],
+            TaskAction.DONE,
+        )
+        return user
+
+
+@mock.patch("core.purge.cloudinary.api.delete_resources")
+class PurgeUserTests(PurgeTestMixin, TestCase):
+
+    def setUp(self):
+        self.user = self.make_garden("mark")
+        self.other = self.make_garden("other")
+
+    def test_deletes_everything_the_user_owns(self, delete_resources):
+        totals = purge_user(self.user.pk, batch_size=2)
+
+        self.assertEqual(totals["tasks"], 6)
+        self.assertEqual(totals["plants"], 3)
+        self.assertEqual(totals["beds"], 1)
+        self.assertEqual(totals["history"], 2)
+        self.assertFalse(User.objects.filter(pk=self.user.pk))
+        for model, owner in (
+            (GardenBed, "owner"), (Plant, "owner"), (PlantTask, "user"),
+            (TaskCompletion, "user"), (UserTaskRollup, "user"),
+            (PlantTaskRollup, "plant__owner"),
+        ):
+            with self.subTest(model=model.__name__):
+                self.assertFalse(
+                    model.objects.filter(**{f"{owner}_id": self.user.pk})
+                )
+                self.assertTrue(
+                    model.objects.filter(**{f"{owner}_id": self.other.pk})
+                )
+        delete_resources.assert_called_once_with(["plants/mark-0"])
+
+    def test_deleted_tasks_are_written_to_the_change_feed(
+            self, delete_resources):
+        task_ids = set(
+            PlantTask.objects.filter(user=self.user)
+            .values_list("pk", flat=True)
+        )
+        TaskChange.objects.all().delete()
+        purge_user(self.user.pk)
+        self.assertEqual(
+            set(TaskChange.objects.values_list("task_id", flat=True)),
+            task_ids,
+        )
+
+    def test_queries_grow_with_batches_not_rows(self, delete_resources):
+        big = self.make_garden("big", plants=20, tasks_per_plant=5)
+        with CaptureQueriesContext(connection) as small_queries:
+            purge_user(self.other.pk, batch_size=1000)
+        with CaptureQueriesContext(connection) as big_queries:
+            purge_user(big.pk, batch_size=1000)
+        self.assertEqual(len(big_queries), len(small_queries))
+
+    def test_image_failures_do_not_stop_the_purge(self, delete_resources):
+        delete_resources.side_effect = Exception("Cloudinary is down")
+        with self.assertLogs("core.purge", "ERROR"):
+            purge_user(self.user.pk)
+        self.assertFalse(User.objects.filter(pk=self.user.pk))
+
+
+@mock.patch("core.purge.cloudinary.api.delete_resources")
+@override_settings(ALLOWED_HOSTS=["testserver"], SECURE_SSL_REDIRECT=False)
+class DeleteAccountViewTests(PurgeTestMixin, TestCase):
+
+    def setUp(self):
+        self.user = self.make_garden("mark")
+        self.client.login(username="mark", password="pass")
+
+    def test_deactivates_logs_out_and_purges_after_commit(
+            self, delete_resources):
+        with mock.patch("core.purge.purge_pool") as purge_pool:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse("delete_account"))
+
+        self.assertRedirects(response, reverse("login"))
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        pending = PendingDeletion.objects.get(user=self.user)
+        purge_pool.return_value.submit.assert_called_once_with(
+            mock.ANY, pending.pk
+        )
+        # Logged out, and cannot log back in while the purge runs
+        response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(
+            self.client.login(username="mark", password="pass")
+        )
+
+    def test_calendar_feed_stops_at_once(self, delete_resources):
+        feed = CalendarFeed.objects.create(user=self.user)
+        request_deletion(self.user)
+        response = self.client.get(
+            reverse("calendar_feed", args=[feed.token])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(ACCOUNT_PURGE_IN_PROCESS=False)
+    def test_purge_accounts_command_finishes_pending(self, delete_resources):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.client.post(reverse("delete_account"))
+        self.assertEqual(callbacks, [])
+        self.assertTrue(Plant.objects.filter(owner=self.user))
+
+        out = StringIO()
+        call_command("purge_accounts", stdout=out)
+
+        self.assertIn("Purged 1 account.", out.getvalue())
+        self.assertFalse(User.objects.filter(username="mark"))
+        self.assertFalse(PendingDeletion.objects.exists())
+        self.assertFalse(Plant.objects.exists())
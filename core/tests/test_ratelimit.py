@@ -0,0 +1,155 @@
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, override_settings,
+)
+from django.urls import reverse
+
+from core.ratelimit import SlidingWindowLimiter, client_ip, release
+
+
+class SlidingWindowLimiterTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.limiter = SlidingWindowLimiter("test", limit=3, window=100)
+
+    def test_allows_up_to_the_limit(self):
+        for now in (1000, 1010, 1020):
+            self.assertEqual(self.limiter.reserve("key", now)[0], 0)
+        self.assertEqual(self.limiter.reserve("key", 1030), (71, None))
+        self.assertEqual(self.limiter.reserve("other", 1030)[0], 0)
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        for now in (1050, 1060, 1070):
+            self.limiter.reserve("key", now)
+        # 25% into the next window, 75% of the 3 earlier hits still count
+        self.assertEqual(self.limiter.reserve("key", 1125), (9, None))
+        # Past two thirds in, under one earlier hit still counts
+        wait, counter = self.limiter.reserve("key", 1167)
+        self.assertEqual(wait, 0)
+        release(counter)
+        # Two windows later the old counter no longer counts at all
+        for now in (1201, 1202, 1203):
+            self.assertEqual(self.limiter.reserve("key", now)[0], 0)
+
+    def test_reserve_counts_before_the_attempt_runs(self):
+        # Attempts still in flight already count against the limit
+        counters = [self.limiter.reserve("key", 1000 + n)[1] for n in range(3)]
+        self.assertTrue(all(counters))
+        self.assertEqual(self.limiter.reserve("key", 1005), (96, None))
+        # The rejected attempt was not counted
+        self.assertEqual(cache.get(counters[0]), 3)
+
+        release(counters[0])
+        wait, counter = self.limiter.reserve("key", 1006)
+        self.assertEqual(wait, 0)
+        self.assertEqual(counter, counters[0])
+
+    def test_counters_are_per_window_and_scope(self):
+        for now in (1000, 1099, 1100):
+            self.limiter.reserve("key", now)
+        self.assertEqual(cache.get(self.limiter._key("key", 10)), 2)
+        self.assertEqual(cache.get(self.limiter._key("key", 11)), 1)
+        other = SlidingWindowLimiter("other", limit=3, window=100)
+        self.assertNotEqual(
+            other._key("key", 10), self.limiter._key("key", 10)
+        )
+
+
+class ClientIpTests(SimpleTestCase):
+
+    def request(self, forwarded=None):
+        extra = {"REMOTE_ADDR": "10.0.0.1"}
+        if forwarded is not None:
+            extra["HTTP_X_FORWARDED_FOR"] = forwarded
+        return RequestFactory().get("/", **extra)
+
+    def test_ignores_forwarded_for_without_proxies(self):
+        self.assertEqual(client_ip(self.request("1.2.3.4")), "10.0.0.1")
+
+    @override_settings(RATE_LIMIT_PROXY_COUNT=1)
+    def test_reads_address_added_by_trusted_proxy(self):
+        # The client can forge earlier entries, not the proxy's own
+        self.assertEqual(
+            client_ip(self.request("6.6.6.6, 1.2.3.4")), "1.2.3.4"
+        )
+        self.assertEqual(client_ip(self.request()), "10.0.0.1")
+
+
+@override_settings(
+    ALLOWED_HOSTS=["testserver"],
+    SECURE_SSL_REDIRECT=False,
+    LOGIN_RATE_LIMIT_ENABLED=True,
+    LOGIN_RATE_LIMIT_USERNAME=3,
+    LOGIN_RATE_LIMIT_IP=5,
+)
+class LoginRateLimitTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(
+            username="Mark", password="testpass123"
+        )
+        self.url = reverse("login")
+
+    def login(self, username="mark", password="wrong", ip="10.0.0.1"):
+        return self.client.post(
+            self.url, {"username": username, "password": password},
+            REMOTE_ADDR=ip,
+        )
+
+    def test_failures_past_username_limit_get_429(self):
+        for _ in range(3):
+            self.assertEqual(self.login().status_code, 200)
+        # Any capitalisation, from any address, counts as the same user
+        response = self.login(username="MARK", ip="10.0.0.2")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+        self.assertContains(
+            response, "Too many login attempts", status_code=429
+        )
+        # Even the right password is rejected until the window passes
+        response = self.login(password="testpass123")
+        self.assertEqual(response.status_code, 429)
+
+    def test_failures_past_ip_limit_get_429(self):
+        for number in range(5):
+            self.login(username=f"nobody{number}")
+        self.assertEqual(self.login(username="other").status_code, 429)
+        self.assertEqual(
+            self.login(username="other", ip="10.0.0.2").status_code, 200
+        )
+
+    def test_successful_logins_are_not_counted(self):
+        for _ in range(5):
+            self.assertIsNotNone(authenticate(
+                RequestFactory().post(self.url, REMOTE_ADDR="10.0.0.1"),
+                username="mark", password="testpass123",
+            ))
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_limited_attempts_do_not_hash(self):
+        for _ in range(3):
+            self.login()
+        with mock.patch.object(
+            User, "check_password", autospec=True
+        ) as check_password, mock.patch.object(
+            User, "set_password", autospec=True
+        ) as set_password:
+            self.assertEqual(self.login().status_code, 429)
+            self.assertEqual(
+                self.login(username="nobody").status_code, 200
+            )
+        check_password.assert_not_called()
+        # The unknown username was not limited, so it was still hashed
+        set_password.assert_called_once()
+
+    @override_settings(LOGIN_RATE_LIMIT_ENABLED=False)
+    def test_limits_can_be_disabled(self):
+        for _ in range(5):
+            self.assertEqual(self.login().status_code, 200)
@@ -0,0 +1,121 @@
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from core.models import Plant, PlantTask, PlantType, TaskChange
+from core.reminders import ReminderScheduler
+import datetime
+
+
+class ReminderSchedulerTests(TestCase):
+
+    DAY = datetime.date(2026, 6, 1)
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="mark", password="pass", email="mark@example.com"
+        )
+        self.plant = Plant.objects.create(
+            owner=self.user, name="Tomato", type=PlantType.VEGETABLE
+        )
+        self.task = PlantTask.objects.create(
+            user=self.user, plant=self.plant, name="Watering",
+            frequency="7d", next_due=self.DAY,
+        )
+        self.scheduler = ReminderScheduler()
+
+    def at(self, hour, minute=0, days=0):
+        return timezone.make_aware(datetime.datetime.combine(
+            self.DAY + datetime.timedelta(days=days),
+            datetime.time(hour, minute),
+        ))
+
+    def test_reminder_is_sent_once_at_reminder_hour(self):
+        wait = self.scheduler.tick(self.at(6))
+        self.assertEqual(wait, 30)
+        self.assertEqual(mail.outbox, [])
+
+        self.scheduler.tick(self.at(7))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["mark@example.com"])
+        self.assertIn("Watering (Tomato)", mail.outbox[0].body)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.reminded_for, self.DAY)
+
+        # A restarted worker does not send it again
+        ReminderScheduler().tick(self.at(8))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_changes_are_applied_from_the_feed(self):
+        self.task.next_due = self.DAY + datetime.timedelta(days=3)
+        self.task.save()
+        self.scheduler.tick(self.at(6))
+
+        # Moved into the window after loading: picked up from TaskChange
+        self.task.next_due = self.DAY
+        self.task.save()
+        self.assertTrue(TaskChange.objects.filter(task_id=self.task.pk))
+        self.scheduler.tick(self.at(7))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_change_committed_out_of_id_order_is_applied(self):
+        self.task.next_due = self.DAY + datetime.timedelta(days=3)
+        self.task.save()
+        self.scheduler.tick(self.at(6))
+        cursor = self.scheduler.change_cursor
+
+        # Row cursor + 1 commits after row cursor + 2 has been read
+        TaskChange.objects.create(id=cursor + 2, task_id=0)
+        self.scheduler.tick(self.at(6, 1))
+        PlantTask.objects.filter(pk=self.task.pk).update(next_due=self.DAY)
+        TaskChange.objects.create(id=cursor + 1, task_id=self.task.pk)
+
+        self.scheduler.tick(self.at(7))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_task_done_before_reminder_is_not_reminded(self):
+        self.scheduler.tick(self.at(6))
+        self.task.skip()
+        self.task.save()
+
+        self.scheduler.tick(self.at(7))
+        self.assertEqual(mail.outbox, [])
+
+    def test_later_tasks_are_loaded_as_the_window_moves(self):
+        later = PlantTask.objects.create(
+            user=self.user, plant=self.plant, name="Feeding",
+            frequency="14d", next_due=self.DAY + datetime.timedelta(days=3),
+        )
+        self.scheduler.tick(self.at(6))
+        self.assertNotIn(later.pk, self.scheduler.current)
+
+        self.scheduler.tick(self.at(6, days=2))
+        self.assertIn(later.pk, self.scheduler.current)
+        self.scheduler.tick(self.at(7, days=3))
+        self.assertIn("Feeding", mail.outbox[-1].body)
+
+    def test_idle_tick_only_reads_the_change_feed(self):
+        self.scheduler.tick(self.at(6))
+        with self.assertNumQueries(1):
+            self.scheduler.tick(self.at(6, 1))
+
+    def test_users_without_email_are_skipped(self):
+        self.user.email = ""
+        self.user.save()
+        self.scheduler.tick(self.at(7))
+        self.assertEqual(mail.outbox, [])
+
+    def test_deleted_task_is_forgotten(self):
+        self.scheduler.tick(self.at(6))
+        self.task.delete()
+        self.scheduler.tick(self.at(7))
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(self.scheduler.current, {})
+
+    def test_run_once_command(self):
+        out = StringIO()
+        call_command("run_reminders", "--once", stdout=out)
+        self.assertIn("reminder email", out.getvalue())
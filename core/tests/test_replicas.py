@@ -0,0 +1,155 @@
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from core.models import (
+    CalendarFeed, Plant, PlantTask, PlantType, UserDataVersion,
+)
+from core.replicas import current_read_db, streaming_from, use_replica
+from garden_timekeeper.routers import ReplicaRouter
+import datetime
+
+
+@override_settings(READ_REPLICAS=["replica_1"])
+class ReplicaRouterTests(SimpleTestCase):
+
+    def test_reads_follow_the_request_and_writes_the_primary(self):
+        self.assertEqual(Plant.objects.all().db, "default")
+        with use_replica("replica_1"):
+            self.assertEqual(Plant.objects.all().db, "replica_1")
+            self.assertEqual(Plant.objects.db_manager().db, "replica_1")
+            self.assertEqual(
+                ReplicaRouter().db_for_write(Plant), "default"
+            )
+        self.assertIsNone(current_read_db())
+
+    def test_replicas_are_not_migrated(self):
+        router = ReplicaRouter()
+        self.assertFalse(router.allow_migrate("replica_1", "core"))
+        self.assertIsNone(router.allow_migrate("default", "core"))
+
+    def test_streamed_content_is_read_from_the_replica(self):
+        def chunks():
+            yield current_read_db()
+            yield current_read_db()
+
+        self.assertEqual(
+            list(streaming_from("replica_1", chunks())),
+            ["replica_1", "replica_1"],
+        )
+        self.assertIsNone(current_read_db())
+
+
+@override_settings(READ_REPLICAS=["shard_a"])
+class ReplicaDataVersionTests(TestCase):
+    databases = {"default", "shard_a"}
+
+    def test_version_is_read_from_the_replica(self):
+        user = User.objects.create_user(username="mark", password="pass")
+        User.objects.using("shard_a").create(
+            pk=user.pk, username="mark", password="x"
+        )
+        UserDataVersion.objects.using("shard_a").create(
+            user_id=user.pk, version=5
+        )
+
+        # The primary has no row yet, and is not asked
+        with use_replica("shard_a"), self.assertNumQueries(0):
+            version = UserDataVersion.current(user.pk)
+        self.assertEqual(version.version, 5)
+
+
+# "default" stands in for the replica: the test database is the only one,
+# so these check which requests are routed, via request.read_db
+@override_settings(
+    ALLOWED_HOSTS=["testserver"],
+    SECURE_SSL_REDIRECT=False,
+    READ_REPLICAS=["default"],
+    REPLICA_STICKY_SECONDS=10,
+)
+class ReplicaRoutingMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="mark", password="pass")
+        self.plant = Plant.objects.create(
+            owner=self.user, name="Tomato", type=PlantType.VEGETABLE
+        )
+        self.task = PlantTask.objects.create(
+            user=self.user, plant=self.plant, name="Watering",
+            frequency="7d", next_due=datetime.date.today(),
+        )
+        self.client.login(username="mark", password="pass")
+
+    def read_db(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.wsgi_request.read_db
+
+    def test_read_only_views_use_a_replica(self):
+        for url in (
+            reverse("dashboard"),
+            reverse("plant_list"),
+            reverse("bed_list"),
+            reverse("plant_detail", args=[self.plant.pk]),
+            reverse("task_detail", args=[self.task.pk]),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.read_db(url), "default")
+
+    def test_other_views_use_the_primary(self):
+        self.assertIsNone(self.read_db(reverse("plant_create")))
+
+    def test_reads_stick_to_the_primary_after_a_write(self):
+        response = self.client.post(
+            reverse("task_mark_done", args=[self.task.pk])
+        )
+        self.assertIn("primary_until", response.cookies)
+        self.assertEqual(
+            response.cookies["primary_until"]["max-age"], 10
+        )
+        self.assertIsNone(self.read_db(reverse("dashboard")))
+
+        # Once the cookie has expired, the replica is used again
+        self.client.cookies["primary_until"] = "0"
+        self.assertEqual(self.read_db(reverse("dashboard")), "default")
+
+    def test_skipping_with_a_link_sticks_to_the_primary(self):
+        response = self.client.get(
+            reverse("task_skip", args=[self.task.pk])
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("primary_until", response.cookies)
+        self.assertIsNone(self.read_db(reverse("dashboard")))
+
+    def test_failed_writes_do_not_stick(self):
+        response = self.client.post(
+            reverse("task_mark_done", args=[self.task.pk + 1000])
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("primary_until", response.cookies)
+
+    def test_calendar_feed_streams_from_a_replica(self):
+        feed = CalendarFeed.objects.create(user=self.user)
+        self.client.logout()
+        response = self.client.get(
+            reverse("calendar_feed", args=[feed.token])
+        )
+        self.assertEqual(response.wsgi_request.read_db, "default")
+        self.assertIn(b"Watering", b"".join(response.streaming_content))
+
+    async def test_async_requests_use_a_replica(self):
+        await self.async_client.alogin(username="mark", password="pass")
+        response = await self.async_client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.asgi_request.read_db, "default")
+        # The routing ends with the request
+        self.assertIsNone(current_read_db())
+
+        response = await self.async_client.post(
+            reverse("task_mark_done", args=[self.task.pk])
+        )
+        self.assertIn("primary_until", response.cookies)
+
+    @override_settings(READ_REPLICAS=[])
+    def test_no_replicas_no_routing(self):
+        response = self.client.get(reverse("dashboard"))
+        self.assertFalse(hasattr(response.wsgi_request, "read_db"))
@@ -0,0 +1,175 @@
+from django.test import TestCase, SimpleTestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from core.models import Plant, PlantTask, PlantType, UserDataVersion
+from core.scheduling import ScheduleProjector, add_months, workload_counts
+import datetime
+
+
+class ScheduleProjectorTests(SimpleTestCase):
+
+    START = datetime.date(2026, 3, 15)
+
+    def project(self, frequency="7d", all_year=True, start_month=1,
+                end_month=12, repeat=True, next_due=START):
+        projector = ScheduleProjector(self.START, add_months(self.START, 12))
+        row = (frequency, all_year, start_month, end_month, repeat, next_due)
+        counts = projector.counts([row])
+        return [
+            self.START + datetime.timedelta(days=int(index))
+            for index in counts.nonzero()[0]
+        ]
+
+    def expected(self, frequency="7d", all_year=True, start_month=1,
+                 end_month=12, next_due=START):
+        """Occurrences found by calling PlantTask.skip() repeatedly."""
+        task = PlantTask(
+            frequency=frequency,
+            all_year=all_year,
+            seasonal_start_month=start_month,
+            seasonal_end_month=end_month,
+            next_due=max(next_due, self.START),
+        )
+        end = add_months(self.START, 12)
+        dates = []
+        while task.next_due < end:
+            dates.append(task.next_due)
+            task.skip()
+        return dates
+
+    def test_matches_skip_for_every_frequency_and_window(self):
+        windows = [(True, 1, 12), (False, 3, 9), (False, 11, 2),
+                   (False, 6, 6)]
+        for frequency, _ in PlantTask.TASK_FREQUENCY:
+            for all_year, start_month, end_month in windows:
+                with self.subTest(frequency=frequency, window=start_month):
+                    self.assertEqual(
+                        self.project(frequency, all_year, start_month,
+                                     end_month),
+                        self.expected(frequency, all_year, start_month,
+                                      end_month),
+                    )
+
+    def test_month_end_is_clamped_like_add_months(self):
+        due = datetime.date(2026, 3, 31)
+        dates = self.project("1m", next_due=due)
+        self.assertEqual(dates[:3], [
+            datetime.date(2026, 3, 31),
+            datetime.date(2026, 4, 30),
+            datetime.date(2026, 5, 30),
+        ])
+
+    def test_one_off_task_occurs_once(self):
+        self.assertEqual(self.project(repeat=False), [self.START])
+
+    def test_overdue_task_is_due_at_start(self):
+        dates = self.project(next_due=datetime.date(2026, 1, 1))
+        self.assertEqual(dates[0], self.START)
+
+    def test_identical_schedules_are_weighted(self):
+        projector = ScheduleProjector(
+            self.START, add_months(self.START, 1)
+        )
+        row = ("7d", True, 1, 12, True, self.START)
+        counts = projector.counts([row, row, row])
+        self.assertEqual(counts[0], 3)
+        self.assertEqual(counts[7], 3)
+        self.assertEqual(counts.sum(), 3 * 5)
+
+    def test_occurrences_keep_rows_apart(self):
+        projector = ScheduleProjector(
+            self.START, add_months(self.START, 1)
+        )
+        weekly = ("7d", True, 1, 12, True, self.START)
+        fortnightly = ("14d", True, 1, 12, True, self.START)
+        occurrences = projector.occurrences([weekly, fortnightly, weekly])
+
+        self.assertEqual(len(occurrences), 2 * 5 + 3)
+        self.assertEqual(occurrences[:3], [
+            (self.START, 0), (self.START, 1), (self.START, 2),
+        ])
+        self.assertEqual(
+            [day for day, row in occurrences if row == 1],
+            [self.START + datetime.timedelta(days=days)
+             for days in (0, 14, 28)],
+        )
+
+
+class UserDataVersionTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="mark", password="pass")
+        self.plant = Plant.objects.create(
+            owner=self.user, name="Tomato", type=PlantType.VEGETABLE
+        )
+        self.task = PlantTask.objects.create(
+            user=self.user, plant=self.plant, name="Watering",
+            frequency="7d", next_due=datetime.date.today(),
+        )
+        self.version = UserDataVersion.current(self.user.pk).version
+
+    def current(self):
+        return UserDataVersion.current(self.user.pk).version
+
+    def test_task_save_and_delete_bump_version(self):
+        self.task.save()
+        self.assertEqual(self.current(), self.version + 1)
+        self.task.delete()
+        self.assertEqual(self.current(), self.version + 2)
+
+    def test_conditional_update_bumps_version(self):
+        changed = self.task.skip()
+        self.task.save_if_unchanged(changed, datetime.date.today())
+        self.assertEqual(self.current(), self.version + 1)
+
+    def test_bulk_action_bumps_version(self):
+        self.client.login(username="mark", password="pass")
+        self.client.post(reverse("task_bulk_action"), {
+            "action": "skip", "task_ids": [self.task.pk],
+        })
+        self.assertGreater(self.current(), self.version)
+
+
+class WorkloadHeatmapTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="mark", password="pass")
+        self.plant = Plant.objects.create(
+            owner=self.user, name="Tomato", type=PlantType.VEGETABLE
+        )
+        self.task = PlantTask.objects.create(
+            user=self.user, plant=self.plant, name="Watering",
+            frequency="7d", next_due=datetime.date.today(),
+        )
+
+    def test_counts_are_cached_per_data_version(self):
+        today = datetime.date.today()
+        first = workload_counts(self.user, today)
+        self.assertEqual(first[0], 1)
+        self.assertEqual(first[7], 1)
+
+        # Version lookup only; the projection comes from the cache
+        with self.assertNumQueries(1):
+            workload_counts(self.user, today)
+
+        self.task.frequency = "14d"
+        self.task.save()
+        updated = workload_counts(self.user, today)
+        self.assertEqual(updated[7], 0)
+        self.assertEqual(updated[14], 1)
+
+    def test_heatmap_page(self):
+        self.client.login(username="mark", password="pass")
+        response = self.client.get(reverse("workload_heatmap"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "core/heatmap.html")
+        self.assertEqual(len(response.context["rows"]), 7)
+        self.assertGreaterEqual(response.context["total"], 52)
+        self.assertContains(response, "heatmap-cell level-4")
+
+    def test_heatmap_requires_login(self):
+        response = self.client.get(reverse("workload_heatmap"))
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,75 @@
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth.models import User
+from django.db.models import F
+from core.models import GardenBed, Plant, PlantTask
+from io import StringIO
+import datetime
+
+
+class SeedGardenCommandTests(TestCase):
+
+    TODAY = datetime.date(2026, 3, 1)
+
+    def seed(self, **kwargs):
+        options = {
+            "users": 3,
+            "beds_per_user": 2,
+            "plants_per_user": 4,
+            "tasks_per_plant": 3,
+            "today": self.TODAY,
+            "users_per_chunk": 2,
+            "stdout": StringIO(),
+        }
+        options.update(kwargs)
+        call_command("seed_garden", **options)
+
+    def snapshot(self):
+        return list(
+            PlantTask.objects.order_by("plant__owner__username", "pk")
+            .values_list(
+                "plant__name", "name", "frequency", "all_year",
+                "seasonal_start_month", "seasonal_end_month", "next_due",
+            )
+        )
+
+    def test_creates_requested_volumes(self):
+        self.seed()
+
+        self.assertEqual(
+            User.objects.filter(username__startswith="seed_user").count(), 3
+        )
+        self.assertEqual(GardenBed.objects.count(), 6)
+        self.assertEqual(Plant.objects.count(), 12)
+        self.assertEqual(PlantTask.objects.count(), 36)
+
+    def test_tasks_belong_to_plant_owner(self):
+        self.seed()
+        mismatched = PlantTask.objects.exclude(user=F("plant__owner"))
+        self.assertFalse(mismatched.exists())
+
+    def test_same_seed_is_deterministic(self):
+        self.seed(seed=7)
+        first = self.snapshot()
+
+        self.seed(seed=7, clear=True)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_generates_overdue_and_wraparound_tasks(self):
+        self.seed(users=5, plants_per_user=10, tasks_per_plant=5)
+
+        self.assertTrue(
+            PlantTask.objects.filter(next_due__lt=self.TODAY).exists()
+        )
+        self.assertTrue(
+            PlantTask.objects.filter(
+                all_year=False,
+                seasonal_start_month__gt=F("seasonal_end_month"),
+            ).exists()
+        )
+
+    def test_refuses_to_duplicate_existing_users(self):
+        self.seed(users=1)
+        with self.assertRaises(CommandError):
+            self.seed(users=1)
@@ -0,0 +1,358 @@
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.history import record_task_actions
+from core.models import (
+    CalendarFeed, GardenBed, Plant, PlantTask, PlantTaskRollup, PlantType,
+    TaskAction, TaskCompletion,
+)
+from core.purge import purge_user
+from core.rebalance import rebalance
+from core.sharding import (
+    ShardNotPinned, pinned_to_user, shard_for_user, use_shard
+)
+import datetime
+
+SHARDS = ["shard_a", "shard_b"]
+DATABASES = {"default", *SHARDS}
+TODAY = datetime.date(2026, 5, 1)
+
+
+@override_settings(SHARDS=SHARDS)
+class ShardRouterTests(SimpleTestCase):
+
+    def test_shard_is_a_stable_hash_of_the_user_id(self):
+        self.assertEqual(shard_for_user(42), shard_for_user("42"))
+        shards = [shard_for_user(user_id) for user_id in range(1, 201)]
+        self.assertEqual(set(shards), set(SHARDS))
+        # Neither shard gets much more than its share
+        self.assertLess(abs(shards.count("shard_a") - 100), 25)
+
+    @override_settings(SHARDS=[])
+    def test_sharding_off(self):
+        self.assertIsNone(shard_for_user(42))
+        self.assertEqual(Plant.objects.all().db, "default")
+
+    def test_sharded_models_need_a_shard(self):
+        with self.assertRaises(ShardNotPinned):
+            Plant.objects.all().db
+        with use_shard("shard_b"):
+            self.assertEqual(Plant.objects.all().db, "shard_b")
+            self.assertEqual(TaskCompletion.objects.all().db, "shard_b")
+        with pinned_to_user(42):
+            self.assertEqual(GardenBed.objects.all().db, shard_for_user(42))
+        # Everything else stays on the default database
+        self.assertEqual(CalendarFeed.objects.all().db, "default")
+
+    def test_queries_from_a_user_go_to_their_shard(self):
+        user = User(pk=42)
+        self.assertEqual(user.plants.all().db, shard_for_user(42))
+
+
+class ShardTestMixin:
+
+    def make_users(self):
+        """One user on each shard."""
+        users = {}
+        number = 0
+        while len(users) < len(SHARDS):
+            number += 1
+            user = User.objects.create_user(
+                username=f"user{number}", password="pass",
+                email=f"user{number}@example.com",
+            )
+            with override_settings(SHARDS=SHARDS):
+                users.setdefault(shard_for_user(user.pk), user)
+        return users
+
+    def make_garden(self, user):
+        with pinned_to_user(user.pk):
+            bed = GardenBed.objects.create(owner=user, name="Veg patch")
+            plant = Plant.objects.create(
+                owner=user, bed=bed, name="Tomato", type=PlantType.VEGETABLE
+            )
+            task = PlantTask.objects.create(
+                user=user, plant=plant, name="Watering", frequency="7d",
+                next_due=TODAY,
+            )
+        return plant, task
+
+
+@override_settings(
+    ALLOWED_HOSTS=["testserver"],
+    SECURE_SSL_REDIRECT=False,
+    SHARDS=SHARDS,
+)
+class ShardedGardenTests(ShardTestMixin, TestCase):
+
+    databases = DATABASES
+
+    def setUp(self):
+        self.users = self.make_users()
+        self.user = self.users["shard_b"]
+
+    def test_users_are_copied_to_their_shard_without_a_password(self):
+        copy = User.objects.using("shard_b").get(pk=self.user.pk)
+        self.assertEqual(copy.email, self.user.email)
+        self.assertFalse(copy.has_usable_password())
+        self.assertFalse(
+            User.objects.using("shard_a").filter(pk=self.user.pk).exists()
+        )
+
+        self.user.email = "new@example.com"
+        self.user.save()
+        self.assertEqual(
+            User.objects.using("shard_b").get(pk=self.user.pk).email,
+            "new@example.com",
+        )
+
+    def test_gardens_are_written_to_the_owners_shard(self):
+        plant, task = self.make_garden(self.user)
+
+        self.assertEqual(plant._state.db, "shard_b")
+        self.assertTrue(PlantTask.objects.using("shard_b").filter(
+            pk=task.pk, plant__owner__username=self.user.username
+        ).exists())
+        self.assertFalse(PlantTask.objects.using("default").exists())
+        self.assertFalse(PlantTask.objects.using("shard_a").exists())
+        self.assertEqual(list(plant.tasks.all()), [task])
+
+    def test_requests_are_pinned_to_the_users_shard(self):
+        self.make_garden(self.user)
+        self.client.login(username=self.user.username, password="pass")
+
+        response = self.client.post(
+            reverse("bed_create"), {"name": "Herbs", "location": ""}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.wsgi_request.shard, "shard_b")
+        self.assertTrue(
+            GardenBed.objects.using("shard_b").filter(name="Herbs").exists()
+        )
+
+        response = self.client.get(reverse("plant_list"))
+        self.assertContains(response, "Tomato")
+
+    async def test_async_requests_are_pinned_to_the_users_shard(self):
+        await sync_to_async(self.make_garden)(self.user)
+        await self.async_client.alogin(
+            username=self.user.username, password="pass"
+        )
+
+        response = await self.async_client.get(reverse("plant_list"))
+
+        self.assertEqual(response.asgi_request.shard, "shard_b")
+        self.assertContains(response, "Tomato")
+
+    def assert_task_written_in_a_shard_transaction(self, request):
+        _, task = self.make_garden(self.user)
+        self.client.login(username=self.user.username, password="pass")
+
+        with CaptureQueriesContext(connections["shard_b"]) as queries:
+            response = request(task)
+
+        self.assertEqual(response.status_code, 302)
+        # The update ran inside an atomic block on the shard (a savepoint
+        # within the test case's transaction)
+        statements = [query["sql"].split()[0] for query in queries]
+        update = next(
+            number for number, query in enumerate(queries)
+            if query["sql"].startswith('UPDATE "core_planttask"')
+        )
+        self.assertIn("SAVEPOINT", statements[:update])
+        self.assertIn("RELEASE", statements[update:])
+        task = PlantTask.objects.using("shard_b").get(pk=task.pk)
+        self.assertGreater(task.next_due, TODAY)
+        self.assertEqual(
+            TaskCompletion.objects.using("shard_b")
+            .filter(task_id=task.pk).count(),
+            1,
+        )
+
+    def test_mark_done_is_atomic_on_the_users_shard(self):
+        self.assert_task_written_in_a_shard_transaction(
+            lambda task: self.client.post(
+                reverse("task_mark_done", args=[task.pk])
+            )
+        )
+
+    def test_skip_is_atomic_on_the_users_shard(self):
+        self.assert_task_written_in_a_shard_transaction(
+            lambda task: self.client.post(
+                reverse("task_skip", args=[task.pk])
+            )
+        )
+
+    def test_bulk_action_is_atomic_on_the_users_shard(self):
+        self.assert_task_written_in_a_shard_transaction(
+            lambda task: self.client.post(
+                reverse("task_bulk_action"),
+                {"action": "done", "task_ids": [task.pk]},
+            )
+        )
+
+    def test_calendar_feed_reads_the_owners_shard(self):
+        self.make_garden(self.user)
+        feed = CalendarFeed.objects.create(user=self.user)
+
+        response = self.client.get(reverse("calendar_feed", args=[feed.token]))
+
+        self.assertIsNone(response.wsgi_request.shard)
+        self.assertIn(b"Watering", b"".join(response.streaming_content))
+
+    def test_deleting_a_user_deletes_their_shard(self):
+        self.make_garden(self.user)
+        self.user.delete()
+        self.assertFalse(User.objects.using("shard_b").exists())
+        self.assertFalse(Plant.objects.using("shard_b").exists())
+
+    @mock.patch("core.purge.cloudinary.api.delete_resources")
+    def test_purge_deletes_from_the_users_shard(self, delete_resources):
+        self.make_garden(self.user)
+        purge_user(self.user.pk)
+        self.assertFalse(PlantTask.objects.using("shard_b").exists())
+        self.assertFalse(User.objects.using("shard_b").exists())
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+
+    def test_digests_are_sent_from_every_shard(self):
+        for user in self.users.values():
+            self.make_garden(user)
+        out = StringIO()
+
+        call_command(
+            "send_due_digests", "--date", TODAY.isoformat(),
+            "--workers", "1", stdout=out,
+        )
+        self.assertEqual(len(mail.outbox), 2)
+
+        mail.outbox = []
+        call_command(
+            "send_due_digests", "--date", TODAY.isoformat(),
+            "--workers", "1", "--shard", "shard_a", stdout=out,
+        )
+        self.assertEqual(
+            [message.to for message in mail.outbox],
+            [[self.users["shard_a"].email]],
+        )
+
+        with self.assertRaisesMessage(CommandError, "Unknown shard: nope"):
+            call_command("send_due_digests", "--shard", "nope", stdout=out)
+
+    def test_seeded_gardens_are_written_to_their_shards(self):
+        call_command(
+            "seed_garden", users=6, beds_per_user=1, plants_per_user=2,
+            tasks_per_plant=1, today=TODAY, stdout=StringIO(),
+        )
+
+        self.assertFalse(Plant.objects.using("default").exists())
+        for alias in SHARDS:
+            owners = set(
+                Plant.objects.using(alias)
+                .values_list("owner__pk", flat=True)
+            )
+            self.assertEqual(
+                {shard_for_user(owner) for owner in owners}, {alias}
+            )
+        self.assertEqual(
+            sum(Plant.objects.using(alias).count() for alias in SHARDS), 12
+        )
+
+
+class RebalanceTests(ShardTestMixin, TestCase):
+
+    databases = DATABASES
+
+    def setUp(self):
+        # Gardens made before sharding was turned on
+        self.users = self.make_users()
+        for user in self.users.values():
+            plant, task = self.make_garden(user)
+            record_task_actions([(task, TODAY)], TaskAction.DONE)
+
+    def test_gardens_move_from_the_default_database(self):
+        with override_settings(SHARDS=SHARDS):
+            moves, failed = rebalance(batch_size=2)
+
+            self.assertEqual(
+                moves, {("default", "shard_a"): 1, ("default", "shard_b"): 1}
+            )
+            self.assertEqual(failed, [])
+            self.assertFalse(Plant.objects.using("default").exists())
+            for alias, user in self.users.items():
+                with use_shard(alias):
+                    task = PlantTask.objects.get(user=user)
+                    self.assertEqual(task.plant.owner_id, user.pk)
+                    self.assertEqual(task.plant.bed.name, "Veg patch")
+                    self.assertEqual(
+                        TaskCompletion.objects.get(user=user).task, task
+                    )
+                    self.assertTrue(PlantTaskRollup.objects.filter(
+                        plant=task.plant
+                    ).exists())
+
+            # Everyone is in place now
+            self.assertEqual(rebalance(), ({}, []))
+
+    def test_gardens_move_to_a_new_shard(self):
+        with override_settings(SHARDS=["shard_a"]):
+            rebalance()
+        user = self.users["shard_b"]
+
+        with override_settings(SHARDS=SHARDS):
+            moves, _ = rebalance(dry_run=True)
+            self.assertEqual(moves, {("shard_a", "shard_b"): 1})
+            self.assertTrue(
+                Plant.objects.using("shard_a").filter(owner=user).exists()
+            )
+
+            rebalance()
+
+        self.assertFalse(
+            Plant.objects.using("shard_a").filter(owner=user.pk).exists()
+        )
+        self.assertFalse(
+            User.objects.using("shard_a").filter(pk=user.pk).exists()
+        )
+        self.assertTrue(
+            Plant.objects.using("shard_b").filter(owner=user.pk).exists()
+        )
+
+    def test_command_reports_moves(self):
+        out = StringIO()
+        with override_settings(SHARDS=SHARDS):
+            call_command("rebalance_shards", stdout=out)
+        self.assertIn("default -> shard_b: moved 1", out.getvalue())
+        self.assertIn("2 users moved.", out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command("rebalance_shards", stdout=StringIO())
+
+
+class MigrateShardsCommandTests(SimpleTestCase):
+
+    @override_settings(SHARDS=SHARDS)
+    @mock.patch("core.management.commands.migrate_shards.call_command")
+    def test_migrates_each_shard(self, migrate):
+        call_command("migrate_shards", "core", stdout=StringIO())
+        self.assertEqual(
+            [call.kwargs["database"] for call in migrate.call_args_list],
+            SHARDS,
+        )
+        self.assertEqual(migrate.call_args.args, ("migrate", "core"))
+
+        with self.assertRaises(CommandError):
+            call_command("migrate_shards", "--shard", "nope")
+
+    def test_nothing_to_do_without_shards(self):
+        out = StringIO()
+        call_command("migrate_shards", stdout=out)
+        self.assertIn("Sharding is off", out.getvalue())
@@ -1,7 +1,9 @@
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
 from core.models import Plant, GardenBed, PlantTask, PlantType, PlantLifespan
 from core.forms import PlantTaskForm
 import datetime
@@ -313,3 +315,197 @@ class TaskViewTests(TestCase):
             reverse("task_skip", args=[self.other_task.pk])
         )
         self.assertEqual(response.status_code, 404)
+
+    # ---------------------------------------------------------
+    # BULK ACTIONS
+    # ---------------------------------------------------------
+
+    def bulk(self, action, *tasks, **extra):
+        data = {"action": action, "task_ids": [t.pk for t in tasks]}
+        data.update(extra)
+        return self.client.post(reverse("task_bulk_action"), data)
+
+    def test_bulk_action_requires_login(self):
+        response = self.bulk("done", self.task)
+        self.assertEqual(response.status_code, 302)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.last_done, datetime.date(2024, 1, 1))
+
+    def test_bulk_mark_done_updates_all_selected_tasks(self):
+        second = PlantTask.objects.create(
+            user=self.user,
+            plant=self.plant,
+            name="Feeding",
+            frequency="14d",
+            next_due=datetime.date(2024, 1, 8),
+        )
+        self.client.login(username="mark", password="pass")
+
+        # session, user, savepoint, select, one bulk update, data version
+        # bump, change feed insert, history insert, 2 x (rollup insert +
+        # increment), release
+        with self.assertNumQueries(13):
+            response = self.bulk("done", self.task, second)
+
+        self.assertRedirects(
+            response, reverse("dashboard"), fetch_redirect_response=False
+        )
+        today = datetime.date.today()
+        for task in (self.task, second):
+            task.refresh_from_db()
+            self.assertEqual(task.last_done, today)
+            self.assertGreater(task.next_due, today)
+
+    def test_bulk_skip_moves_next_due_forward(self):
+        self.client.login(username="mark", password="pass")
+        self.bulk("skip", self.task)
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.next_due, datetime.date(2024, 1, 15))
+        self.assertEqual(self.task.last_done, datetime.date(2024, 1, 1))
+
+    def test_bulk_action_ignores_other_users_tasks(self):
+        self.client.login(username="mark", password="pass")
+        self.bulk("done", self.task, self.other_task)
+
+        self.other_task.refresh_from_db()
+        self.assertEqual(self.other_task.last_done, datetime.date(2024, 1, 1))
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.last_done, datetime.date.today())
+
+    def test_bulk_action_rejects_unknown_action(self):
+        self.client.login(username="mark", password="pass")
+        self.bulk("delete", self.task)
+
+        self.assertTrue(PlantTask.objects.filter(pk=self.task.pk).exists())
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.next_due, datetime.date(2024, 1, 8))
+
+    def test_bulk_action_only_redirects_to_safe_urls(self):
+        self.client.login(username="mark", password="pass")
+
+        response = self.bulk("skip", self.task, next="/plants/")
+        self.assertEqual(response.url, "/plants/")
+
+        response = self.bulk("skip", self.task, next="https://evil.test/")
+        self.assertEqual(response.url, reverse("dashboard"))
+
+    # ---------------------------------------------------------
+    # AJAX MARK DONE / SKIP
+    # ---------------------------------------------------------
+
+    AJAX = {"X-Requested-With": "XMLHttpRequest"}
+
+    def test_mark_done_returns_json_for_ajax(self):
+        self.client.login(username="mark", password="pass")
+        response = self.client.post(
+            reverse("task_mark_done", args=[self.task.pk]),
+            headers=self.AJAX,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.task.refresh_from_db()
+        self.assertTrue(data["success"])
+        self.assertEqual(data["id"], self.task.pk)
+        self.assertEqual(data["next_due"], self.task.next_due.isoformat())
+        self.assertEqual(data["status"], "scheduled")
+        self.assertTrue(data["active"])
+        self.assertIn("marked as done", data["message"])
+
+    def test_mark_done_one_off_task_reports_inactive(self):
+        self.task.repeat = False
+        self.task.save()
+        self.client.login(username="mark", password="pass")
+
+        data = self.client.post(
+            reverse("task_mark_done", args=[self.task.pk]),
+            headers=self.AJAX,
+        ).json()
+
+        self.assertFalse(data["active"])
+        self.assertIsNone(data["next_due"])
+        self.assertEqual(data["status"], "")
+
+    def test_skip_returns_json_for_ajax(self):
+        self.client.login(username="mark", password="pass")
+        data = self.client.post(
+            reverse("task_skip", args=[self.task.pk]),
+            headers=self.AJAX,
+        ).json()
+
+        # 2024-01-08 + 7 days is still in the past
+        self.assertEqual(data["next_due"], "2024-01-15")
+        self.assertEqual(data["status"], "overdue")
+        self.assertIn("skipped", data["message"])
+
+    def test_ajax_cannot_update_other_users_task(self):
+        self.client.login(username="mark", password="pass")
+        response = self.client.post(
+            reverse("task_skip", args=[self.other_task.pk]),
+            headers=self.AJAX,
+        )
+        self.assertEqual(response.status_code, 404)
+
+    # ---------------------------------------------------------
+    # PARTIAL WRITES + CONCURRENT UPDATES
+    # ---------------------------------------------------------
+
+    def update_statements(self, queries):
+        return [
+            q["sql"] for q in queries.captured_queries
+            if q["sql"].startswith('UPDATE "core_planttask"')
+        ]
+
+    def test_mark_done_writes_only_schedule_columns(self):
+        self.client.login(username="mark", password="pass")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse("task_mark_done", args=[self.task.pk]))
+
+        (update,) = self.update_statements(queries)
+        self.assertIn('"last_done"', update)
+        self.assertNotIn('"notes"', update)
+        self.assertNotIn('"name"', update)
+
+    def test_concurrent_skip_is_not_overwritten(self):
+        original_skip = PlantTask.skip
+
+        def skip_after_other_device(task):
+            # Another device marks the task done mid-request
+            PlantTask.objects.filter(pk=task.pk).update(
+                next_due=datetime.date(2024, 2, 1)
+            )
+            return original_skip(task)
+
+        self.client.login(username="mark", password="pass")
+        with mock.patch.object(PlantTask, "skip", skip_after_other_device):
+            response = self.client.post(
+                reverse("task_skip", args=[self.task.pk]),
+                headers=self.AJAX,
+            )
+
+        self.assertEqual(response.status_code, 409)
+        data = response.json()
+        self.assertFalse(data["success"])
+        self.assertEqual(data["next_due"], "2024-02-01")
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.next_due, datetime.date(2024, 2, 1))
+
+    def test_edit_writes_only_changed_fields(self):
+        self.client.login(username="mark", password="pass")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(
+                reverse("task_update", args=[self.task.pk]),
+                {
+                    "name": "Updated Watering",
+                    "frequency": "7d",
+                    "all_year": True,
+                    "seasonal_start_month": 1,
+                    "seasonal_end_month": 12,
+                    "repeat": True,
+                },
+            )
+
+        (update,) = self.update_statements(queries)
+        self.assertIn('"name"', update)
+        self.assertNotIn('"notes"', update)
@@ -1,7 +1,10 @@
-from django.test import SimpleTestCase, RequestFactory
+from django.test import SimpleTestCase, RequestFactory, override_settings
 from django.template import Context, Template
+from pathlib import Path
+import tempfile
 # from core.templatetags.navigation_tags import active
 from core.templatetags.month_filters import month_name, to
+from core.templatetags.picture_tags import available_sources
 
 
 # ==========================================================================
@@ -63,3 +66,45 @@ class MonthFilterTests(SimpleTestCase):
     def test_to_invalid_range(self):
         result = list(to("x", 5))
         self.assertEqual(result, [])
+
+
+# ==========================================================================
+# Picture Tag Tests
+# ==========================================================================
+
+class PictureTagTests(SimpleTestCase):
+
+    def setUp(self):
+        self.static_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.static_dir.cleanup)
+        root = Path(self.static_dir.name)
+        (root / "img").mkdir()
+        (root / "img" / "logo.png").write_bytes(b"png")
+        (root / "img" / "logo.webp").write_bytes(b"webp")
+
+        override = override_settings(STATICFILES_DIRS=[root])
+        override.enable()
+        self.addCleanup(override.disable)
+        available_sources.cache_clear()
+
+    def render(self, tag_args):
+        template = Template(
+            "{% load picture_tags %}{% picture " + tag_args + " %}"
+        )
+        return template.render(Context({}))
+
+    def test_picture_includes_existing_siblings_only(self):
+        output = self.render("'img/logo.png' alt='Logo'")
+        self.assertIn('type="image/webp"', output)
+        self.assertIn("img/logo.webp", output)
+        self.assertNotIn("image/avif", output)
+
+    def test_picture_falls_back_to_original_img(self):
+        output = self.render("'img/logo.png' alt='Logo' class='navbar-logo'")
+        self.assertIn('<img src="/static/img/logo.png" alt="Logo"', output)
+        self.assertIn('class="navbar-logo"', output)
+
+    def test_picture_without_siblings_has_no_sources(self):
+        output = self.render("'img/other.png' alt='Other'")
+        self.assertNotIn("<source", output)
+        self.assertIn("img/other.png", output)
@@ -22,6 +22,7 @@ from .views import (
     task_update,
     task_mark_done,
     task_skip,
+    task_bulk_action,
     TaskDetailView
 )
 
@@ -32,6 +33,16 @@ urlpatterns = [
     # Dashboard
     path("dashboard/", views.dashboard, name="dashboard"),
 
+    # Task history and statistics
+    path("history/", views.task_history, name="task_history"),
+    path("heatmap/", views.workload_heatmap, name="workload_heatmap"),
+
+    # Calendar feed (token in the URL instead of a login)
+    path("calendar/", views.calendar_feed_settings,
+         name="calendar_feed_settings"),
+    path("calendar/<str:token>.ics", views.calendar_feed,
+         name="calendar_feed"),
+
     # Garden beds (Class Based Views)
     path("beds/", BedListView.as_view(), name="bed_list"),
     path("beds/<int:pk>/", BedDetailView.as_view(), name="bed_detail"),
@@ -63,6 +74,8 @@ urlpatterns = [
          task_mark_done, name="task_mark_done"),
     path("tasks/<int:task_id>/skip/",
          task_skip, name="task_skip"),
+    path("tasks/bulk/",
+         task_bulk_action, name="task_bulk_action"),
     path("tasks/<int:pk>/", TaskDetailView.as_view(), name="task_detail"),
 
 ]
@@ -15,18 +15,40 @@ from django.views.generic import (
     ListView, DetailView, CreateView, UpdateView
 )
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.response import TemplateResponse
 from django.urls import reverse_lazy
 from django.db import IntegrityError
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
 from django.utils.safestring import mark_safe
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.utils.formats import date_format
 from django.urls import reverse
 from django.db.models.functions import Lower
+from django.core.paginator import Paginator
 
 
-from datetime import date
+from datetime import date, timedelta
 from calendar import monthrange
+from math import ceil
 
-from .models import GardenBed, Plant, PlantLifespan, PlantType, PlantTask
+from .models import (
+    CalendarFeed, GardenBed, Plant, PlantLifespan, PlantType, PlantTask,
+    TaskAction, TaskChange, UserDataVersion,
+)
+from .calendar_feed import feed_etag, feed_last_modified, feed_lines
+from .async_views import (
+    AsyncDetailMixin, AsyncListMixin, AsyncLoginRequiredMixin,
+    async_login_required,
+)
+from .history import monthly_stats, plant_stats, record_task_actions
+from .replicas import ReadOnlyViewMixin, mark_wrote, read_only_view
+from .sharding import atomic_for_user
+from .scheduling import (
+    add_months, atask_occurrences, first_of_week, workload_counts,
+)
 from .forms import GardenBedForm, PlantForm, PlantTaskForm
 
 
@@ -46,21 +68,31 @@ def home(request):
 # ================= Dashboard Views =======================
 
 
-@login_required
-def dashboard(request):
+@read_only_view
+@async_login_required
+async def dashboard(request):
     """
     Dashboard: Month view (default).
     Shows all tasks with next_due <= end_of_selected_month.
     Overdue tasks are those with next_due < start_of_selected_month.
     Supports sorting and forward-only month navigation.
+
+    The week, quarter and year views list projected occurrences
+    instead; see dashboard_range.
+
+    An async view (see core.async_views): the tasks are read with the
+    async ORM before the template renders.
     """
 
     today = date.today()
 
     # -----------------------------
-    # 1. VIEW MODE (month only for now)
+    # 1. VIEW MODE
     # -----------------------------
     view_mode = request.GET.get("view", "month")
+    if view_mode in RANGE_VIEWS:
+        return await dashboard_range(request, view_mode, today)
+    view_mode = "month"
 
     # -----------------------------
     # 2. SELECTED MONTH & YEAR (validated)
@@ -178,12 +210,15 @@ def dashboard(request):
         # tasks = tasks.filter(next_due__gte=start_of_month)
         tasks = tasks.filter(next_due__gte=today)
 
+    tasks = [task async for task in tasks]
+
     # -----------------------------
     # 5. CONTEXT
     # -----------------------------
     context = {
         "tasks": tasks,
         "view_mode": view_mode,
+        "view_modes": VIEW_MODES,
         "month_label": month_label,
         "hide_overdue": hide_overdue,
 
@@ -204,13 +239,305 @@ def dashboard(request):
         "current_direction": direction,
     }
 
-    return render(request, "core/dashboard.html", context)
+    return TemplateResponse(request, "core/dashboard.html", context)
+
+
+# Dashboard views that list projected occurrences
+RANGE_VIEWS = ("week", "quarter", "year")
+
+# Buttons for switching between dashboard views
+VIEW_MODES = [
+    ("week", "Week"),
+    ("month", "Month"),
+    ("quarter", "Quarter"),
+    ("year", "Year"),
+]
+
+# Months spanned by the quarter and year views
+RANGE_MONTHS = {"quarter": 3, "year": 12}
+
+# Occurrences per page in the range views
+RANGE_PAGE_SIZE = 50
+
+# How far ahead the range views can be navigated
+RANGE_HORIZON_MONTHS = 24
+
+RANGE_SORTS = {
+    "due": lambda item: (item[0], item[2].lower(), item[1]),
+    "name": lambda item: (item[2].lower(), item[0], item[1]),
+    "plant": lambda item: ((item[3] or "").lower(), item[0], item[1]),
+}
+
+
+def range_bounds(view_mode, day):
+    """
+    First and last-plus-one day of the week, quarter or year holding
+    ``day``.
+    """
+    if view_mode == "week":
+        start = first_of_week(day)
+        return start, start + timedelta(days=7)
+    months = RANGE_MONTHS[view_mode]
+    start = date(day.year, (day.month - 1) // months * months + 1, 1)
+    return start, add_months(start, months)
+
+
+async def dashboard_range(request, view_mode, today):
+    """
+    Dashboard: Week, quarter and year views.
+
+    Lists every projected occurrence of the user's active tasks in the
+    selected range, so a task due weekly appears once per week, not
+    just on its next due date. Overdue tasks are due today. The range is
+    picked with ``?date=YYYY-MM-DD`` and navigation is forward-only up
+    to RANGE_HORIZON_MONTHS ahead. Results are sorted and paginated on
+    the server; only the tasks on the current page are loaded in full.
+    """
+    # -----------------------------
+    # 1. SELECTED RANGE (validated)
+    # -----------------------------
+    try:
+        anchor = date.fromisoformat(request.GET.get("date", ""))
+    except ValueError:
+        anchor = today
+    anchor = min(
+        max(anchor, today), add_months(today, RANGE_HORIZON_MONTHS)
+    )
+    start, end = range_bounds(view_mode, anchor)
+    previous_start = range_bounds(view_mode, start - timedelta(days=1))[0]
+    has_previous = start > today
+    has_next = end <= add_months(today, RANGE_HORIZON_MONTHS)
+
+    # -----------------------------
+    # 2. OCCURRENCES, SORTED
+    # -----------------------------
+    hide_overdue = request.GET.get("hide_overdue") == "1"
+    sort = request.GET.get("sort", "due")
+    if sort not in RANGE_SORTS:
+        sort = "due"
+    direction = request.GET.get("direction", "asc")
+
+    occurrences = await atask_occurrences(
+        request.user, start, end, today, hide_overdue=hide_overdue
+    )
+    occurrences.sort(key=RANGE_SORTS[sort], reverse=direction == "desc")
+
+    # -----------------------------
+    # 3. PAGINATION
+    # Load full tasks for the current page only
+    # -----------------------------
+    page = Paginator(occurrences, RANGE_PAGE_SIZE).get_page(
+        request.GET.get("page")
+    )
+    tasks = await (
+        PlantTask.objects
+        .select_related("plant", "plant__bed")
+        .ain_bulk([item[1] for item in page])
+    )
+    entries = [
+        {
+            "date": day,
+            "task": tasks[pk],
+            "overdue": day == today and tasks[pk].next_due < today,
+        }
+        for day, pk, _, _ in page
+        if pk in tasks
+    ]
+
+    query = request.GET.copy()
+    query.pop("page", None)
+
+    context = {
+        "view_mode": view_mode,
+        "view_modes": VIEW_MODES,
+        "entries": entries,
+        "page_obj": page,
+        "page_query": query.urlencode(),
+        "total": len(occurrences),
+        "task_count": len({item[1] for item in occurrences}),
+        "hide_overdue": hide_overdue,
+
+        # navigation
+        "today": today,
+        "start": start,
+        "last_day": end - timedelta(days=1),
+        "previous_start": previous_start,
+        "next_start": end,
+        "has_previous": has_previous,
+        "has_next": has_next,
+
+        # Sorting
+        "current_sort": sort,
+        "current_direction": direction,
+    }
+    return TemplateResponse(request, "core/dashboard_range.html", context)
+
+
+# ================= History Views =======================
+
+# Months shown on the history page
+HISTORY_MONTHS = 12
+
+
+@read_only_view
+@login_required
+def task_history(request):
+    """
+    Task history: tasks done and skipped per month for the last year,
+    completion and on-time rates, the current streak and the busiest
+    plants. Reads only the monthly rollup tables.
+    """
+    stats = monthly_stats(request.user, months=HISTORY_MONTHS)
+
+    context = {
+        "stats": stats,
+        "plants": plant_stats(request.user, stats["months"][0]["month"]),
+        "busiest_month": max(
+            (row["done"] for row in stats["months"]), default=0
+        ),
+    }
+    return render(request, "core/history.html", context)
+
+
+@read_only_view
+@login_required
+def workload_heatmap(request):
+    """
+    Year-at-a-glance heatmap of how many tasks fall due each day over
+    the next 12 months, projected from every active task's frequency
+    and seasonal window. Counts are cached per user data version.
+    """
+    today = date.today()
+    counts = workload_counts(request.user, today)
+    busiest_day = max(counts, default=0)
+
+    # Grid of weeks (columns) x weekdays (rows), starting on a Monday
+    first = first_of_week(today)
+    weeks = []
+    day = first
+    while (day - today).days < len(counts):
+        week = {
+            "start": day,
+            "label": "" if weeks else today.strftime("%b"),
+            "cells": [],
+            "total": 0,
+        }
+        for weekday in range(7):
+            index = (day - today).days
+            if 0 <= index < len(counts):
+                count = counts[index]
+                level = ceil(4 * count / busiest_day) if count else 0
+                week["cells"].append(
+                    {"date": day, "count": count, "level": level}
+                )
+                week["total"] += count
+                if day.day == 1:
+                    week["label"] = day.strftime("%b")
+            else:
+                week["cells"].append(None)
+            day += timedelta(days=1)
+        weeks.append(week)
+
+    rows = [
+        {
+            "name": date(2024, 1, weekday + 1).strftime("%a"),
+            "cells": [week["cells"][weekday] for week in weeks],
+        }
+        for weekday in range(7)
+    ]
+
+    context = {
+        "weeks": weeks,
+        "rows": rows,
+        "total": sum(counts),
+        "busiest_day": busiest_day,
+        "busiest_weeks": sorted(
+            (week for week in weeks if week["total"]),
+            key=lambda week: (-week["total"], week["start"]),
+        )[:5],
+    }
+    return render(request, "core/heatmap.html", context)
+
+
+# ================= Calendar Feed Views =======================
+
+# Calendar apps poll the feed; let them reuse it for a few minutes
+CALENDAR_FEED_MAX_AGE = 5 * 60
+
+
+@read_only_view
+@require_safe
+def calendar_feed(request, token):
+    """
+    The user's task schedule as an iCalendar feed, found by its secret
+    token since calendar apps cannot log in.
+
+    ETag and Last-Modified come from the user's data version, read from
+    the same database as the tasks, so polls with nothing new get a 304
+    after two small queries. Otherwise the
+    feed is streamed as it is generated.
+    """
+    feed = get_object_or_404(
+        CalendarFeed, token=token, user__is_active=True
+    )
+    today = date.today()
+    version = UserDataVersion.current(feed.user_id)
+    etag = feed_etag(feed, version, today)
+    last_modified = feed_last_modified(version, today)
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp())
+    )
+    if response is None:
+        response = StreamingHttpResponse(
+            feed_lines(
+                feed.user_id, today, version.updated_at,
+                request.get_host().split(":")[0],
+            ),
+            content_type="text/calendar; charset=utf-8",
+        )
+        response["Content-Disposition"] = (
+            'inline; filename="garden-tasks.ics"'
+        )
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified.timestamp())
+    response["Cache-Control"] = f"private, max-age={CALENDAR_FEED_MAX_AGE}"
+    return response
+
+
+@login_required
+def calendar_feed_settings(request):
+    """
+    Show the user's calendar feed URL. POST replaces the token, for when
+    the URL has been shared by mistake.
+    """
+    feed, _ = CalendarFeed.objects.get_or_create(user=request.user)
+
+    if request.method == "POST":
+        feed.reset()
+        messages.success(
+            request,
+            "Your calendar feed address has been changed. "
+            "Re-subscribe in your calendar app with the new one."
+        )
+        return redirect("calendar_feed_settings")
+
+    feed_url = request.build_absolute_uri(
+        reverse("calendar_feed", args=[feed.token])
+    )
+    context = {
+        "feed_url": feed_url,
+        "webcal_url": "webcal://" + feed_url.split("://", 1)[1],
+    }
+    return render(request, "core/calendar_feed.html", context)
 
 
 # ================= Garden Bed Views =======================
 
 
-class BedListView(LoginRequiredMixin, ListView):
+class BedListView(
+    ReadOnlyViewMixin, AsyncLoginRequiredMixin, AsyncListMixin, ListView
+):
     """
     Displays all GardenBed objects belonging to the logged-in user.
 
@@ -280,7 +607,7 @@ class BedListView(LoginRequiredMixin, ListView):
 
         return qs
 
-    def get_context_data(self, **kwargs):
+    async def aget_context_data(self, **kwargs):
         """
         Add extra context for template rendering:
           - location_choices: unique locations for the filter dropdown.
@@ -288,14 +615,15 @@ class BedListView(LoginRequiredMixin, ListView):
           - sort_options: used to build table headers with sorting links.
           - current_sort & current_direction: to display arrows.
         """
-        context = super().get_context_data(**kwargs)
+        context = await super().aget_context_data(**kwargs)
 
         # Get all raw locations for the current user
-        raw_locations = (
+        raw_locations = [
+            loc async for loc in
             GardenBed.objects
             .filter(owner=self.request.user)
             .values_list("location", flat=True)
-        )
+        ]
 
         # Normalise, dedupe, and sort (Title Case as requested)
         normalised_locations = sorted({
@@ -327,16 +655,18 @@ class BedListView(LoginRequiredMixin, ListView):
             self.request.GET.get('direction', 'asc')
         )
         context["beds"] = context["object_list"]
-        context["total_beds"] = (
+        context["total_beds"] = await (
             GardenBed.objects
             .filter(owner=self.request.user)
-            .count()
+            .acount()
         )
 
         return context
 
 
-class BedDetailView(LoginRequiredMixin, DetailView):
+class BedDetailView(
+    ReadOnlyViewMixin, AsyncLoginRequiredMixin, AsyncDetailMixin, DetailView
+):
     """
     Displays detailed information for a single GardenBed.
 
@@ -549,6 +879,8 @@ def bed_delete(request, pk):
 
     On POST:
         - Permanently delete the bed and redirect to the bed list.
+          Plants in the bed are kept without a bed: SET_NULL is applied
+          with one UPDATE, without loading the plants.
 
     On GET:
         - Render the bed detail page with delete mode enabled so the
@@ -569,7 +901,9 @@ def bed_delete(request, pk):
 
 # ================= Plant Views =======================
 
-class PlantListView(LoginRequiredMixin, ListView):
+class PlantListView(
+    ReadOnlyViewMixin, AsyncLoginRequiredMixin, AsyncListMixin, ListView
+):
     """
     Displays all Plant objects belonging to the logged‑in user.
 
@@ -675,18 +1009,18 @@ class PlantListView(LoginRequiredMixin, ListView):
 
         return qs
 
-    def get_context_data(self, **kwargs):
+    async def aget_context_data(self, **kwargs):
         """
         Add extra context needed for filter dropdowns.
 
         These choices come from the PlantLifespan and PlantType enums,
         ensuring the template always receives the canonical values.
         """
-        context = super().get_context_data(**kwargs)
+        context = await super().aget_context_data(**kwargs)
         context["lifespan_choices"] = PlantLifespan.choices
         context["type_choices"] = PlantType.choices
-        context["total_plants"] = (
-            Plant.objects.filter(owner=self.request.user).count()
+        context["total_plants"] = await (
+            Plant.objects.filter(owner=self.request.user).acount()
         )
 
         # Sort options for template
@@ -708,7 +1042,9 @@ class PlantListView(LoginRequiredMixin, ListView):
         return context
 
 
-class PlantDetailView(LoginRequiredMixin, DetailView):
+class PlantDetailView(
+    ReadOnlyViewMixin, AsyncLoginRequiredMixin, AsyncDetailMixin, DetailView
+):
     """
     Display detailed information for a single plant.
 
@@ -722,15 +1058,15 @@ class PlantDetailView(LoginRequiredMixin, DetailView):
     def get_queryset(self):
         return Plant.objects.filter(owner=self.request.user)
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+    async def aget_context_data(self, **kwargs):
+        context = await super().aget_context_data(**kwargs)
         plant = context["plant"]
 
         today = date.today()
 
         # Build enriched task list
         task_info = []
-        for task in plant.tasks.all():
+        async for task in plant.tasks.all():
             overdue = task.is_overdue()
             days_until = task.days_until_due()
             due_soon = days_until is not None and days_until <= 3
@@ -1001,10 +1337,54 @@ def task_delete(request, task_id):
     return redirect("plant_detail", pk=task.plant.id)
 
 
+def task_state_response(task, message, success=True, status=200):
+    """
+    JSON returned to fetch() callers of task_mark_done and task_skip,
+    so the dashboard can update or remove just the affected row.
+    """
+    return JsonResponse({
+        "success": success,
+        "id": task.id,
+        "name": task.name,
+        "active": task.active,
+        "next_due": task.next_due.isoformat() if task.next_due else None,
+        "next_due_display": (
+            date_format(task.next_due) if task.next_due else ""
+        ),
+        "status": task.due_status(),
+        "message": message,
+    }, status=status)
+
+
+def task_conflict_response(request, task, fallback_url):
+    """
+    Response used when a task changed between loading and saving it
+    (e.g. marked done on another device). Nothing was written; the
+    caller gets the task's current state.
+    """
+    task.refresh_from_db()
+    message = (
+        f"Task '{task.name}' was already updated on another device, "
+        "so nothing was changed."
+    )
+
+    # AJAX path
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        return task_state_response(task, message, success=False, status=409)
+
+    messages.warning(request, message)
+    return redirect(fallback_url)
+
+
 @login_required
 def task_mark_done(request, task_id):
     """
     Mark the task as done and return to the dashboard.
+
+    Only the changed columns are written, and only if the task has not
+    been changed elsewhere since it was loaded. When called via fetch()
+    with ``X-Requested-With: XMLHttpRequest`` the task's new state is
+    returned as JSON instead of a redirect.
     """
     task = get_object_or_404(
         PlantTask,
@@ -1012,10 +1392,22 @@ def task_mark_done(request, task_id):
         plant__owner=request.user
     )
 
-    task.mark_done()
-    task.save()
+    loaded_next_due = task.next_due
+    changed = task.mark_done()
+    # Nothing changes when the task was already done today
+    if changed:
+        with atomic_for_user(request.user.pk):
+            if not task.save_if_unchanged(changed, loaded_next_due):
+                return task_conflict_response(request, task, "dashboard")
+            record_task_actions([(task, loaded_next_due)], TaskAction.DONE)
+
+    message = f"Task '{task.name}' marked as done."
+
+    # AJAX path
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        return task_state_response(task, message)
 
-    messages.success(request, f"Task '{task.name}' marked as done.")
+    messages.success(request, message)
 
     return redirect("dashboard")
 
@@ -1026,16 +1418,123 @@ def task_skip(request, task_id):
     Mark the task as skipped.
 
     This allows the user to remove the task from their dashboard
-    without having to actually mark the task as done.
+    without having to actually mark the task as done. Saves and
+    returns JSON for fetch() callers in the same way as task_mark_done.
     """
     task = get_object_or_404(PlantTask, id=task_id, plant__owner=request.user)
-    task.skip()
-    task.save()
 
-    # Return success message to the user
-    messages.success(request, f"Task '{task.name}' skipped.")
+    redirect_to = request.META.get("HTTP_REFERER", "dashboard")
+    loaded_next_due = task.next_due
+    changed = task.skip()
+    if changed:
+        with atomic_for_user(request.user.pk):
+            if not task.save_if_unchanged(changed, loaded_next_due):
+                return task_conflict_response(request, task, redirect_to)
+            record_task_actions([(task, loaded_next_due)], TaskAction.SKIP)
+
+    message = f"Task '{task.name}' skipped."
+
+    # AJAX path
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        response = task_state_response(task, message)
+    else:
+        # Return success message to the user
+        messages.success(request, message)
+        response = redirect(redirect_to)
+
+    # The no-JavaScript link skips with a GET, which
+    # ReplicaRoutingMiddleware does not count as a write
+    if changed and request.method == "GET":
+        mark_wrote(response)
+    return response
+
+
+# Bulk actions: action name -> (PlantTask method, history action)
+BULK_TASK_ACTIONS = {
+    "done": ("mark_done", TaskAction.DONE),
+    "skip": ("skip", TaskAction.SKIP),
+}
 
-    return redirect(request.META.get("HTTP_REFERER", "dashboard"))
+# Upper limit on task ids accepted in one bulk request
+MAX_BULK_TASKS = 500
+
+
+@login_required
+def task_bulk_action(request):
+    """
+    Mark several tasks as done, or skip them, in one request.
+
+    Expects a POST with one or more ``task_ids`` and ``action`` set to
+    "done" or "skip". The tasks are locked and updated in memory, then
+    written back with a single bulk_update of the columns the action
+    reported as changed, all inside one transaction. Ids belonging to
+    other users are ignored.
+    """
+    redirect_to = request.POST.get("next", "")
+    if not url_has_allowed_host_and_scheme(
+        redirect_to,
+        allowed_hosts={request.get_host()},
+        require_https=request.is_secure(),
+    ):
+        redirect_to = reverse("dashboard")
+
+    if request.method != "POST":
+        return redirect(redirect_to)
+
+    action = request.POST.get("action")
+    task_ids = {
+        int(task_id)
+        for task_id in request.POST.getlist("task_ids")
+        if task_id.isdigit()
+    }
+
+    if action not in BULK_TASK_ACTIONS:
+        messages.error(request, "Unknown bulk action.")
+        return redirect(redirect_to)
+
+    if not task_ids:
+        messages.warning(request, "Select at least one task first.")
+        return redirect(redirect_to)
+
+    if len(task_ids) > MAX_BULK_TASKS:
+        messages.error(
+            request,
+            f"You can update at most {MAX_BULK_TASKS} tasks at once."
+        )
+        return redirect(redirect_to)
+
+    method, history_action = BULK_TASK_ACTIONS[action]
+
+    with atomic_for_user(request.user.pk):
+        tasks = list(
+            PlantTask.objects.select_for_update()
+            .filter(id__in=task_ids, plant__owner=request.user)
+            # Lock rows in a consistent order to avoid deadlocks
+            .order_by("pk")
+        )
+        history = []
+        changed = set()
+        for task in tasks:
+            due_on = task.next_due
+            task_changed = getattr(task, method)()
+            # Only tasks the action changed get a history entry
+            if task_changed:
+                history.append((task, due_on))
+                changed.update(task_changed)
+        if changed:
+            PlantTask.objects.bulk_update(tasks, sorted(changed))
+            UserDataVersion.bump(request.user.pk)
+            TaskChange.record([task.pk for task in tasks])
+        record_task_actions(history, history_action)
+
+    count = len(tasks)
+    noun = "task" if count == 1 else "tasks"
+    if action == "done":
+        messages.success(request, f"{count} {noun} marked as done.")
+    else:
+        messages.success(request, f"{count} {noun} skipped.")
+
+    return redirect(redirect_to)
 
 
 @login_required
@@ -1047,11 +1546,18 @@ def task_update(request, task_id):
     task = get_object_or_404(PlantTask, id=task_id, plant__owner=request.user)
 
     if request.method == "POST":
+        loaded_next_due = task.next_due
         form = PlantTaskForm(request.POST, instance=task)
         if form.is_valid():
             task = form.save(commit=False)
             task.next_due = task.calculate_next_due()
-            task.save()
+
+            # Only write what changed (notes can be large HTML)
+            changed = list(form.changed_data)
+            if task.next_due != loaded_next_due:
+                changed.append("next_due")
+            if changed:
+                task.save(update_fields=changed)
             messages.success(request, "Task updated successfully.")
             return redirect("plant_detail", pk=task.plant.id)
     else:
@@ -1065,7 +1571,9 @@ def task_update(request, task_id):
     })
 
 
-class TaskDetailView(LoginRequiredMixin, DetailView):
+class TaskDetailView(
+    ReadOnlyViewMixin, AsyncLoginRequiredMixin, AsyncDetailMixin, DetailView
+):
     """
     Task detail view to display the task information to the user
 
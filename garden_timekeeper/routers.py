@@ -0,0 +1,79 @@
+"""
+Database routers for Garden Timekeeper.
+
+ShardRouter sends each user's garden to their shard when sharding is on
+(see core.sharding), and leaves every other model to the next router.
+
+ReplicaRouter sends reads to the replica chosen for the current request
+(see core.replicas) and every write to the default database.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+
+from core.replicas import current_read_db
+from core.sharding import (
+    ShardNotPinned, current_shard, is_sharded, shard_for_user
+)
+
+
+class ShardRouter:
+
+    def _shard(self, model, hints):
+        if not is_sharded(model):
+            return None
+        instance = hints.get("instance")
+        if instance is not None:
+            if is_sharded(instance.__class__) and instance._state.db:
+                return instance._state.db
+            if isinstance(instance, get_user_model()) and instance.pk:
+                return shard_for_user(instance.pk)
+        shard = current_shard()
+        if shard is None:
+            raise ShardNotPinned(
+                f"No shard is pinned for this {model._meta.label} query. "
+                "Use core.sharding.pinned_to_user() or .using()."
+            )
+        return shard
+
+    def db_for_read(self, model, **hints):
+        return self._shard(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._shard(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if not settings.SHARDS:
+            return None
+        sharded = [is_sharded(obj.__class__) for obj in (obj1, obj2)]
+        if all(sharded):
+            return obj1._state.db == obj2._state.db
+        if any(sharded):
+            # Shards hold a copy of their users, so a garden can point at
+            # its owner wherever the user object was loaded from
+            return True
+        return None
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return current_read_db()
+
+    def db_for_write(self, model, **hints):
+        # Objects read from a replica are still saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        databases = {DEFAULT_DB_ALIAS, *settings.READ_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas copy the primary's schema through replication
+        if db in settings.READ_REPLICAS:
+            return False
+        return None
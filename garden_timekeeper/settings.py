@@ -66,22 +66,31 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Request timing first so its totals include every other middleware
+    'core.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    # Whitenoise for static file handling
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Whitenoise for static file handling (async-capable subclass)
+    'core.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Pin the user's shard (only when sharding is configured)
+    'core.middleware.ShardPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    # Read-only views from a replica (only when replicas are configured)
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Staff-only ?_profile= hook (last, so only the view is profiled)
+    'core.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'garden_timekeeper.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates + render timing for RequestTimingMiddleware
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -118,6 +127,47 @@ else:
         }
     }
 
+# Read replicas: each DATABASE_URL_REPLICA_<NAME> env var adds a database
+# "replica_<name>" that read-only views read from (see core.replicas).
+READ_REPLICAS = []
+if dj_database_url:
+    for env_name, url in sorted(os.environ.items()):
+        if env_name.startswith("DATABASE_URL_REPLICA_") and url:
+            alias = "replica_" + env_name.removeprefix(
+                "DATABASE_URL_REPLICA_"
+            ).lower()
+            DATABASES[alias] = dj_database_url.parse(
+                url, conn_max_age=0, conn_health_checks=True,
+                ssl_require=False,
+            )
+            DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+            READ_REPLICAS.append(alias)
+
+# User sharding (optional): each DATABASE_URL_SHARD_<NAME> env var adds a
+# database "shard_<name>", and every user's garden lives on one of them
+# (see core.sharding). Run rebalance_shards after adding or removing one.
+SHARDS = []
+if dj_database_url:
+    for env_name, url in sorted(os.environ.items()):
+        if env_name.startswith("DATABASE_URL_SHARD_") and url:
+            alias = "shard_" + env_name.removeprefix(
+                "DATABASE_URL_SHARD_"
+            ).lower()
+            DATABASES[alias] = dj_database_url.parse(
+                url, conn_max_age=0, conn_health_checks=True,
+                ssl_require=False,
+            )
+            SHARDS.append(alias)
+
+DATABASE_ROUTERS = [
+    "garden_timekeeper.routers.ShardRouter",
+    "garden_timekeeper.routers.ReplicaRouter",
+]
+
+# Seconds a browser keeps reading from the primary after it writes, so
+# users see their own changes before the replicas catch up
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 10))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -150,6 +200,77 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing runs on a pool capped at PASSWORD_HASH_WORKERS threads
+# per process, so login bursts cannot take every worker thread
+# (see core.hashers). The other hashers verify older passwords.
+PASSWORD_HASHERS = [
+    'core.hashers.BoundedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+
+
+# Cache: local memory per process by default. Set CACHE_BACKEND (e.g.
+# core.cache_backends.RedisCache) and CACHE_LOCATION to share it, and
+# the login rate limits, between processes. The core.cache_backends
+# classes count hits and misses for RequestTimingMiddleware.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "core.cache_backends.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+# True when every web process sees the same cache
+SHARED_CACHE = CACHES["default"]["BACKEND"].rsplit(".", 1)[-1] in (
+    "RedisCache", "PyMemcacheCache", "PyLibMCCache", "DatabaseCache",
+)
+
+# Login rate limits: failed attempts allowed per IP address and per
+# username in any LOGIN_RATE_WINDOW seconds (see core.ratelimit)
+LOGIN_RATE_LIMIT_ENABLED = os.getenv(
+    "LOGIN_RATE_LIMIT_ENABLED", "True"
+) == "True"
+LOGIN_RATE_WINDOW = int(os.getenv("LOGIN_RATE_WINDOW", 300))
+LOGIN_RATE_LIMIT_IP = int(os.getenv("LOGIN_RATE_LIMIT_IP", 30))
+LOGIN_RATE_LIMIT_USERNAME = int(os.getenv("LOGIN_RATE_LIMIT_USERNAME", 10))
+# Proxies in front of the app that append to X-Forwarded-For (1 on Heroku)
+RATE_LIMIT_PROXY_COUNT = int(os.getenv("RATE_LIMIT_PROXY_COUNT", 0))
+
+
+# Account deletion: rows deleted per statement when purging an account,
+# and whether the purge starts in a thread of the web process (otherwise
+# only the purge_accounts command runs it; see core.purge)
+ACCOUNT_PURGE_BATCH_SIZE = int(os.getenv("ACCOUNT_PURGE_BATCH_SIZE", 1000))
+ACCOUNT_PURGE_IN_PROCESS = os.getenv(
+    "ACCOUNT_PURGE_IN_PROCESS", "True"
+) == "True"
+
+
+# Housekeeping (see core.housekeeping): rows deleted per statement, how
+# long uploads are kept before they can count as unused, and how long
+# the TaskChange feed is kept
+HOUSEKEEPING_BATCH_SIZE = int(os.getenv("HOUSEKEEPING_BATCH_SIZE", 1000))
+HOUSEKEEPING_GRACE_HOURS = int(os.getenv("HOUSEKEEPING_GRACE_HOURS", 24))
+TASK_CHANGE_RETENTION_DAYS = int(
+    os.getenv("TASK_CHANGE_RETENTION_DAYS", 7)
+)
+
+# Cloudinary folder plant photos are uploaded to. The housekeeping images
+# job only ever lists this folder, and only deletes from it when
+# HOUSEKEEPING_DELETE_IMAGES is True: leave it off wherever the
+# Cloudinary account is shared with another database (e.g. development
+# against production's CLOUDINARY_URL).
+PLANT_IMAGE_FOLDER = os.getenv("PLANT_IMAGE_FOLDER", "plants")
+HOUSEKEEPING_DELETE_IMAGES = os.getenv(
+    "HOUSEKEEPING_DELETE_IMAGES", "False"
+) == "True"
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
 
@@ -203,6 +324,23 @@ SESSION_EXPIRE_AT_BROWSER_CLOSE = os.getenv(
     "SESSION_EXPIRE_AT_BROWSER_CLOSE", "True"
     ) == "True"
 
+# With a shared cache, sessions are read from the cache and only fall
+# back to the database on a miss (written to both). A per-process cache
+# would keep serving a session another worker has logged out, so they
+# are then read from the database. Set SESSION_ENGINE to
+# django.contrib.sessions.backends.signed_cookies to keep them in the
+# cookie instead, with no server-side storage at all.
+SESSION_ENGINE = os.getenv(
+    "SESSION_ENGINE",
+    "django.contrib.sessions.backends.cached_db" if SHARED_CACHE
+    else "django.contrib.sessions.backends.db",
+)
+
+# Flash messages live only in a cookie, never in the session
+MESSAGE_STORAGE = os.getenv(
+    "MESSAGE_STORAGE", "django.contrib.messages.storage.cookie.CookieStorage"
+)
+
 # Required for Django 5.x to silence warnings about primary key
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -270,6 +408,13 @@ EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "True") == "True"
 
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "webmaster@localhost")
 
+# Public address of the site, for links in emails sent outside a request
+# (e.g. the send_due_digests command).
+SITE_URL = os.getenv("SITE_URL", "http://localhost:8000").rstrip("/")
+
+# Hour of the due date (in TIME_ZONE) when run_reminders emails a task
+REMINDER_HOUR = int(os.getenv("REMINDER_HOUR", 7))
+
 
 # Restricted logging output:
 # It does not expose sensitive information to users.
@@ -292,9 +437,28 @@ LOGGING = {
             "level": "ERROR",
             "propagate": True,
         },
+        # One JSON line per request from RequestTimingMiddleware
+        # (set REQUEST_TIMING_LOG_LEVEL=WARNING to turn it off).
+        "core.request_timing": {
+            "handlers": ["console"],
+            "level": os.getenv("REQUEST_TIMING_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
     },
 }
 
+# On-demand profiling for staff (?_profile=sample or ?_profile=cprofile).
+# Off unless explicitly enabled; see core.middleware.ProfilingMiddleware.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False") == "True"
+PROFILING_RATE_LIMIT_SECONDS = int(
+    os.getenv("PROFILING_RATE_LIMIT_SECONDS", 30)
+)
+PROFILING_SAMPLE_INTERVAL = float(
+    os.getenv("PROFILING_SAMPLE_INTERVAL", 0.001)
+)
+# Optional folder to keep a copy of every report (ephemeral on Heroku)
+PROFILING_REPORT_DIR = os.getenv("PROFILING_REPORT_DIR") or None
+
 # Security settings for production
 if not DEBUG:
     # Set to false to allow local Dev Instance to run in http
@@ -311,3 +475,16 @@ if not DEBUG:
 # Disable SSL redirect during tests
 if 'test' in sys.argv:
     SECURE_SSL_REDIRECT = False
+    # Keep the test output readable (tests use assertLogs instead)
+    LOGGING["loggers"]["core.request_timing"]["level"] = "WARNING"
+    # Replicas mirror the test database; routing is tested with
+    # override_settings(READ_REPLICAS=...) instead
+    READ_REPLICAS = []
+    # Two extra SQLite databases for the sharding tests, which turn
+    # sharding on with override_settings(SHARDS=...)
+    SHARDS = []
+    for alias in ("shard_a", "shard_b"):
+        DATABASES.setdefault(alias, {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / f"{alias}.sqlite3",
+        })
@@ -17,6 +17,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
         return {
             id: index,
+            pk: row.getAttribute("data-task-id") || "",
             name: row.getAttribute("data-task-name") || "",
             plant: row.getAttribute("data-plant") || "",
             bed: row.getAttribute("data-bed") || "",
@@ -174,6 +175,7 @@ document.addEventListener("DOMContentLoaded", () => {
         });
 
         renderPaginationControls();
+        updateBulkControls();
     }
 
     // ---------------------------------------------------------
@@ -321,6 +323,221 @@ document.addEventListener("DOMContentLoaded", () => {
     qs("#dashboard-search")?.addEventListener("input", debounce(updateFilters, 150));
     qs("#dashboard-status-filter")?.addEventListener("change", updateFilters);
 
+    // ---------------------------------------------------------
+    // 8. Bulk selection
+    // ---------------------------------------------------------
+    // Rows on other pages are detached from the DOM, so the selection
+    // is tracked here and posted as hidden inputs on submit.
+    const bulkForm = qs("#bulk-task-form");
+    const selectAll = qs("#bulk-select-all");
+    const selected = new Set();
+
+    function setSelected(task, checked) {
+        if (checked) {
+            selected.add(task.pk);
+        } else {
+            selected.delete(task.pk);
+        }
+        // Keep the desktop row and mobile card checkboxes in step
+        [task.dom.row, task.dom.card].forEach(el => {
+            const box = el?.querySelector(".task-select");
+            if (box) box.checked = checked;
+        });
+    }
+
+    function updateBulkControls() {
+        if (!bulkForm) return;
+
+        const count = selected.size;
+        const label = qs("#bulk-selected-count");
+        if (label) {
+            label.textContent = count
+                ? `${count} task${count === 1 ? "" : "s"} selected`
+                : "Select tasks to update several at once";
+        }
+        qsa(".bulk-action", bulkForm).forEach(button => {
+            button.disabled = count === 0;
+        });
+
+        if (selectAll) {
+            const pageItems = paginator.getPageItems();
+            selectAll.checked = pageItems.length > 0 &&
+                pageItems.every(task => selected.has(task.pk));
+        }
+    }
+
+    tasks.forEach(task => {
+        [task.dom.row, task.dom.card].forEach(el => {
+            el?.querySelector(".task-select")?.addEventListener("change", (e) => {
+                setSelected(task, e.target.checked);
+                updateBulkControls();
+            });
+        });
+    });
+
+    selectAll?.addEventListener("change", () => {
+        paginator.getPageItems().forEach(task => {
+            setSelected(task, selectAll.checked);
+        });
+        updateBulkControls();
+    });
+
+    bulkForm?.addEventListener("submit", () => {
+        qsa("input.bulk-selected", bulkForm).forEach(input => input.remove());
+        selected.forEach(pk => {
+            const input = document.createElement("input");
+            input.type = "hidden";
+            input.name = "task_ids";
+            input.value = pk;
+            input.className = "bulk-selected";
+            bulkForm.appendChild(input);
+        });
+    });
+
+    // ---------------------------------------------------------
+    // 9. Done / Skip without reloading the page
+    // ---------------------------------------------------------
+    // The views return the task's new state as JSON when called with
+    // X-Requested-With, so only the affected row and card change.
+    const tableBody = qs("#dashboard-table-body");
+    const today = tableBody?.dataset.today || "";
+    const endOfMonth = tableBody?.dataset.endOfMonth || "";
+    const hideOverdue = tableBody?.dataset.hideOverdue === "1";
+
+    const ROW_CLASSES = { overdue: "table-danger", "due-today": "table-warning" };
+    const CARD_CLASSES = { overdue: "bg-danger", "due-today": "bg-warning" };
+
+    function dueIcon(status) {
+        if (status !== "overdue" && status !== "due-today") return null;
+
+        const icon = document.createElement("i");
+        icon.className = status === "overdue"
+            ? "fa-solid fa-circle-exclamation text-danger ms-2 due-icon"
+            : "fa-solid fa-circle-exclamation text-warning ms-2 due-icon";
+        icon.title = status === "overdue"
+            ? "This task is overdue"
+            : "This task is due today";
+        return icon;
+    }
+
+    function showFeedback(message, level = "success") {
+        const container = qs("#dashboard-feedback");
+        if (!container) return;
+
+        clear(container);
+        const alert = document.createElement("div");
+        alert.className = `alert alert-${level} alert-dismissible fade show`;
+        alert.setAttribute("role", "alert");
+        alert.textContent = message;
+
+        const close = document.createElement("button");
+        close.type = "button";
+        close.className = "btn-close";
+        close.setAttribute("data-bs-dismiss", "alert");
+        close.setAttribute("aria-label", "Close");
+        alert.appendChild(close);
+
+        container.appendChild(alert);
+    }
+
+    function updateTask(task, data) {
+        const { row, card } = task.dom;
+
+        task.next_due = data.next_due || "";
+        task.status = data.status;
+
+        [row, card].forEach(el => {
+            if (!el) return;
+            el.dataset.nextDue = task.next_due;
+            el.dataset.status = task.status;
+            qsa(".due-icon", el).forEach(icon => icon.remove());
+            const dueDate = qs(".task-due-date", el);
+            if (dueDate) dueDate.textContent = data.next_due_display;
+        });
+
+        if (row) {
+            row.classList.remove(...Object.values(ROW_CLASSES));
+            if (ROW_CLASSES[task.status]) row.classList.add(ROW_CLASSES[task.status]);
+            const icon = dueIcon(task.status);
+            const dueDate = qs(".task-due-date", row);
+            if (icon && dueDate) dueDate.before(icon);
+        }
+
+        if (card) {
+            card.classList.remove(...Object.values(CARD_CLASSES));
+            if (CARD_CLASSES[task.status]) card.classList.add(CARD_CLASSES[task.status]);
+            if (task.status !== "overdue") {
+                qsa(".text-white", card).forEach(el => el.classList.remove("text-white"));
+            }
+            const icon = dueIcon(task.status);
+            const title = qs(".card-title", card);
+            if (icon && title) title.appendChild(icon);
+        }
+    }
+
+    function stillListed(data) {
+        if (!data.active || !data.next_due) return false;
+        if (endOfMonth && data.next_due > endOfMonth) return false;
+        return !(hideOverdue && today && data.next_due < today);
+    }
+
+    async function runTaskAction(task, url) {
+        const token = qs("input[name=csrfmiddlewaretoken]")?.value || "";
+
+        let data;
+        try {
+            const response = await fetch(url, {
+                method: "POST",
+                headers: {
+                    "X-Requested-With": "XMLHttpRequest",
+                    "X-CSRFToken": token
+                }
+            });
+            // 409: changed on another device; the body has its current state
+            if (!response.ok && response.status !== 409) {
+                throw new Error(response.statusText);
+            }
+            data = await response.json();
+        } catch (error) {
+            showFeedback("Sorry, that task could not be updated. Please try again.", "danger");
+            return;
+        }
+
+        if (stillListed(data)) {
+            updateTask(task, data);
+        } else {
+            tasks.splice(tasks.indexOf(task), 1);
+            setSelected(task, false);
+        }
+
+        // Re-apply filters and sorting, staying on the same page
+        const page = paginator.currentPage;
+        paginator.setItems(applyAllFiltersAndSorting());
+        paginator.goToPage(page);
+        render();
+        showFeedback(data.message, data.success ? "success" : "warning");
+    }
+
+    tasks.forEach(task => {
+        [task.dom.row, task.dom.card].forEach(el => {
+            if (!el) return;
+
+            qsa("form.task-action", el).forEach(form => {
+                form.addEventListener("submit", (e) => {
+                    e.preventDefault();
+                    runTaskAction(task, form.action);
+                });
+            });
+
+            qsa("a.task-action", el).forEach(link => {
+                link.addEventListener("click", (e) => {
+                    e.preventDefault();
+                    runTaskAction(task, link.href);
+                });
+            });
+        });
+    });
+
     // ---------------------------------------------------------
     // Initial render
     // ---------------------------------------------------------